@@ -5,6 +5,10 @@ from openpyxl.styles import Font, Border, Side
 import matplotlib.pyplot as plt
 import numpy as np
 
+from elearn.dates import parse_year
+from elearn.matching import contains
+from elearn.ranking import top_n
+
 
 class Vacancy:
     currency_to_rub = {
@@ -19,7 +23,7 @@ class Vacancy:
         self.salary_currency = vacancy['salary_currency']
         self.salary_average = self.currency_to_rub[self.salary_currency] * (self.salary_from + self.salary_to) / 2
         self.area_name = vacancy['area_name']
-        self.year = int(vacancy['published_at'][:4])
+        self.year = parse_year(vacancy['published_at'])
 
 
 class DataSet:
@@ -59,7 +63,7 @@ class DataSet:
         for vacancy_dictionary in self.csv_reader():
             vacancy = Vacancy(vacancy_dictionary)
             self.increment(salary, vacancy.year, [vacancy.salary_average])
-            if vacancy.name.find(self.vacancy_name) != -1:
+            if contains(vacancy.name, self.vacancy_name):
                 self.increment(salary_of_vacancy_name, vacancy.year, [vacancy.salary_average])
             self.increment(salary_city, vacancy.area_name, [vacancy.salary_average])
             count_of_vacancies += 1
@@ -75,17 +79,10 @@ class DataSet:
         stats2 = self.average(salary_of_vacancy_name)
         stats3 = self.average(salary_city)
 
-        stats4 = {}
-        for year, salaries in salary_city.items():
-            stats4[year] = round(len(salaries) / count_of_vacancies, 4)
-        stats4 = list(filter(lambda a: a[-1] >= 0.01, [(key, value) for key, value in stats4.items()]))
-        stats4.sort(key=lambda a: a[-1], reverse=True)
-        stats5 = stats4.copy()
-        stats4 = dict(stats4)
-        stats3 = list(filter(lambda a: a[0] in list(stats4.keys()), [(key, value) for key, value in stats3.items()]))
-        stats3.sort(key=lambda a: a[-1], reverse=True)
-        stats3 = dict(stats3[:10])
-        stats5 = dict(stats5[:10])
+        shares = [(city, round(len(salaries) / count_of_vacancies, 4)) for city, salaries in salary_city.items()]
+        frequent = {city for city, share in shares if share >= 0.01}
+        stats3 = dict(top_n(stats3.items(), allowed=frequent))
+        stats5 = dict(top_n(shares, threshold=0.01))
 
         return stats, vacancies_number, stats2, vacancies_number_by_name, stats3, stats5
 
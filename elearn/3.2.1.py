@@ -1,11 +1,16 @@
+import numpy as np
 import pandas as pd
 
+from elearn.datasource import CsvSource
+from elearn.dates import split_dates
+
 
 class Parser:
 	"""Класс Parser делить один большой CSV файл на несколько чанков
 
 	Attributes:
 		df (pd.DataFrame): датафрейм, содержащий полную таблицу с вакансиями
+		df_years (np.ndarray): год публикации каждой вакансии из df
 	"""
 	def __init__(self, file_name):
 		"""Инициализирует класс Parser
@@ -13,22 +18,23 @@ class Parser:
 		Params:
 			file_name (str): название файла
 		"""
-		self.df = pd.read_csv(file_name)
+		self.df = CsvSource(file_name).read()
+		self.df_years = split_dates(self.df['published_at'])[0]
 
 	@property
 	def years(self):
 		"""Года в файле
 
 		Returns:
-			list: итерируемый объект со всеми годами в файле
+			np.ndarray: итерируемый объект со всеми годами в файле
 		"""
-		return self.df['published_at'].apply(lambda x: x[:4]).unique()
+		return np.unique(self.df_years)
 
 	def write_chunks_to_csv(self):
 		"""Метод пробегается по списку и создаёт чанки с вакансиями по годам
 		"""
 		for year in self.years:
-			filtered_data = self.df[self.df['published_at'].str.contains(year)]
+			filtered_data = self.df[self.df_years == year]
 			file_name = '../chunks/vacancies_by_{0}.csv'.format(year)
 			filtered_data.to_csv(path_or_buf=file_name, index=False, encoding='utf-8-sig')
 
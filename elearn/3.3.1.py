@@ -2,6 +2,8 @@ import pandas as pd
 import xmltodict
 import grequests
 
+from elearn.dates import split_dates
+
 
 PATH_TO_INPUT_FILE = '../data/vacancies_dif_currencies.csv'
 PATH_TO_OUTPUT_FILE = '../data/currency_value.csv'
@@ -59,8 +61,10 @@ class Worker:
 		Returns:
 			 list: лист дат за каждый месяц за определённый период
 		"""
-		years_series = pd.to_datetime(self.data['published_at'].apply(lambda x: x[:10]))
-		return pd.date_range(start=str(years_series.min())[:10], end=str(years_series.max())[:10], freq='M').strftime('%Y-%m-%d').tolist()
+		years, months, days = split_dates(self.data['published_at'])
+		ordinals = years * 10000 + months * 100 + days
+		start, end = ['{0:04d}-{1:02d}-{2:02d}'.format(value // 10000, value // 100 % 100, value % 100) for value in (ordinals.min(), ordinals.max())]
+		return pd.date_range(start=start, end=end, freq='M').strftime('%Y-%m-%d').tolist()
 
 	def get_result_file(self):
 		"""Метод создаёт словарь, который представляет собой формат DataFrame, содержащий информацию
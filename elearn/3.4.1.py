@@ -1,19 +1,32 @@
+import sys
+
 import pandas as pd
 import numpy as np
 
+from elearn.conversion import CheckpointedConversion
+from elearn.parquet import is_available
+from elearn.quality import EMPTY_SALARY, MISSING_RATE, QualityReport
+
 
 PATH_TO_INPUT_FILE_1 = '../data/vacancies_dif_currencies.csv'
 PATH_TO_INPUT_FILE_2 = '../data/currency_value.csv'
 PATH_TO_OUTPUT_FILE = '../data/converted_vacancies_dif_currencies_full.csv'
+PATH_TO_PARQUET_FILE = '../data/converted_vacancies_dif_currencies_full.parquet'
+REJECT_SAMPLES = 5
 
 
 class Converter:
     """Класс для конвертирования в рубли оклада вакансий и
     преобразования столбцов salary_from, salary_to, salary_currency в 1 столбец ― salary
 
+    Исходный файл читается и преобразуется частями с контрольной точкой (elearn.conversion):
+    прерванный запуск продолжается с последнего готового сегмента, а чанки можно преобразовывать параллельно.
+    Если установлен pyarrow, результат дополнительно сохраняется в Parquet для 3.4.2 и 3.4.3
+
     Attributes:
-        source_file (DataFrame): исходная DataFrame-таблица, которую требуется преобразовать
+        file_to_convert (str): исходный CSV-файл, который требуется преобразовать
         exchange_rate (DataFrame): DataFrame-таблица, содержащая информацию из ЦентроБанка по стоимость валют с 2003 года
+        quality (QualityReport): счётчики строк, оставшихся без зарплаты, по причинам
     """
 
     def __init__(self, file_to_convert, exchange_rate):
@@ -23,33 +36,56 @@ class Converter:
             file_to_convert (str): Файл, который нужно преобразовать
             exchange_rate (str): Файл с валютой из прошлого задания
         """
-        self.source_file = pd.read_csv(file_to_convert)
+        self.file_to_convert = file_to_convert
         self.exchange_rate = pd.read_csv(exchange_rate)
+        self.quality = QualityReport(REJECT_SAMPLES)
 
-    def get_converted_dataframe(self, only_head=False):
+    def get_converted_dataframe(self, only_head=False, workers=1):
         """Конвертирует исходный CSV-файл и сохраняет его
 
         Arguments:
             only_head (bool): Флаг для вывода только первых 100 значений
+            workers (int): Сколько частей файла конвертировать параллельно
         """
-        df = self.source_file.copy()
         if only_head:
-            df = df.head(100)
-        df['salary'] = df.apply(lambda x: self.transform_row(x), axis=1)
-        df = df[['name', 'salary', 'area_name', 'published_at']]
-        df.to_csv(PATH_TO_OUTPUT_FILE, index=False)
+            df, quality = self.convert_chunk(pd.read_csv(self.file_to_convert, nrows=100))
+            df.to_csv(PATH_TO_OUTPUT_FILE, index=False)
+            self.quality.merge(quality)
+        else:
+            parquet_file = PATH_TO_PARQUET_FILE if is_available() else None
+            CheckpointedConversion(self.file_to_convert, PATH_TO_OUTPUT_FILE, self.convert_chunk, workers=workers, quality=self.quality, parquet_file=parquet_file).run()
+        print(self.quality)
+
+    def convert_chunk(self, df):
+        """Конвертирует часть исходной таблицы
+
+        Arguments:
+            df (DataFrame): часть исходной таблицы
+
+        Returns:
+            tuple[DataFrame, QualityReport]: таблица со столбцами name, salary, area_name, published_at и счётчики части
+        """
+        quality = QualityReport(REJECT_SAMPLES)
+        quality.rows = len(df)
+        df['salary'] = df.apply(lambda x: self.transform_row(x, quality), axis=1)
+        return df[['name', 'salary', 'area_name', 'published_at']], quality
 
-    def transform_row(self, row):
+    def transform_row(self, row, quality=None):
         """Преобразует ряд из исходного файла
 
         Arguments:
             row (Series): ряд таблицы
+            quality (QualityReport or None): куда записать причину, если зарплату не удалось посчитать
         """
         salary_from, salary_to, salary_currency = row['salary_from'], row['salary_to'], row['salary_currency']
         if np.isnan(salary_from) and np.isnan(salary_to) or pd.isnull(salary_currency):
+            if quality is not None:
+                quality.reject(EMPTY_SALARY, row.to_dict())
             return None
         exchange_value = self.get_converted_salary(row['published_at'], salary_currency)
         if not exchange_value:
+            if quality is not None:
+                quality.reject(MISSING_RATE, row.to_dict())
             return None
         salary_from = 0 if np.isnan(salary_from) else salary_from
         salary_to = 0 if np.isnan(salary_to) else salary_to
@@ -75,4 +111,4 @@ class Converter:
 
 if __name__ == '__main__':
     converter = Converter(PATH_TO_INPUT_FILE_1, PATH_TO_INPUT_FILE_2)
-    converter.get_converted_dataframe(only_head=False)
+    converter.get_converted_dataframe(only_head=False, workers=int(sys.argv[1]) if len(sys.argv) > 1 else 1)
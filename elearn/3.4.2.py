@@ -1,12 +1,22 @@
+import os
+
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+
+from elearn.datasource import Query, open_source
+from elearn.dates import split_dates
+from elearn.matching import NameMatcher
+from elearn.parquet import YEAR, is_available
+from elearn.pdf import PDFKIT, PdfDocument, check_backend, html_to_pdf
+from elearn.templating import get_template_renderer
 
 
 PATH_TO_INPUT_FILE = '../data/converted_vacancies_dif_currencies_full.csv'
-TEMPLATES = '../templates'
+PATH_TO_PARQUET_FILE = '../data/converted_vacancies_dif_currencies_full.parquet'
 TEMPLATE = 'template_3_4_2.html'
 VACANCY_NAME = 'Дизайнер'
+PDF_BACKEND = PDFKIT
+COLUMNS = ['name', 'salary', 'published_at']
+PARQUET_COLUMNS = ['name', 'salary', YEAR]
 
 
 class YearInformation:
@@ -27,7 +37,7 @@ class YearInformation:
             chosen_vacancy (str): название выбранной профессии
             year (int): год
         """
-        df_for_chosen_vacancy = df[df['name'].str.contains(chosen_vacancy, case=False)]
+        df_for_chosen_vacancy = df[NameMatcher(df['name']).get_mask(chosen_vacancy)]
 
         self.salary_average = round(df.apply(lambda x: x['salary'] / 2, axis=1).mean())
         self.salary_average_for_chosen_vacancy = round(df_for_chosen_vacancy.apply(lambda x: x['salary'] / 2, axis=1).mean())
@@ -48,10 +58,11 @@ class Analytic:
         """Метод инициализирует класс Analytic
 
         Params:
-            file_name (str): путь до файла до исходной CSV-таблицы
+            file_name (str): путь до исходной CSV-таблицы или её копии в Parquet, из которой год читается готовым
             chosen_vacancy (str): название выбранной вакансии
         """
-        self.df = pd.read_csv(file_name)
+        source = open_source(file_name)
+        self.df = source.read(Query(PARQUET_COLUMNS if YEAR in source.get_columns() else COLUMNS))
         self.chosen_vacancy = chosen_vacancy
 
     def get_file_analytic(self) -> list[YearInformation]:
@@ -60,19 +71,32 @@ class Analytic:
         Returns:
             list[YearInformation]: список экземпляров класса YearInformation
         """
-        self.df['year'] = self.df['published_at'].apply(lambda x: x[:4])
-        groups = self.df.groupby(['year'])
+        if YEAR not in self.df.columns:
+            self.df[YEAR] = split_dates(self.df['published_at'])[0]
+        groups = self.df.groupby('year')
         rows = [YearInformation(df, self.chosen_vacancy, year) for year, df in groups]
         return rows
 
-    def generate_pdf(self):
-        """Метод рендерит PDF отчёт из HTML шаблона и сохраняет его (отчёт)
+    def generate_pdf(self, backend=PDF_BACKEND):
+        """Метод рендерит PDF отчёт из HTML шаблона (pdfkit) или прямо в процессе (fpdf) и сохраняет его (отчёт)
+
+        Params:
+            backend (str): чем строить PDF: pdfkit или fpdf
         """
-        template = Environment(loader=FileSystemLoader(TEMPLATES)).get_template(TEMPLATE)
-        pdf_template = template.render({'name': self.chosen_vacancy, 'rows': self.get_file_analytic()})
-        pdfkit.from_string(pdf_template, 'report_3_4_2.pdf', options={"enable-local-file-access": ""})
+        check_backend(backend)
+        rows = self.get_file_analytic()
+        if backend != PDFKIT:
+            document = PdfDocument()
+            document.heading('Аналитика по зарплатам и городам для профессии ' + self.chosen_vacancy)
+            document.heading('Статистика по годам', 2)
+            document.table(['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.chosen_vacancy, 'Количество вакансий', 'Количество вакансий - ' + self.chosen_vacancy],
+                           [(row.year, row.salary_average, row.salary_average_for_chosen_vacancy, row.vacancy_count, row.chosen_vacancy_count) for row in rows])
+            document.save('report_3_4_2.pdf')
+            return
+        pdf_template = get_template_renderer().render(TEMPLATE, {'name': self.chosen_vacancy, 'rows': rows})
+        html_to_pdf(pdf_template, 'report_3_4_2.pdf')
 
 
 if __name__ == '__main__':
-    analytic = Analytic(PATH_TO_INPUT_FILE, VACANCY_NAME)
+    analytic = Analytic(PATH_TO_PARQUET_FILE if is_available() and os.path.exists(PATH_TO_PARQUET_FILE) else PATH_TO_INPUT_FILE, VACANCY_NAME)
     analytic.generate_pdf()
\ No newline at end of file
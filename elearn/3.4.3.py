@@ -1,13 +1,25 @@
+import os
+
+import numpy as np
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+
+from elearn.datasource import Query, open_source
+from elearn.dates import split_dates
+from elearn.encoding import MISSING, get_dictionary
+from elearn.matching import NameMatcher
+from elearn.parquet import YEAR, is_available
+from elearn.pdf import PDFKIT, PdfDocument, check_backend, html_to_pdf
+from elearn.templating import get_template_renderer
 
 
 PATH_TO_INPUT_FILE = '../data/converted_vacancies_dif_currencies_full.csv'
-TEMPLATES = '../templates'
+PATH_TO_PARQUET_FILE = '../data/converted_vacancies_dif_currencies_full.parquet'
+COLUMNS = ['name', 'salary', 'area_name', 'published_at']
+PARQUET_COLUMNS = ['name', 'salary', 'area_name', YEAR]
 TEMPLATE = 'template_3_4_3.html'
 VACANCY_NAME = 'Дизайнер'
 AREA_NAME = 'Москва'
+PDF_BACKEND = PDFKIT
 
 
 class Stats:
@@ -47,11 +59,12 @@ class Analytic:
         """Метод инициализирует класс Analytic
 
         Params:
-            file_name (str): путь до исходной CSV-таблицы
+            file_name (str): путь до исходной CSV-таблицы или её копии в Parquet, из которой год читается готовым
             vacancy_name (str): название выбранной вакансии
             area_name (str): выбранная территория, по которой будет осуществляться поиск
         """
-        self.df = pd.read_csv(file_name)
+        source = open_source(file_name)
+        self.df = source.read(Query(PARQUET_COLUMNS if YEAR in source.get_columns() else COLUMNS))
         self.chosen_vacancy = vacancy_name
         self.chosen_area_name = area_name
         self.stats = Stats(vacancy_name, area_name)
@@ -60,11 +73,20 @@ class Analytic:
         """Метод анализирует информацию по городам
         """
         rows = self.df.shape[0]
-        group = self.df.groupby(['area_name'])
+        areas = get_dictionary('area_name')
+        codes = areas.encode_array(self.df['area_name'])
+        salaries = self.df['salary'].to_numpy(dtype=float)
+        known, paid = codes != MISSING, (codes != MISSING) & ~np.isnan(salaries)
+        counts = np.bincount(codes[known], minlength=len(areas))
+        salary_sums = np.bincount(codes[paid], weights=salaries[paid], minlength=len(areas))
+        salary_counts = np.bincount(codes[paid], minlength=len(areas))
+        # города упорядочены по названию, как группы groupby, чтобы при равных значениях порядок не менялся
+        cities = sorted(np.flatnonzero(counts).tolist(), key=areas.decode)
         new_df = pd.DataFrame()
-        new_df['freq'] = [value.shape[0] / rows for area_name, value in group]
-        new_df['city'] = [area_name for area_name, value in group]
-        new_df['salary'] = [value['salary'].mean() for area_name, value in group]
+        new_df['freq'] = counts[cities] / rows
+        new_df['city'] = areas.decode_array(cities)
+        with np.errstate(invalid='ignore'):
+            new_df['salary'] = salary_sums[cities] / salary_counts[cities]
         new_df = new_df[new_df['freq'] >= 0.01]
         new_df1 = new_df.sort_values(by=['salary'], ascending=False)[['city', 'salary']].head(10)
         self.stats.salaries = [(a['city'], round(a['salary'])) for index, a in new_df1.iterrows()]
@@ -74,9 +96,10 @@ class Analytic:
     def analyze_chosen_vacancies(self):
         """Метод анализирует информацию по выбранной профессии в выбранном регионе
         """
-        data = self.df[(self.df['area_name'] == self.chosen_area_name) & (self.df['name'].str.contains(self.chosen_vacancy, case=False))]
-        data['year'] = data['published_at'].apply(lambda x: x[:4])
-        groups = data.groupby(['year'])
+        data = self.df[(self.df['area_name'] == self.chosen_area_name) & NameMatcher(self.df['name']).get_mask(self.chosen_vacancy)]
+        if YEAR not in data.columns:
+            data = data.assign(**{YEAR: split_dates(data['published_at'])[0]})
+        groups = data.groupby('year')
         for year, df in groups:
             self.stats.chosen.append({
                 'year': year,
@@ -84,16 +107,29 @@ class Analytic:
                 'count': df.shape[0]
             })
 
-    def generate_pdf(self):
-        """Метод генерирует PDF-отчёт из HTML шаблона, приготовленного заранее
+    def generate_pdf(self, backend=PDF_BACKEND):
+        """Метод генерирует PDF-отчёт из HTML шаблона, приготовленного заранее (pdfkit), или прямо в процессе (fpdf)
+
+        Params:
+            backend (str): чем строить PDF: pdfkit или fpdf
         """
-        template = Environment(loader=FileSystemLoader(TEMPLATES)).get_template(TEMPLATE)
-        pdf_template = template.render({'stats': self.stats})
-        pdfkit.from_string(pdf_template, 'report_3_4_3.pdf', options={"enable-local-file-access": ""})
+        check_backend(backend)
+        if backend != PDFKIT:
+            document = PdfDocument()
+            document.heading('Аналитика для профессии «{0}»'.format(self.stats.chosen_vacancy))
+            document.heading('Статистика по всем городам', 2)
+            document.tables([(['Город', 'Средняя зарплата, руб.'], self.stats.salaries),
+                             (['Город', 'Доля вакансий по городу'], self.stats.frequencies)])
+            document.heading('Средняя зарплата и количество вакансий по профессии «{0}» по городу {1}'.format(self.stats.chosen_vacancy, self.stats.area_name), 2)
+            document.table(['Год', 'Средняя зарплата', 'Количество вакансий'], [(row['year'], row['salary'], row['count']) for row in self.stats.chosen])
+            document.save('report_3_4_3.pdf')
+            return
+        pdf_template = get_template_renderer().render(TEMPLATE, {'stats': self.stats})
+        html_to_pdf(pdf_template, 'report_3_4_3.pdf')
 
 
 if __name__ == '__main__':
-    analytic = Analytic(PATH_TO_INPUT_FILE, VACANCY_NAME, AREA_NAME)
+    analytic = Analytic(PATH_TO_PARQUET_FILE if is_available() and os.path.exists(PATH_TO_PARQUET_FILE) else PATH_TO_INPUT_FILE, VACANCY_NAME, AREA_NAME)
     analytic.analyze_chosen_vacancies()
     analytic.analyze_cities()
     analytic.generate_pdf()
\ No newline at end of file
@@ -1,20 +1,24 @@
-import sqlite3
 import pandas as pd
 
+from elearn.datasource import SqliteSource
+from elearn.matching import normalize
+
 
 DATABASE = '../database/database.db'
 VACANCY = 'Аналитик'
 
 
 if __name__ == '__main__':
-    conn = sqlite3.connect(DATABASE)
+    # соединение источника регистрирует normalize: профессия ищется так же, как в остальных источниках,
+    # а не через LIKE, который не различает регистр только для латиницы
+    conn = SqliteSource(DATABASE).connect()
 
     total_vacancies = conn.execute("SELECT COUNT(*) FROM `vacancies`").fetchone()[0]
 
-    df1 = pd.read_sql("SELECT ROUND(AVG(salary)) as average, strftime('%Y', published_at) as year FROM `vacancies` GROUP BY year", conn)
-    df2 = pd.read_sql("SELECT COUNT(*) as count_of_vacancies, strftime('%Y', published_at) as year FROM `vacancies` GROUP BY year", conn)
-    df3 = pd.read_sql("SELECT ROUND(AVG(salary)) as average, strftime('%Y', published_at) as year FROM `vacancies` WHERE `name` LIKE \"%{0}%\" GROUP BY year".format(VACANCY), conn)
-    df4 = pd.read_sql("SELECT COUNT(*) as count_of_vacancies, strftime('%Y', published_at) as year FROM `vacancies` WHERE `name` LIKE \"%{0}%\" GROUP BY year".format(VACANCY), conn)
+    df1 = pd.read_sql("SELECT ROUND(AVG(salary)) as average, CAST(substr(published_at, 1, 4) AS INTEGER) as year FROM `vacancies` GROUP BY year", conn)
+    df2 = pd.read_sql("SELECT COUNT(*) as count_of_vacancies, CAST(substr(published_at, 1, 4) AS INTEGER) as year FROM `vacancies` GROUP BY year", conn)
+    df3 = pd.read_sql("SELECT ROUND(AVG(salary)) as average, CAST(substr(published_at, 1, 4) AS INTEGER) as year FROM `vacancies` WHERE instr(normalize(name), ?) > 0 GROUP BY year", conn, params=(normalize(VACANCY),))
+    df4 = pd.read_sql("SELECT COUNT(*) as count_of_vacancies, CAST(substr(published_at, 1, 4) AS INTEGER) as year FROM `vacancies` WHERE instr(normalize(name), ?) > 0 GROUP BY year", conn, params=(normalize(VACANCY),))
     df5 = pd.read_sql("SELECT ROUND(AVG(salary)) as average, area_name, COUNT(*) as count_of_vacancies FROM `vacancies` GROUP BY area_name HAVING count_of_vacancies > {0} ORDER BY average DESC LIMIT 10".format(round(total_vacancies * 0.01)), conn)
     df6 = pd.read_sql("SELECT area_name, COUNT(*) / {0}.0 as frequency FROM `vacancies` GROUP BY area_name ORDER BY frequency DESC LIMIT 10".format(total_vacancies), conn)
 
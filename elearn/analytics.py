@@ -0,0 +1,633 @@
+import atexit
+import concurrent.futures
+import io
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from elearn.datasource import CsvSource, PartitionedCsvSource, Query
+from elearn.dates import split_dates
+from elearn.matching import NameMatcher
+
+
+COLUMNS = ['name', 'salary_from', 'salary_to', 'published_at']
+AREA_COLUMNS = COLUMNS + ['area_name']
+FIELDS = ('year', 'salary_sum', 'salary_count', 'count', 'vacancy_salary_sum', 'vacancy_salary_count', 'vacancy_count')
+
+
+class ChunkTask:
+    """Класс ― небольшое описание задачи для воркера, которое дёшево передаётся в другой процесс
+
+    Attributes:
+        path (str): путь до CSV-чанка
+        vacancy_name (str): название выбранной вакансии
+    """
+    __slots__ = ('path', 'vacancy_name')
+
+    def __init__(self, path, vacancy_name):
+        """Инициализирует объект ChunkTask
+
+        Params:
+            path (str): путь до CSV-чанка
+            vacancy_name (str): название выбранной вакансии
+        """
+        self.path = path
+        self.vacancy_name = vacancy_name
+
+    @classmethod
+    def from_directory(cls, directory_name, vacancy_name):
+        """Создаёт по задаче на каждый CSV-файл в директории
+
+        Params:
+            directory_name (str): название директории с csv-файлами
+            vacancy_name (str): название выбранной вакансии
+
+        Returns:
+            list[ChunkTask]: список задач
+        """
+        return [cls(path, vacancy_name) for path in PartitionedCsvSource(directory_name).get_partitions()]
+
+
+def aggregate_frame(data, vacancy_name):
+    """Считает суммируемые агрегаты (суммы и количества) по годам для одной таблицы
+
+    Params:
+        data (DataFrame): таблица со столбцами name, salary_from, salary_to, published_at
+        vacancy_name (str): название выбранной вакансии
+
+    Returns:
+        np.ndarray: массив формы (количество годов, len(FIELDS)), столбцы перечислены в FIELDS
+    """
+    average = data[['salary_from', 'salary_to']].mean(axis=1)
+    is_vacancy = pd.Series(NameMatcher(data['name']).get_mask(vacancy_name), index=data.index)
+    frame = pd.DataFrame({
+        'year': split_dates(data['published_at'])[0],
+        'salary': average,
+        'vacancy_salary': average.where(is_vacancy),
+        'vacancy': is_vacancy.astype(int),
+    })
+    groups = frame.groupby('year')
+    return np.column_stack([
+        groups.size().index.to_numpy(),
+        groups['salary'].sum().to_numpy(),
+        groups['salary'].count().to_numpy(),
+        groups.size().to_numpy(),
+        groups['vacancy_salary'].sum().to_numpy(),
+        groups['vacancy_salary'].count().to_numpy(),
+        groups['vacancy'].sum().to_numpy(),
+    ]).astype(np.float64)
+
+
+def analyze_chunk(task):
+    """Функция-воркер: читает один CSV-чанк и возвращает его агрегаты
+
+    Params:
+        task (ChunkTask): описание задачи
+
+    Returns:
+        np.ndarray: агрегаты чанка в формате aggregate_frame
+    """
+    data = CsvSource(task.path).read(Query(COLUMNS))
+    return aggregate_frame(data, task.vacancy_name)
+
+
+def analyze_chunk_content(task, content):
+    """Функция-воркер для гибридного режима: разбирает уже прочитанное содержимое CSV-чанка
+
+    Params:
+        task (ChunkTask): описание задачи
+        content (bytes): содержимое файла task.path
+
+    Returns:
+        np.ndarray: агрегаты чанка в формате aggregate_frame
+    """
+    data = pd.read_csv(io.BytesIO(content), usecols=COLUMNS)
+    return aggregate_frame(data, task.vacancy_name)
+
+
+def read_content(task):
+    """Читает содержимое CSV-чанка целиком
+
+    Params:
+        task (ChunkTask): описание задачи
+
+    Returns:
+        bytes: содержимое файла
+    """
+    with open(task.path, mode='rb') as file:
+        return file.read()
+
+
+def merge_aggregates(parts):
+    """Сливает агрегаты нескольких чанков (или частей одного чанка) в один массив
+
+    >>> merge_aggregates([np.array([[2020, 10, 1, 1, 0, 0, 0]]), np.array([[2020, 30, 1, 2, 30, 1, 1], [2019, 5, 1, 1, 0, 0, 0]])]).astype(int).tolist()
+    [[2019, 5, 1, 1, 0, 0, 0], [2020, 40, 2, 3, 30, 1, 1]]
+
+    Params:
+        parts (Iterable[np.ndarray]): агрегаты в формате aggregate_frame
+
+    Returns:
+        np.ndarray: агрегаты, просуммированные по годам и отсортированные по году
+    """
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return np.empty((0, len(FIELDS)))
+    stacked = np.concatenate(parts)
+    years, inverse = np.unique(stacked[:, 0], return_inverse=True)
+    merged = np.zeros((len(years), len(FIELDS)))
+    merged[:, 0] = years
+    np.add.at(merged[:, 1:], inverse, stacked[:, 1:])
+    return merged
+
+
+def aggregates_to_rows(merged):
+    """Переводит слитые агрегаты в строки аналитики (год, средние зарплаты, количества)
+
+    >>> aggregates_to_rows(np.array([[2020, 40, 2, 3, 30, 1, 1], [2021, 9, 3, 3, 0, 0, 0]]))
+    [(2020, 20, 30, 3, 1), (2021, 3, 0, 3, 0)]
+
+    Params:
+        merged (np.ndarray): агрегаты в формате merge_aggregates
+
+    Returns:
+        list[tuple]: год, средняя зарплата, средняя зарплата по вакансии, количество вакансий, количество по вакансии
+    """
+    rows = []
+    for year, salary_sum, salary_count, count, vacancy_sum, vacancy_salary_count, vacancy_count in merged:
+        rows.append((
+            int(year),
+            round(salary_sum / salary_count) if salary_count else 0,
+            round(vacancy_sum / vacancy_salary_count) if vacancy_salary_count else 0,
+            int(count),
+            int(vacancy_count),
+        ))
+    return rows
+
+
+def group_weights(data, vacancy_name):
+    """Считает построчные слагаемые для всех суммируемых полей, кроме года
+
+    Params:
+        data (DataFrame): таблица со столбцами name, salary_from, salary_to
+        vacancy_name (str): название выбранной вакансии
+
+    Returns:
+        list[np.ndarray]: по массиву на каждое поле FIELDS[1:]
+    """
+    average = data[['salary_from', 'salary_to']].mean(axis=1).to_numpy()
+    has_salary = ~np.isnan(average)
+    is_vacancy = NameMatcher(data['name']).get_mask(vacancy_name)
+    salary = np.where(has_salary, average, 0)
+    return [salary, has_salary, np.ones(len(data)), salary * is_vacancy, has_salary & is_vacancy, is_vacancy]
+
+
+def scan_groups(tasks):
+    """Собирает диапазон годов и список территорий, читая из чанков только два столбца
+
+    Params:
+        tasks (list[ChunkTask]): задачи по чанкам
+
+    Returns:
+        tuple[range, list[str]]: диапазон годов и отсортированный список территорий
+    """
+    years, areas = set(), set()
+    for task in tasks:
+        data = CsvSource(task.path).read(Query(['area_name', 'published_at']))
+        years.update(np.unique(split_dates(data['published_at'])[0]).tolist())
+        areas.update(data['area_name'].dropna().unique().tolist())
+    return range(min(years), max(years) + 1), sorted(areas)
+
+
+class SharedAggregates:
+    """Класс держит агрегаты воркеров в shared_memory, чтобы не передавать результаты через pickle
+
+    Буфер имеет форму (воркер, год, территория, поле): каждый воркер получает свой срез и суммирует в него
+    агрегаты всех своих задач, а родительский процесс сворачивает срезы прямо в общей памяти.
+    Последний индекс территории зарезервирован под территории, которых нет в списке.
+
+    Attributes:
+        years (range): непрерывный диапазон годов, год переводится в индекс вычитанием первого года
+        areas (list[str]): список территорий, индекс в списке ― плотный идентификатор территории
+        shape (tuple[int]): форма буфера
+        memory (SharedMemory): блок общей памяти
+        array (np.ndarray): представление буфера без копирования
+        counter (multiprocessing.Value): счётчик для выдачи срезов воркерам
+    """
+    def __init__(self, workers, years, areas):
+        """Инициализирует объект SharedAggregates и выделяет общую память
+
+        Params:
+            workers (int): количество воркеров
+            years (range): непрерывный диапазон годов
+            areas (list[str]): список территорий
+        """
+        self.years = years
+        self.areas = list(areas)
+        self.shape = (workers, len(years), len(self.areas) + 1, len(FIELDS) - 1)
+        self.memory = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)) * 8)
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.memory.buf)
+        self.array.fill(0)
+        self.counter = mp.Value('i', 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def initargs(self):
+        """Аргументы для init_shared_worker
+
+        Returns:
+            tuple: имя блока памяти, форма, счётчик, первый год и словарь идентификаторов территорий
+        """
+        return self.memory.name, self.shape, self.counter, self.years[0], {area: index for index, area in enumerate(self.areas)}
+
+    def reduce(self):
+        """Сворачивает срезы всех воркеров
+
+        Returns:
+            np.ndarray: массив формы (год, территория, поле)
+        """
+        return self.array.sum(axis=0)
+
+    def by_year(self):
+        """Агрегаты по годам в формате merge_aggregates
+
+        Returns:
+            np.ndarray: по строке на год, в котором встретилась хотя бы одна вакансия
+        """
+        totals = self.reduce().sum(axis=1)
+        merged = np.column_stack([np.array(self.years, dtype=np.float64), totals])
+        return merged[totals[:, 2] > 0]
+
+    def by_area(self):
+        """Агрегаты по территориям за все года
+
+        Returns:
+            dict[str, np.ndarray]: агрегаты FIELDS[1:] для каждой встретившейся территории
+        """
+        totals = self.reduce().sum(axis=0)
+        return {area: totals[index] for index, area in enumerate(self.areas + [None]) if totals[index, 2] > 0}
+
+    def close(self):
+        """Освобождает общую память"""
+        del self.array
+        self.memory.close()
+        self.memory.unlink()
+
+
+_shared = {}
+
+
+def init_shared_worker(name, shape, counter, year_base, area_codes):
+    """Инициализатор воркера: запоминает блок общей памяти и забирает номер своего среза буфера
+
+    Сам блок подключается только на время записи результата задачи: пул завершает воркеры через terminate,
+    поэтому открытый на всё время жизни воркера дескриптор некому было бы закрыть
+
+    Params:
+        name (str): имя блока общей памяти
+        shape (tuple[int]): форма буфера
+        counter (multiprocessing.Value): счётчик срезов
+        year_base (int): первый год диапазона
+        area_codes (dict[str, int]): идентификаторы территорий
+    """
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    _shared['name'] = name
+    _shared['shape'] = shape
+    _shared['slot'] = slot
+    _shared['year_base'] = year_base
+    _shared['area_codes'] = area_codes
+
+
+def analyze_chunk_shared(task):
+    """Функция-воркер: суммирует агрегаты чанка по (год, территория) в свой срез общей памяти
+
+    Params:
+        task (ChunkTask): описание задачи
+
+    Returns:
+        int: количество обработанных строк
+    """
+    data = CsvSource(task.path).read(Query(AREA_COLUMNS))
+    workers, years, areas, fields = _shared['shape']
+    year_ids = split_dates(data['published_at'])[0] - _shared['year_base']
+    area_ids = data['area_name'].map(_shared['area_codes']).fillna(areas - 1).astype(int).to_numpy()
+    group_ids = year_ids * areas + area_ids
+    sums = np.column_stack([np.bincount(group_ids, weights=weights, minlength=years * areas) for weights in group_weights(data, task.vacancy_name)])
+    memory = shared_memory.SharedMemory(name=_shared['name'])
+    try:
+        # представление буфера не сохраняется в переменную, иначе close упадёт с BufferError
+        np.ndarray(_shared['shape'], dtype=np.float64, buffer=memory.buf)[_shared['slot']] += sums.reshape(years, areas, fields)
+    finally:
+        memory.close()
+    return len(data)
+
+
+def analyze_chunk_by_area(task):
+    """Функция-воркер для сравнения: возвращает агрегаты по (год, территория) pandas-таблицей через pickle
+
+    Params:
+        task (ChunkTask): описание задачи
+
+    Returns:
+        DataFrame: агрегаты FIELDS[1:] с индексом (year, area_name)
+    """
+    data = CsvSource(task.path).read(Query(AREA_COLUMNS))
+    frame = pd.DataFrame(dict(zip(FIELDS[1:], group_weights(data, task.vacancy_name))))
+    frame['year'] = split_dates(data['published_at'])[0]
+    frame['area_name'] = data['area_name']
+    return frame.groupby(['year', 'area_name']).sum()
+
+
+def analyze_shared(tasks, processes=4, years=None, areas=None):
+    """Обрабатывает чанки пулом процессов, обмениваясь результатами через общую память
+
+    Params:
+        tasks (list[ChunkTask]): задачи по чанкам
+        processes (int): количество процессов
+        years (range or None): диапазон годов, если не задан ― собирается scan_groups
+        areas (list[str] or None): список территорий, если не задан ― собирается scan_groups
+
+    Returns:
+        tuple[np.ndarray, dict[str, np.ndarray]]: агрегаты по годам и по территориям
+    """
+    if years is None or areas is None:
+        years, areas = scan_groups(tasks)
+    with SharedAggregates(processes, years, areas) as aggregates:
+        with mp.Pool(processes, initializer=init_shared_worker, initargs=aggregates.initargs) as pool:
+            pool.map(analyze_chunk_shared, tasks)
+        return aggregates.by_year(), aggregates.by_area()
+
+
+def compare_exchange(tasks, processes=4, repeat=3):
+    """Замеряет обмен результатами через pickle pandas-таблиц и через общую память
+
+    Params:
+        tasks (list[ChunkTask]): задачи по чанкам
+        processes (int): количество процессов
+        repeat (int): количество повторов, берётся лучшее время
+
+    Returns:
+        dict[str, float]: лучшее время в секундах для каждого способа
+    """
+    years, areas = scan_groups(tasks)
+    timings = {'pickle': float('inf'), 'shared_memory': float('inf')}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with mp.Pool(processes) as pool:
+            pd.concat(pool.map(analyze_chunk_by_area, tasks)).groupby(level=[0, 1]).sum()
+        timings['pickle'] = min(timings['pickle'], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        analyze_shared(tasks, processes, years, areas)
+        timings['shared_memory'] = min(timings['shared_memory'], time.perf_counter() - start)
+    return timings
+
+
+_pools = {}
+
+
+def get_pool(processes=None):
+    """Возвращает постоянный пул процессов multiprocessing, переиспользуемый между запросами
+
+    Params:
+        processes (int or None): количество процессов
+
+    Returns:
+        multiprocessing.pool.Pool: пул процессов
+    """
+    key = ('multiprocessing', processes)
+    if key not in _pools:
+        _pools[key] = mp.Pool(processes)
+    return _pools[key]
+
+
+def get_executor(max_workers=None, threads=False):
+    """Возвращает постоянный пул concurrent.futures, переиспользуемый между запросами
+
+    Params:
+        max_workers (int or None): количество процессов или потоков
+        threads (bool): вернуть пул потоков вместо пула процессов
+
+    Returns:
+        concurrent.futures.Executor: пул процессов или потоков
+    """
+    key = ('threads' if threads else 'futures', max_workers)
+    if key not in _pools:
+        executor_class = concurrent.futures.ThreadPoolExecutor if threads else concurrent.futures.ProcessPoolExecutor
+        _pools[key] = executor_class(max_workers)
+    return _pools[key]
+
+
+@atexit.register
+def shutdown_pools():
+    """Закрывает все постоянные пулы"""
+    for (kind, _), pool in list(_pools.items()):
+        if kind == 'multiprocessing':
+            pool.close()
+            pool.join()
+        else:
+            pool.shutdown()
+    _pools.clear()
+
+
+class SerialExecutor:
+    """Последовательная обработка чанков в текущем процессе
+
+    Attributes:
+        workers (int): не используется, оставлен для единого интерфейса
+        persistent (bool): не используется, оставлен для единого интерфейса
+    """
+    def __init__(self, workers=None, persistent=False):
+        """Инициализирует исполнителя
+
+        Params:
+            workers (int or None): количество воркеров
+            persistent (bool): переиспользовать ли пул между вызовами
+        """
+        self.workers = workers
+        self.persistent = persistent
+
+    def map(self, tasks):
+        """Обрабатывает чанки и возвращает их агрегаты
+
+        Params:
+            tasks (list[ChunkTask]): задачи по чанкам
+
+        Returns:
+            list[np.ndarray]: агрегаты каждого чанка
+        """
+        return [analyze_chunk(task) for task in tasks]
+
+
+class ThreadExecutor(SerialExecutor):
+    """Обработка чанков пулом потоков: чтение файлов одного потока перекрывается разбором в другом"""
+    def map(self, tasks):
+        if self.persistent:
+            return list(get_executor(self.workers, threads=True).map(analyze_chunk, tasks))
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as executor:
+            return list(executor.map(analyze_chunk, tasks))
+
+
+class MultiprocessingExecutor(SerialExecutor):
+    """Обработка чанков пулом процессов multiprocessing"""
+    def map(self, tasks):
+        if self.persistent:
+            return get_pool(self.workers).map(analyze_chunk, tasks)
+        with mp.Pool(self.workers) as pool:
+            return pool.map(analyze_chunk, tasks)
+
+
+class ProcessExecutor(SerialExecutor):
+    """Обработка чанков пулом процессов concurrent.futures"""
+    def map(self, tasks):
+        if self.persistent:
+            return list(get_executor(self.workers).map(analyze_chunk, tasks))
+        with concurrent.futures.ProcessPoolExecutor(self.workers) as executor:
+            return list(executor.map(analyze_chunk, tasks))
+
+
+class HybridExecutor(SerialExecutor):
+    """Гибридная обработка: потоки заранее читают байты файлов, а процессы их разбирают
+
+    Разбор чанка отправляется в пул процессов сразу, как только поток дочитал файл,
+    поэтому чтение следующих файлов идёт параллельно с разбором предыдущих.
+    """
+    def map(self, tasks):
+        if self.persistent:
+            return self.run(get_executor(self.workers, threads=True), get_executor(self.workers), tasks)
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as readers:
+            with concurrent.futures.ProcessPoolExecutor(self.workers) as parsers:
+                return self.run(readers, parsers, tasks)
+
+    @staticmethod
+    def run(readers, parsers, tasks):
+        """Связывает пул чтения и пул разбора
+
+        Params:
+            readers (concurrent.futures.Executor): пул потоков для чтения файлов
+            parsers (concurrent.futures.Executor): пул процессов для разбора
+            tasks (list[ChunkTask]): задачи по чанкам
+
+        Returns:
+            list[np.ndarray]: агрегаты каждого чанка в порядке задач
+        """
+        reads = {readers.submit(read_content, task): index for index, task in enumerate(tasks)}
+        parses = {}
+        for future in concurrent.futures.as_completed(reads):
+            index = reads[future]
+            parses[index] = parsers.submit(analyze_chunk_content, tasks[index], future.result())
+        return [parses[index].result() for index in range(len(tasks))]
+
+
+EXECUTORS = {
+    'serial': SerialExecutor,
+    'threads': ThreadExecutor,
+    'multiprocessing': MultiprocessingExecutor,
+    'processes': ProcessExecutor,
+    'hybrid': HybridExecutor,
+}
+
+
+class Analytics:
+    """Класс Analytics предоставляет методы для сбора информации из csv-файлов
+
+    Attributes:
+        __directory_name__ (str): Название директории с csv-файлами
+        __vacancy_name__ (str): Название вакансии
+        executor (SerialExecutor): Исполнитель, которым обрабатываются чанки
+        analyzed_data list[tuple]: Список кортежей с сырыми данными
+        area_data (dict[str, np.ndarray]): Агрегаты по территориям, заполняются при обмене через общую память
+        files (list[str]): Лист со всеми CSV-чанками
+    """
+    def __init__(self, directory_name, vacancy_name, executor='processes', workers=4, persistent=False):
+        """Инициализирует объект Analytics
+
+        Params:
+            directory_name (str): Название директории с csv-файлами
+            vacancy_name (str): Название вакансии
+            executor (str): Способ обработки чанков, один из ключей EXECUTORS
+            workers (int): Количество потоков или процессов
+            persistent (bool): Переиспользовать ли пул между вызовами get_files_analytics
+        """
+        if executor not in EXECUTORS:
+            raise ValueError('Неизвестный исполнитель «{0}», доступны: {1}'.format(executor, ', '.join(EXECUTORS)))
+        self.__directory_name__ = directory_name
+        self.__vacancy_name__ = vacancy_name
+        self.executor = EXECUTORS[executor](workers, persistent)
+        self.analyzed_data = []
+        self.area_data = {}
+        self.files = [os.path.basename(path) for path in PartitionedCsvSource(self.__directory_name__).get_partitions()]
+
+    def get_files_analytics(self, use_shared_memory=False):
+        """Анализирует все файлы из директории и сохраняет в поле analyzed_data
+
+        В воркеры передаются только небольшие ChunkTask, а обратно возвращаются суммы и количества по годам,
+        которые затем сливаются в родительском процессе
+
+        Params:
+            use_shared_memory (bool): обмениваться ли результатами через общую память пула multiprocessing,
+                тогда дополнительно заполняется поле area_data с агрегатами по территориям
+        """
+        tasks = self.get_tasks()
+        if use_shared_memory:
+            by_year, self.area_data = analyze_shared(tasks, self.executor.workers)
+            self.analyzed_data = aggregates_to_rows(by_year)
+        else:
+            self.analyzed_data = aggregates_to_rows(merge_aggregates(self.executor.map(tasks)))
+
+    def get_tasks(self):
+        """Возвращает описания задач по всем файлам директории
+
+        Returns:
+            list[ChunkTask]: по задаче на каждый CSV-чанк
+        """
+        return [ChunkTask('{0}/{1}'.format(self.__directory_name__, file_name), self.__vacancy_name__) for file_name in self.files]
+
+    def get_chunk_analytic(self, file_name):
+        """Возвращает суммируемые параметры аналитики одного файла
+
+        Attributes:
+            file_name (str): Название csv-файла
+
+        Returns:
+            np.ndarray: по строке на год со столбцами FIELDS
+        """
+        return analyze_chunk(ChunkTask('{0}/{1}'.format(self.__directory_name__, file_name), self.__vacancy_name__))
+
+    def get_converted_data(self):
+        """Берет сырые данные из поля analyzed_data и разбивает их на словари
+        В словаре ключ - год, значение параметр аналитики (средняя зарплата, количество вакансий и т.д.)
+
+        Returns:
+            salary (dict): Средняя зарплата по годам
+            vacancies_amount (dict): Количество вакансий по годам
+            this_vacancy_salary (dict): Средняя зарплата для выбранной вакансии по годам
+            vacancy_amount (dict): Количество вакансий для выбранной вакансии по годам
+        """
+        salary, vacancies_amount, this_vacancy_salary, vacancy_amount = {}, {}, {}, {}
+        for year, avg_salary, this_avg_salary, amount, this_vacancy_amount in self.analyzed_data:
+            salary[year] = avg_salary
+            vacancies_amount[year] = amount
+            this_vacancy_salary[year] = this_avg_salary
+            vacancy_amount[year] = this_vacancy_amount
+        return salary, vacancies_amount, this_vacancy_salary, vacancy_amount
+
+    def print_data(self):
+        """Берет конвертированные данные из метода get_converted_data и печатает их
+        """
+        salary, vacancies_amount, this_vacancy_salary, this_vacancy_amount = self.get_converted_data()
+        print('Динамика уровня зарплат по годам: {0}'.format(salary))
+        print('Динамика количества вакансий по годам: {0}'.format(vacancies_amount))
+        print('Динамика уровня зарплат по годам для выбранной профессии: {0}'.format(this_vacancy_salary))
+        print('Динамика количества вакансий по годам для выбранной профессии: {0}'.format(this_vacancy_amount))
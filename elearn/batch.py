@@ -0,0 +1,161 @@
+import concurrent.futures
+import os
+import sys
+import time
+import unicodedata
+
+from elearn.pdf import PDFKIT
+from elearn.report import DataSet, Report, make_report_stats
+from elearn.templating import get_template_renderer
+
+
+FILE_NAME = '../data/vacancies_by_year.csv'
+OUTPUT_DIRECTORY = '../reports'
+VACANCY_NAMES = ['Программист', 'Аналитик', 'Дизайнер', 'Менеджер', 'Инженер']
+ARTIFACTS = ('excel', 'image', 'pdf')
+
+
+def get_report_directory(output_dir, vacancy_name):
+    """Директория отчётов профессии, которая гарантированно лежит внутри output_dir
+
+    Название профессии приходит от пользователя, в том числе по сети, поэтому из него делается безопасное имя:
+    разделители путей (os.sep и os.altsep) и управляющие символы заменяются на _, пробелы по краям убираются
+
+    >>> get_report_directory('reports', 'Программист/C++') == os.path.join(os.path.abspath('reports'), 'Программист_C++')
+    True
+    >>> get_report_directory('reports', '..')
+    Traceback (most recent call last):
+    ...
+    ValueError: Недопустимое название профессии для директории: '..'
+
+    Params:
+        output_dir (str): директория для отчётов
+        vacancy_name (str): название профессии
+
+    Returns:
+        str: абсолютный путь до директории профессии
+
+    Raises:
+        ValueError: если название ― . или .. либо путь всё равно выходит за пределы output_dir
+    """
+    separators = {os.sep, os.altsep} - {None}
+    name = ''.join('_' if char in separators or unicodedata.category(char).startswith('C') else char for char in vacancy_name).strip() or '_'
+    root = os.path.abspath(output_dir)
+    directory = os.path.abspath(os.path.join(root, name))
+    if name in ('.', '..') or os.path.dirname(directory) != root:
+        raise ValueError('Недопустимое название профессии для директории: {0!r}'.format(vacancy_name))
+    return directory
+
+
+def render_profession(snapshot, output_dir, city_image, artifacts=ARTIFACTS, pdf_backend=PDFKIT):
+    """Функция-воркер: строит отчёты одной профессии в её директорию
+
+    Params:
+        snapshot (ReportStats): неизменяемый снимок статистики профессии
+        output_dir (str): директория профессии
+        city_image (np.ndarray): заранее отрисованная общая для всех профессий половина графика по городам
+        artifacts (Iterable[str]): какие отчёты строить: excel, image, pdf
+        pdf_backend (str): чем строить PDF: pdfkit или fpdf
+
+    Returns:
+        str: название профессии
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    report = Report(*snapshot, output_dir=output_dir)
+    if 'excel' in artifacts:
+        report.generate_excel()
+    if 'image' in artifacts:
+        report.generate_image(city_image)
+    if 'pdf' in artifacts:
+        report.generate_pdf(backend=pdf_backend)
+    return snapshot.vacancy_name
+
+
+class BatchReport:
+    """Класс строит отчёты сразу для нескольких профессий, выполняя общую работу один раз
+
+    Файл читается за один проход сразу для всех профессий, графики по городам не зависят от профессии
+    и рисуются один раз, а отчёты профессий строятся параллельно в пуле процессов.
+
+    Attributes:
+        file_name (str): путь до CSV-файла с вакансиями
+        vacancy_names (list[str]): названия профессий
+        output_dir (str): директория, в которой для каждой профессии создаётся своя поддиректория
+        directories (dict[str, str]): директория отчётов каждой профессии
+        max_workers (int or None): количество процессов
+        artifacts (tuple[str]): какие отчёты строить
+        pdf_backend (str): чем строить PDF: pdfkit или fpdf
+        elapsed (float): время последнего запуска в секундах
+    """
+    def __init__(self, file_name, vacancy_names, output_dir, max_workers=None, artifacts=ARTIFACTS, pdf_backend=PDFKIT):
+        """Инициализирует объект BatchReport
+
+        Params:
+            file_name (str): путь до CSV-файла с вакансиями
+            vacancy_names (Iterable[str]): названия профессий
+            output_dir (str): директория для отчётов
+            max_workers (int or None): количество процессов
+            artifacts (Iterable[str]): какие отчёты строить: excel, image, pdf
+            pdf_backend (str): чем строить PDF: pdfkit или fpdf
+
+        Raises:
+            ValueError: если не передано ни одной профессии или название нельзя превратить в директорию
+        """
+        self.file_name = file_name
+        self.vacancy_names = list(dict.fromkeys(vacancy_names))
+        if not self.vacancy_names:
+            raise ValueError('Не указано ни одной профессии для отчётов')
+        self.output_dir = output_dir
+        self.directories = {vacancy_name: self.get_directory(vacancy_name) for vacancy_name in self.vacancy_names}
+        self.max_workers = max_workers
+        self.artifacts = tuple(artifacts)
+        self.pdf_backend = pdf_backend
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        """Пропускная способность последнего запуска
+
+        Returns:
+            float: отчётов (профессий) в минуту
+        """
+        return len(self.vacancy_names) / self.elapsed * 60 if self.elapsed else 0.0
+
+    def get_directory(self, vacancy_name):
+        """Возвращает директорию отчётов профессии
+
+        Params:
+            vacancy_name (str): название профессии
+
+        Returns:
+            str: путь до директории
+        """
+        return get_report_directory(self.output_dir, vacancy_name)
+
+    def run(self):
+        """Строит отчёты для всех профессий
+
+        Returns:
+            dict[str, str]: директория с отчётами для каждой профессии
+        """
+        start = time.perf_counter()
+        dataset = DataSet(self.file_name, '')
+        statistics = dataset.get_batch_statistic(self.vacancy_names)
+        snapshots = [make_report_stats(vacancy_name, *statistics[vacancy_name], dataset.quantiles[vacancy_name]) for vacancy_name in self.vacancy_names]
+        city_image = Report(*snapshots[0]).render_city_image() if 'image' in self.artifacts else None
+        if 'pdf' in self.artifacts and self.pdf_backend == PDFKIT:
+            # шаблон компилируется до запуска пула, воркеры получают его готовым вместе с памятью родителя
+            get_template_renderer().get_template('pdf_template.html')
+        directories = self.directories
+        with concurrent.futures.ProcessPoolExecutor(self.max_workers) as executor:
+            futures = [executor.submit(render_profession, snapshot, directories[snapshot.vacancy_name], city_image, self.artifacts, self.pdf_backend) for snapshot in snapshots]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        self.elapsed = time.perf_counter() - start
+        return directories
+
+
+if __name__ == '__main__':
+    batch = BatchReport(FILE_NAME, sys.argv[1:] or VACANCY_NAMES, OUTPUT_DIRECTORY)
+    batch.run()
+    print('Построено отчётов: {0} за {1:.2f} с ({2:.1f} отчётов в минуту)'.format(len(batch.vacancy_names), batch.elapsed, batch.throughput))
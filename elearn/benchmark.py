@@ -0,0 +1,161 @@
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from elearn.analytics import EXECUTORS, Analytics, ChunkTask, compare_exchange
+from elearn.pdf import PDF_BACKENDS, is_available
+from elearn.profiling import Profiler
+from elearn.report import Report
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORY_NAME = os.path.join(ROOT, 'chunks')
+VACANCY_NAME = 'Аналитик'
+FILE_COUNTS = (4, 16)
+ROWS_PER_FILE = (1000, 20000)
+EXCEL_ROWS = (10, 1000, 20000)
+PDF_REPORTS = 5
+NAMES = ['Аналитик', 'Программист', 'Дизайнер', 'Системный аналитик', 'Менеджер']
+AREAS = ['Москва', 'Санкт-Петербург', 'Екатеринбург', 'Казань', 'Новосибирск']
+
+
+def print_exchange_comparison(directory_name, vacancy_name):
+    """Печатает сравнение обмена результатами воркеров через pickle и через общую память
+
+    Params:
+        directory_name (str): директория с CSV-чанками
+        vacancy_name (str): название выбранной вакансии
+    """
+    timings = compare_exchange(ChunkTask.from_directory(directory_name, vacancy_name))
+    print('Обмен результатами воркеров (лучшее из 3 запусков):')
+    for method, seconds in timings.items():
+        print('{0:>15}: {1:.3f} с'.format(method, seconds))
+
+
+def make_chunks(directory_name, files, rows, seed=0):
+    """Генерирует синтетические CSV-чанки в формате vacancies_by_year
+
+    Params:
+        directory_name (str): директория, куда записываются чанки
+        files (int): количество файлов
+        rows (int): количество строк в каждом файле
+        seed (int): зерно генератора случайных чисел
+    """
+    generator = random.Random(seed)
+    for index in range(files):
+        year = 2003 + index
+        with open(os.path.join(directory_name, 'vacancies_by_{0}.csv'.format(year)), mode='w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'])
+            for _ in range(rows):
+                salary_from = generator.randrange(10000, 150000, 1000)
+                writer.writerow([
+                    generator.choice(NAMES), salary_from, salary_from + generator.randrange(0, 100000, 1000), 'RUR',
+                    generator.choice(AREAS), '{0}-{1:02d}-{2:02d}T12:00:00+0300'.format(year, generator.randint(1, 12), generator.randint(1, 28)),
+                ])
+
+
+def benchmark_executors(file_counts=FILE_COUNTS, rows_per_file=ROWS_PER_FILE, executors=tuple(EXECUTORS), repeat=3):
+    """Замеряет все исполнители Analytics на синтетических чанках разного количества и размера
+
+    Params:
+        file_counts (Iterable[int]): количества файлов
+        rows_per_file (Iterable[int]): количества строк в файле
+        executors (Iterable[str]): названия исполнителей из EXECUTORS
+        repeat (int): количество повторов, берётся лучшее время
+
+    Returns:
+        dict[tuple[int, int, str], float]: лучшее время в секундах для (файлов, строк, исполнитель)
+    """
+    timings = {}
+    for files in file_counts:
+        for rows in rows_per_file:
+            with tempfile.TemporaryDirectory() as directory_name:
+                make_chunks(directory_name, files, rows)
+                for executor in executors:
+                    analytics = Analytics(directory_name, VACANCY_NAME, executor=executor, persistent=True)
+                    best = float('inf')
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        analytics.get_files_analytics()
+                        best = min(best, time.perf_counter() - start)
+                    timings[(files, rows, executor)] = best
+    return timings
+
+
+def print_executors_matrix(timings):
+    """Печатает матрицу замеров benchmark_executors
+
+    Params:
+        timings (dict[tuple[int, int, str], float]): результат benchmark_executors
+    """
+    executors = list(dict.fromkeys(executor for _, _, executor in timings))
+    print('{0:>8} {1:>8} '.format('файлов', 'строк') + ' '.join('{0:>16}'.format(executor) for executor in executors))
+    for files, rows in dict.fromkeys((files, rows) for files, rows, _ in timings):
+        print('{0:>8} {1:>8} '.format(files, rows) + ' '.join('{0:>14.3f} с'.format(timings[(files, rows, executor)]) for executor in executors))
+
+
+def benchmark_excel(rows_counts=EXCEL_ROWS):
+    """Сравнивает обычную и потоковую выгрузку Excel на листе по городам с заданным количеством строк
+
+    Params:
+        rows_counts (Iterable[int]): количества городов
+
+    Returns:
+        Profiler: замеры по стадиям вида excel/<режим>/<строк>
+    """
+    profiler = Profiler()
+    generator = random.Random(0)
+    years = {year: generator.randrange(10000, 150000) for year in range(2003, 2023)}
+    for rows in rows_counts:
+        cities = ['{0} {1}'.format(generator.choice(AREAS), index) for index in range(rows)]
+        salaries = {city: generator.randrange(10000, 150000) for city in cities}
+        shares = {city: round(1 / rows, 4) for city in cities}
+        with tempfile.TemporaryDirectory() as output_dir:
+            for mode, streaming in (('classic', False), ('streaming', True)):
+                report = Report(VACANCY_NAME, years, years, years, years, salaries, shares, output_dir=output_dir)
+                with profiler.stage('excel/{0}/{1}'.format(mode, rows), rows=rows):
+                    report.generate_excel(streaming=streaming)
+    return profiler
+
+
+def benchmark_pdf(reports=PDF_REPORTS, backends=PDF_BACKENDS):
+    """Сравнивает PDF-бэкенды на одном и том же отчёте с графиком
+
+    Бэкенд, который не может работать на этой машине (нет wkhtmltopdf или fpdf2), пропускается
+
+    Params:
+        reports (int): сколько раз строить отчёт каждым бэкендом
+        backends (Iterable[str]): PDF-бэкенды
+
+    Returns:
+        Profiler: замеры по стадиям вида pdf/<бэкенд>, время одного вызова ― время на отчёт
+    """
+    profiler = Profiler(trace_memory=False)
+    generator = random.Random(0)
+    years = {year: generator.randrange(10000, 150000) for year in range(2003, 2023)}
+    salaries = {city: generator.randrange(10000, 150000) for city in AREAS}
+    shares = {city: 0.1 for city in AREAS}
+    with tempfile.TemporaryDirectory() as output_dir:
+        report = Report(VACANCY_NAME, years, years, years, years, salaries, shares, output_dir=output_dir)
+        image = report.generate_image()
+        for backend in backends:
+            if not is_available(backend):
+                print('PDF-бэкенд {0} недоступен на этой машине, пропущен'.format(backend))
+                continue
+            for _ in range(reports):
+                with profiler.stage('pdf/{0}'.format(backend)):
+                    report.generate_pdf(image, backend=backend)
+    return profiler
+
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else DIRECTORY_NAME
+    print_executors_matrix(benchmark_executors())
+    benchmark_excel().print_table()
+    benchmark_pdf().print_table()
+    if os.path.isdir(directory):
+        print_exchange_comparison(directory, VACANCY_NAME)
@@ -0,0 +1,280 @@
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+from elearn.templating import TEMPLATES_DIRECTORY
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIRECTORY = os.path.join(ROOT, '.cache', 'artifacts')
+MAX_BYTES = 256 * 2 ** 20
+CODE_MODULES = ('report.py', 'charts.py', 'excel.py', 'pdf.py', 'dates.py', 'templating.py', 'datasource.py', 'sketches.py', 'quality.py', 'matching.py', 'parquet.py', 'ranking.py')
+BLOCK_SIZE = 2 ** 20
+STATS = 'stats.pickle'
+
+
+def hash_file(path):
+    """Считает хэш содержимого файла, читая его блоками
+
+    Args:
+        path (str): путь до файла
+
+    Returns:
+        str: хэш в шестнадцатеричном виде
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _fingerprint(path, size, mtime_ns):
+    return hash_file(path)
+
+
+def file_fingerprint(path):
+    """Отпечаток входного файла по содержимому
+
+    Внутри процесса хэш пересчитывается, только если у файла изменились размер или время изменения
+
+    Args:
+        path (str): путь до файла
+
+    Returns:
+        str: хэш содержимого
+    """
+    stat = os.stat(path)
+    return _fingerprint(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(modules=CODE_MODULES):
+    """Версия кода, строящего отчёты: хэш исходников модулей
+
+    Args:
+        modules (tuple[str]): файлы модулей в директории elearn
+
+    Returns:
+        str: хэш исходников
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return make_key(*(hash_file(os.path.join(directory, module)) for module in modules))
+
+
+@functools.lru_cache(maxsize=None)
+def template_version(name):
+    """Версия HTML-шаблона: хэш его содержимого
+
+    Args:
+        name (str): имя файла шаблона
+
+    Returns:
+        str: хэш шаблона
+    """
+    return hash_file(os.path.join(TEMPLATES_DIRECTORY, name))
+
+
+def make_key(*parts):
+    """Собирает ключ кэша из частей
+
+    >>> make_key('abc', 'Программист', None) == make_key('abc', 'Программист', None)
+    True
+    >>> make_key('abc', 'Программист', None) == make_key('abc', 'Аналитик', None)
+    False
+
+    Args:
+        parts: части ключа, приводимые к строке через repr
+
+    Returns:
+        str: ключ
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=20).hexdigest()
+
+
+def report_key(file_name, vacancy_name, area_name=None, template=None):
+    """Ключ отчёта: отпечаток входного файла, профессия, регион, версия шаблона и версия кода
+
+    Отпечаток берётся у источника elearn.datasource, поэтому входом может быть и директория с чанками
+
+    Args:
+        file_name (str): путь до входного файла или директории
+        vacancy_name (str): название профессии
+        area_name (str or None): регион, None ― все регионы
+        template (str or None): имя шаблона, если артефакт от него зависит
+
+    Returns:
+        str: ключ
+    """
+    from elearn.datasource import open_source
+
+    return make_key(open_source(file_name).fingerprint(), vacancy_name, area_name, template and template_version(template), code_version())
+
+
+class ArtifactCache:
+    """Класс ― кэш артефактов отчёта на диске, адресуемый по ключу содержимого входных данных
+
+    Каждый ключ ― отдельная директория с файлами артефактов. Время изменения директории обновляется
+    при каждом обращении, и при превышении max_bytes удаляются давно не использованные записи (LRU)
+
+    Attributes:
+        directory (str): директория кэша
+        max_bytes (int): максимальный суммарный размер кэша в байтах
+        force (bool): игнорировать сохранённые артефакты и строить всё заново
+        hits (int): количество попаданий
+        misses (int): количество промахов
+    """
+    def __init__(self, directory=CACHE_DIRECTORY, max_bytes=MAX_BYTES, force=False):
+        """Инициализирует объект ArtifactCache
+
+        Args:
+            directory (str): директория кэша
+            max_bytes (int): максимальный размер кэша в байтах
+            force (bool): игнорировать сохранённые артефакты
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, key, name):
+        """Путь до артефакта в кэше
+
+        Args:
+            key (str): ключ
+            name (str): имя файла артефакта
+
+        Returns:
+            str: путь
+        """
+        return os.path.join(self.directory, key, name)
+
+    def get(self, key, name):
+        """Ищет артефакт в кэше и учитывает попадание или промах
+
+        Args:
+            key (str): ключ
+            name (str): имя файла артефакта
+
+        Returns:
+            str or None: путь до артефакта, None при промахе
+        """
+        path = self.get_path(key, name)
+        if self.force or not os.path.isfile(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(os.path.dirname(path))
+        return path
+
+    def restore(self, key, name, output_dir='.'):
+        """Копирует артефакт из кэша в директорию отчёта
+
+        Args:
+            key (str): ключ
+            name (str): имя файла артефакта
+            output_dir (str): директория отчёта
+
+        Returns:
+            bool: найден ли артефакт
+        """
+        path = self.get(key, name)
+        if path is None:
+            return False
+        shutil.copyfile(path, os.path.join(output_dir, name))
+        return True
+
+    def put(self, key, name, source):
+        """Сохраняет построенный артефакт в кэш
+
+        Файл сначала копируется во временный, а затем атомарно переименовывается,
+        поэтому параллельный процесс никогда не увидит недописанный артефакт
+
+        Args:
+            key (str): ключ
+            name (str): имя файла артефакта
+            source (str): путь до построенного артефакта
+        """
+        entry = os.path.join(self.directory, key)
+        os.makedirs(entry, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=entry)
+        os.close(descriptor)
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, os.path.join(entry, name))
+        os.utime(entry)
+        self.evict()
+
+    def load(self, key, name=STATS):
+        """Загружает из кэша объект, сохранённый через save
+
+        Args:
+            key (str): ключ
+            name (str): имя файла
+
+        Returns:
+            object or None: объект, None при промахе
+        """
+        path = self.get(key, name)
+        if path is None:
+            return None
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+    def save(self, key, value, name=STATS):
+        """Сохраняет объект в кэш
+
+        Args:
+            key (str): ключ
+            value: объект, поддерживающий pickle
+            name (str): имя файла
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, name)
+            with open(path, 'wb') as file:
+                pickle.dump(value, file)
+            self.put(key, name, path)
+
+    def get_entries(self):
+        """Записи кэша от давно не использованных к недавним
+
+        Returns:
+            list[tuple[float, int, str]]: время последнего обращения, размер в байтах и путь до записи
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                size = sum(file.stat().st_size for file in os.scandir(entry.path) if file.is_file())
+                entries.append((entry.stat().st_mtime, size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока кэш не уложится в max_bytes
+
+        Returns:
+            int: количество удалённых записей
+        """
+        entries = self.get_entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def format_counters(self):
+        """Формирует строку со счётчиками кэша
+
+        Returns:
+            str: попадания и промахи
+        """
+        return 'Кэш артефактов: попаданий {0}, промахов {1}'.format(self.hits, self.misses)
@@ -0,0 +1,278 @@
+import functools
+import io
+
+import numpy as np
+from matplotlib import image as mpimg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+FIGSIZE = (6.4, 4.8)
+HALF_FIGSIZE = (6.4, 2.4)
+FULL, YEARS, CITIES = 'full', 'years', 'cities'
+
+
+def year_positions(stats):
+    """Координаты столбцов по годам
+
+    Args:
+        stats (dict[int, int]): статистика по годам
+
+    Returns:
+        np.ndarray: года в виде массива
+    """
+    return np.array(list(stats.keys()))
+
+
+def city_labels(stats):
+    """Подписи городов для горизонтальной диаграммы, снизу вверх, с переносами строк
+
+    >>> city_labels({'Москва': 1, 'Санкт-Петербург': 2, 'Нижний Новгород': 3})
+    ['Нижний\\nНовгород', 'Санкт-\\nПетербург', 'Москва']
+
+    Args:
+        stats (dict[str, int]): уровень зарплат по городам
+
+    Returns:
+        list[str]: подписи
+    """
+    return [str(city).replace(' ', '\n').replace('-', '-\n') for city in reversed(list(stats.keys()))]
+
+
+def draw_year_charts(ax1, ax2, report):
+    """Рисует графики уровня зарплат и количества вакансий по годам
+
+    Args:
+        ax1 (Axes): оси для зарплат
+        ax2 (Axes): оси для количества вакансий
+        report (Report): отчёт со статистикой
+
+    Returns:
+        list[BarContainer]: созданные столбцы в порядке stats1, stats3, stats2, stats4
+    """
+    years = year_positions(report.stats1)
+    bar1 = ax1.bar(years - 0.4, list(report.stats1.values()), width=0.4)
+    bar2 = ax1.bar(years, list(report.stats3.values()), width=0.4)
+    ax1.set_title('Уровень зарплат по годам', fontdict={'fontsize': 8})
+    ax1.grid(axis='y')
+    ax1.legend((bar1[0], bar2[0]), ('средняя з/п', 'з/п ' + report.vacancy_name.lower()), prop={'size': 8})
+    ax1.set_xticks(years - 0.2, list(report.stats1.keys()), rotation=90)
+    ax1.xaxis.set_tick_params(labelsize=8)
+    ax1.yaxis.set_tick_params(labelsize=8)
+
+    years = year_positions(report.stats2)
+    ax2.set_title('Количество вакансий по годам', fontdict={'fontsize': 8})
+    bar3 = ax2.bar(years - 0.4, list(report.stats2.values()), width=0.4)
+    bar4 = ax2.bar(years, list(report.stats4.values()), width=0.4)
+    ax2.legend((bar3[0], bar4[0]), ('Количество вакансий', 'Количество вакансий\n' + report.vacancy_name.lower()), prop={'size': 8})
+    ax2.set_xticks(years - 0.2, list(report.stats2.keys()), rotation=90)
+    ax2.grid(axis='y')
+    ax2.xaxis.set_tick_params(labelsize=8)
+    ax2.yaxis.set_tick_params(labelsize=8)
+    return [bar1, bar2, bar3, bar4]
+
+
+def draw_city_charts(ax3, ax4, report):
+    """Рисует графики уровня зарплат и доли вакансий по городам
+
+    Args:
+        ax3 (Axes): оси для зарплат
+        ax4 (Axes): оси для доли вакансий
+        report (Report): отчёт со статистикой
+    """
+    ax3.set_title('Уровень зарплат по городам', fontdict={'fontsize': 8})
+    ax3.barh(city_labels(report.stats5), list(reversed(list(report.stats5.values()))), color='blue', height=0.5, align='center')
+    ax3.yaxis.set_tick_params(labelsize=6)
+    ax3.xaxis.set_tick_params(labelsize=8)
+    ax3.grid(axis='x')
+    draw_city_share(ax4, report)
+
+
+def draw_city_share(ax4, report):
+    """Рисует круговую диаграмму доли вакансий по городам
+
+    Args:
+        ax4 (Axes): оси
+        report (Report): отчёт со статистикой
+    """
+    ax4.set_title('Доля вакансий по городам', fontdict={'fontsize': 8})
+    other = 1 - sum([value for value in report.stats6.values()])
+    ax4.pie(list(report.stats6.values()) + [other], labels=list(report.stats6.keys()) + ['Другие'], textprops={'fontsize': 6})
+
+
+def to_png(array):
+    """Кодирует RGBA-массив в PNG
+
+    Args:
+        array (np.ndarray): изображение
+
+    Returns:
+        bytes: PNG
+    """
+    buffer = io.BytesIO()
+    mpimg.imsave(buffer, array, format='png')
+    return buffer.getvalue()
+
+
+class ChartTemplate:
+    """Класс ― переиспользуемая фигура одного вида (полная 2×2, только года или только города)
+
+    Фигура строится один раз под набор годов и количество городов, а следующие отчёты
+    с тем же набором только обновляют высоты столбцов, подписи и круговую диаграмму
+
+    Attributes:
+        kind (str): вид фигуры: FULL, YEARS или CITIES
+        figure (Figure): фигура с Agg-холстом, не зарегистрированная в pyplot
+        axes (list[Axes]): оси фигуры
+        layout (tuple or None): набор годов и количество городов, под которые построена фигура
+        bars (list[BarContainer]): столбцы по годам
+        cities (tuple or None): статистика по городам, нарисованная сейчас
+    """
+    def __init__(self, kind):
+        """Инициализирует объект ChartTemplate
+
+        Args:
+            kind (str): вид фигуры
+        """
+        self.kind = kind
+        self.figure = Figure(figsize=FIGSIZE if kind == FULL else HALF_FIGSIZE)
+        FigureCanvasAgg(self.figure)
+        self.axes = []
+        self.layout = None
+        self.bars = []
+        self.cities = None
+
+    @property
+    def has_years(self):
+        return self.kind in (FULL, YEARS)
+
+    @property
+    def has_cities(self):
+        return self.kind in (FULL, CITIES)
+
+    def render(self, report):
+        """Рисует отчёт на фигуре и растеризует её
+
+        Args:
+            report (Report): отчёт со статистикой
+
+        Returns:
+            np.ndarray: RGBA-изображение
+        """
+        layout = (tuple(report.stats1) if self.has_years else None, len(report.stats5) if self.has_cities else None)
+        if layout != self.layout:
+            self.build(report, layout)
+        else:
+            self.update(report)
+        self.figure.canvas.draw()
+        return np.asarray(self.figure.canvas.buffer_rgba()).copy()
+
+    def build(self, report, layout):
+        """Строит фигуру заново
+
+        Args:
+            report (Report): отчёт со статистикой
+            layout (tuple): набор годов и количество городов
+        """
+        self.figure.clear()
+        self.axes = list(self.figure.subplots(nrows=2 if self.kind == FULL else 1, ncols=2).flat)
+        axes = iter(self.axes)
+        if self.has_years:
+            self.bars = draw_year_charts(next(axes), next(axes), report)
+        if self.has_cities:
+            draw_city_charts(next(axes), next(axes), report)
+            self.cities = (tuple(report.stats5.items()), tuple(report.stats6.items()))
+        self.figure.tight_layout()
+        self.layout = layout
+
+    def update(self, report):
+        """Обновляет данные на уже построенной фигуре
+
+        Args:
+            report (Report): отчёт со статистикой
+        """
+        axes = iter(self.axes)
+        if self.has_years:
+            ax1, ax2 = next(axes), next(axes)
+            for bars, stats in zip(self.bars, (report.stats1, report.stats3, report.stats2, report.stats4)):
+                for rectangle, value in zip(bars, stats.values()):
+                    rectangle.set_height(value)
+            ax1.get_legend().get_texts()[1].set_text('з/п ' + report.vacancy_name.lower())
+            ax2.get_legend().get_texts()[1].set_text('Количество вакансий\n' + report.vacancy_name.lower())
+            for ax in (ax1, ax2):
+                ax.relim()
+                ax.autoscale_view()
+        if self.has_cities:
+            ax3, ax4 = next(axes), next(axes)
+            cities = (tuple(report.stats5.items()), tuple(report.stats6.items()))
+            if cities != self.cities:
+                for rectangle, value in zip(ax3.patches, reversed(list(report.stats5.values()))):
+                    rectangle.set_width(value)
+                ax3.set_yticks(range(len(report.stats5)), city_labels(report.stats5))
+                ax3.relim()
+                ax3.autoscale_view()
+                ax4.clear()
+                draw_city_share(ax4, report)
+                self.figure.tight_layout()
+                self.cities = cities
+
+    def close(self):
+        """Освобождает ресурсы фигуры"""
+        self.figure.clear()
+        self.axes, self.bars, self.layout, self.cities = [], [], None, None
+
+
+class ChartRenderer:
+    """Класс рисует графики отчётов через Agg без pyplot и переиспользует фигуры между отчётами
+
+    Attributes:
+        templates (dict[str, ChartTemplate]): фигуры по видам
+    """
+    def __init__(self):
+        """Инициализирует объект ChartRenderer"""
+        self.templates = {}
+
+    def render_array(self, report, kind=FULL):
+        """Растеризует отчёт в RGBA-массив
+
+        Args:
+            report (Report): отчёт со статистикой
+            kind (str): вид фигуры: FULL, YEARS или CITIES
+
+        Returns:
+            np.ndarray: RGBA-изображение
+        """
+        if kind not in self.templates:
+            self.templates[kind] = ChartTemplate(kind)
+        return self.templates[kind].render(report)
+
+    def render(self, report, city_image=None):
+        """Рисует полный график отчёта в PNG в памяти
+
+        Args:
+            report (Report): отчёт со статистикой
+            city_image (np.ndarray or None): заранее отрисованная половина по городам (см. render_array с CITIES),
+                тогда рисуются только графики по годам
+
+        Returns:
+            bytes: PNG
+        """
+        if city_image is None:
+            return to_png(self.render_array(report))
+        return to_png(np.vstack([self.render_array(report, YEARS), city_image]))
+
+    def close(self):
+        """Освобождает ресурсы всех фигур"""
+        for template in self.templates.values():
+            template.close()
+        self.templates.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def get_renderer():
+    """Возвращает общий для процесса ChartRenderer
+
+    Returns:
+        ChartRenderer: рендерер графиков
+    """
+    return ChartRenderer()
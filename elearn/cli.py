@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+
+from elearn.cache import CACHE_DIRECTORY, ArtifactCache
+from elearn.pdf import PDF_BACKENDS, PDFKIT
+from elearn.profiling import Profiler
+from elearn.quality import REASONS
+from elearn.report import ARTIFACTS, InputConnect
+
+
+STATISTICS = 'statistics'
+OUTPUTS = (STATISTICS, *ARTIFACTS)
+
+
+def make_parser():
+    """Создаёт парсер аргументов командной строки
+
+    Returns:
+        argparse.ArgumentParser: парсер
+    """
+    parser = argparse.ArgumentParser(description='Статистика и отчёты по вакансиям без интерактивного ввода')
+    parser.add_argument('file_name', help='CSV-файл с вакансиями')
+    parser.add_argument('vacancy_name', help='название профессии')
+    parser.add_argument('--area', dest='area_name', help='считать только вакансии этого региона')
+    parser.add_argument('-o', '--outputs', nargs='+', choices=OUTPUTS, default=[STATISTICS],
+                        help='что построить: statistics ― вывод в консоль, excel, image, pdf ― файлы отчёта (по умолчанию statistics)')
+    parser.add_argument('-d', '--output-dir', default='.', help='директория для файлов отчёта')
+    parser.add_argument('--pdf-backend', choices=PDF_BACKENDS, default=PDFKIT, help='чем строить PDF')
+    parser.add_argument('--serial', action='store_true', help='строить отчёты в текущем процессе, а не в пуле')
+    parser.add_argument('--sketch', action='store_true',
+                        help='считать города и квантили зарплат приближённо, в памяти, не зависящей от размера файла')
+    parser.add_argument('--show-rejects', action='store_true', help='напечатать примеры строк, отброшенных проверкой данных')
+    parser.add_argument('--force', action='store_true', help='не брать статистику и отчёты из кэша')
+    parser.add_argument('--cache-dir', default=CACHE_DIRECTORY, help='директория кэша статистики и отчётов')
+    parser.add_argument('--profile', action='store_true', help='напечатать время по стадиям и счётчики кэша')
+    return parser
+
+
+def main(argv=None):
+    """Точка входа CLI
+
+    Зависимости для отчётов (openpyxl, matplotlib, jinja2, PDF-бэкенды) загружаются, только если
+    соответствующий отчёт запрошен, поэтому вывод одной статистики запускается быстро
+
+    Args:
+        argv (list[str] or None): аргументы, по умолчанию ― sys.argv[1:]
+
+    Returns:
+        int: код возврата
+    """
+    args = make_parser().parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    input_connect = InputConnect(args.file_name, args.vacancy_name, Profiler(trace_memory=args.profile), args.pdf_backend,
+                                 ArtifactCache(args.cache_dir, force=args.force), area_name=args.area_name, output_dir=args.output_dir, sketch=args.sketch)
+    statistics = input_connect.generate_statistics(STATISTICS in args.outputs)
+    if args.show_rejects:
+        for reason, rows in input_connect.quality.samples.items():
+            for row in rows:
+                print('{0}: {1}'.format(REASONS[reason], row))
+    artifacts = [output for output in args.outputs if output in ARTIFACTS]
+    if artifacts:
+        input_connect.generate_vacancies(*statistics, parallel=not args.serial, artifacts=artifacts)
+    if args.profile:
+        input_connect.profiler.print_table()
+        print(input_connect.cache.format_counters())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import concurrent.futures
+import json
+import os
+import shutil
+
+from elearn.cache import file_fingerprint
+from elearn.quality import QualityReport
+
+
+CHUNK_ROWS = 50000
+CHECKPOINT = 'checkpoint.json'
+
+
+def write_atomically(path, write):
+    """Пишет файл через временный файл, чтобы после сбоя на диске не осталось недописанного файла
+
+    Args:
+        path (str): путь до файла
+        write (Callable[[str], None]): функция, которая пишет содержимое по переданному пути
+    """
+    temporary = '{0}.tmp{1}'.format(path, os.getpid())
+    write(temporary)
+    os.replace(temporary, path)
+
+
+_worker_convert = None
+
+
+def set_worker_convert(convert):
+    """Запоминает преобразование в процессе пула: оно передаётся процессу один раз, а не с каждым чанком
+
+    Args:
+        convert (Callable[[DataFrame], DataFrame]): преобразование чанка
+    """
+    global _worker_convert
+    _worker_convert = convert
+
+
+def convert_in_worker(chunk):
+    return _worker_convert(chunk)
+
+
+class CheckpointedConversion:
+    """Класс построчно преобразует большой CSV-файл частями с возможностью продолжить прерванный запуск
+
+    Вход читается чанками по chunk_rows строк, каждый чанк преобразуется функцией convert и сохраняется
+    отдельным сегментом part-<номер>.csv. В checkpoint.json записывается смещение во входном файле,
+    до которого все сегменты готовы, и отпечаток входа. Повторный запуск пропускает готовые строки
+    и уже записанные сегменты, а если вход изменился ― начинает заново. Когда готовы все сегменты,
+    они склеиваются по порядку в выходной файл, а директория с сегментами удаляется. Если передан отчёт
+    о качестве данных, convert возвращает вместе с чанком его счётчики, а накопленные счётчики сохраняются
+    в контрольной точке, чтобы после продолжения они учитывали и строки, преобразованные до сбоя.
+    Если задан parquet_file, готовые сегменты перед склейкой дополнительно записываются в Parquet (elearn.parquet)
+
+    Attributes:
+        input_file (str): исходный CSV-файл
+        output_file (str): итоговый CSV-файл
+        convert (Callable[[DataFrame], DataFrame]): преобразование чанка, при workers > 1 должно передаваться в процессы
+        chunk_rows (int): строк во входном чанке
+        workers (int): сколько чанков преобразовывать параллельно, 1 ― в текущем процессе
+        directory (str): директория сегментов и контрольной точки
+        quality (QualityReport or None): общий отчёт о качестве данных
+        parquet_file (str or None): итоговый файл Parquet
+    """
+    def __init__(self, input_file, output_file, convert, chunk_rows=CHUNK_ROWS, workers=1, quality=None, parquet_file=None):
+        """Инициализирует объект CheckpointedConversion
+
+        Args:
+            input_file (str): исходный CSV-файл
+            output_file (str): итоговый CSV-файл
+            convert (Callable[[DataFrame], DataFrame]): преобразование чанка
+            chunk_rows (int): строк во входном чанке
+            workers (int): сколько чанков преобразовывать параллельно
+            quality (QualityReport or None): отчёт, в который складываются счётчики чанков
+            parquet_file (str or None): файл Parquet, который нужно записать рядом с CSV
+        """
+        self.input_file = input_file
+        self.output_file = output_file
+        self.convert = convert
+        self.chunk_rows = chunk_rows
+        self.workers = workers
+        self.directory = output_file + '.parts'
+        self.quality = quality
+        self.parquet_file = parquet_file
+        self.converted = QualityReport(quality.sample_size if quality is not None else 0)
+
+    def get_segment_path(self, index):
+        return os.path.join(self.directory, 'part-{0:05d}.csv'.format(index))
+
+    def load_checkpoint(self):
+        """Возвращает смещение, с которого нужно продолжить, и сбрасывает сегменты, если они от другого входа
+
+        Returns:
+            int: сколько строк входа уже преобразовано
+        """
+        state = {'input': file_fingerprint(self.input_file), 'chunk_rows': self.chunk_rows}
+        path = os.path.join(self.directory, CHECKPOINT)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                saved = json.load(file)
+            if saved['input'] == state['input'] and saved['chunk_rows'] == state['chunk_rows']:
+                self.converted.merge(QualityReport.from_dict(saved['quality']))
+                return saved['offset']
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory)
+        self.save_checkpoint(0)
+        return 0
+
+    def save_checkpoint(self, offset):
+        state = {'input': file_fingerprint(self.input_file), 'chunk_rows': self.chunk_rows, 'offset': offset, 'quality': self.converted.as_dict()}
+
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(state, file, ensure_ascii=False, default=str)
+
+        write_atomically(os.path.join(self.directory, CHECKPOINT), write)
+
+    def get_chunks(self, offset):
+        """Чанки входа, начиная со смещения, с номерами сегментов; чанки с уже записанными сегментами пропускаются
+
+        Args:
+            offset (int): сколько строк входа уже преобразовано
+
+        Yields:
+            tuple[int, DataFrame]: номер сегмента и чанк
+        """
+        import pandas as pd
+
+        reader = pd.read_csv(self.input_file, chunksize=self.chunk_rows, skiprows=range(1, offset + 1))
+        for index, chunk in enumerate(reader, offset // self.chunk_rows):
+            if not os.path.exists(self.get_segment_path(index)):
+                yield index, chunk
+
+    def write_segment(self, index, frame):
+        write_atomically(self.get_segment_path(index), lambda path: frame.to_csv(path, index=False))
+
+    def run(self):
+        """Преобразует вход, продолжая с контрольной точки, и собирает выходной файл
+
+        Returns:
+            int: из скольких сегментов собран выходной файл
+        """
+        offset = self.load_checkpoint()
+        first = offset // self.chunk_rows
+
+        def complete(index, result):
+            # сегменты пишутся атомарно, поэтому готовый префикс ― это подряд идущие существующие сегменты
+            nonlocal first
+            if self.quality is not None:
+                result, quality = result
+                self.converted.merge(quality)
+            self.write_segment(index, result)
+            while os.path.exists(self.get_segment_path(first)):
+                first += 1
+            self.save_checkpoint(first * self.chunk_rows)
+
+        if self.workers == 1:
+            for index, chunk in self.get_chunks(offset):
+                complete(index, self.convert(chunk))
+        else:
+            # convert со всем своим состоянием (например, таблицей курсов) передаётся каждому процессу один раз
+            # при запуске, а в задачах ― только чанки
+            with concurrent.futures.ProcessPoolExecutor(self.workers, initializer=set_worker_convert, initargs=(self.convert,)) as executor:
+                # в работе одновременно не больше двух чанков на процесс, чтобы не читать весь вход в память
+                pending = {}
+                for index, chunk in self.get_chunks(offset):
+                    pending[executor.submit(convert_in_worker, chunk)] = index
+                    if len(pending) >= self.workers * 2:
+                        finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in finished:
+                            complete(pending.pop(future), future.result())
+                for future in concurrent.futures.as_completed(pending):
+                    complete(pending[future], future.result())
+        segments = sum(1 for name in os.listdir(self.directory) if name.startswith('part-') and name.endswith('.csv'))
+        if not segments:
+            # во входе нет строк: пустой чанк всё равно преобразуется, чтобы у выходного файла был заголовок
+            import pandas as pd
+
+            complete(0, self.convert(pd.read_csv(self.input_file, nrows=0)))
+            segments = 1
+        if self.parquet_file is not None:
+            self.export_parquet(segments)
+        self.concatenate(segments)
+        if self.quality is not None:
+            self.quality.merge(self.converted)
+        return segments
+
+    def export_parquet(self, segments):
+        """Записывает сегменты по порядку в файл Parquet, пока они ещё на диске
+
+        Args:
+            segments (int): сколько сегментов
+        """
+        import pandas as pd
+        from elearn.parquet import ParquetWriter
+
+        with ParquetWriter(self.parquet_file) as writer:
+            for index in range(segments):
+                writer.write(pd.read_csv(self.get_segment_path(index), dtype=object))
+
+    def concatenate(self, segments):
+        """Склеивает сегменты по порядку в выходной файл, оставляя заголовок только первого
+
+        Args:
+            segments (int): сколько сегментов
+        """
+        def write(path):
+            with open(path, 'wb') as output:
+                for index in range(segments):
+                    with open(self.get_segment_path(index), 'rb') as segment:
+                        if index:
+                            segment.readline()
+                        shutil.copyfileobj(segment, output)
+
+        write_atomically(self.output_file, write)
+        shutil.rmtree(self.directory)
@@ -0,0 +1,223 @@
+import re
+
+import numpy as np
+
+from elearn.encoding import DICTIONARY_DIRECTORY
+
+
+YEAR, QUARTER, MONTH = 'year', 'quarter', 'month'
+GRANULARITIES = {YEAR: 12, QUARTER: 3, MONTH: 1}
+PERIOD = re.compile(r'^(\d{4})(?:-(\d{2}))?$')
+CUBE_COLUMNS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+
+def parse_month(value, end=False):
+    """Переводит границу периода YYYY или YYYY-MM в номер месяца от начала эры
+
+    >>> parse_month('2022-03') - parse_month('2021-12')
+    3
+    >>> parse_month('2022', end=True) == parse_month('2022-12')
+    True
+    >>> parse_month('2022-13')
+    Traceback (most recent call last):
+    ...
+    ValueError: Некорректный период: '2022-13', ожидается YYYY или YYYY-MM
+
+    Args:
+        value (str or int): год или год и месяц
+        end (bool): для года без месяца вернуть декабрь, а не январь
+
+    Returns:
+        int: year * 12 + month - 1
+    """
+    match = PERIOD.match(str(value))
+    if match is None or match.group(2) is not None and not 1 <= int(match.group(2)) <= 12:
+        raise ValueError('Некорректный период: {0!r}, ожидается YYYY или YYYY-MM'.format(value))
+    month = int(match.group(2)) if match.group(2) else (12 if end else 1)
+    return int(match.group(1)) * 12 + month - 1
+
+
+def format_period(month, granularity):
+    """Ключ периода, в который попадает месяц: год числом, как в DataSet, квартал YYYY-Qn или месяц YYYY-MM
+
+    >>> [format_period(parse_month('2022-05'), granularity) for granularity in (YEAR, QUARTER, MONTH)]
+    [2022, '2022-Q2', '2022-05']
+
+    Args:
+        month (int): номер месяца от начала эры
+        granularity (str): year, quarter или month
+
+    Returns:
+        int or str: ключ периода
+    """
+    year, index = divmod(month, 12)
+    if granularity == YEAR:
+        return year
+    if granularity == QUARTER:
+        return '{0}-Q{1}'.format(year, index // 3 + 1)
+    return '{0}-{1:02d}'.format(year, index + 1)
+
+
+class SalaryCube:
+    """Класс ― куб агрегатов зарплат по месяцам, регионам и профессиям
+
+    Ячейка хранит сумму зарплат и число вакансий. Куб строится за один проход по данным, а статистика
+    по годам, кварталам, месяцам, регионам и любому диапазону дат получается суммированием ячеек
+    без повторного чтения вакансий. Последний срез по профессиям ― все вакансии
+
+    Attributes:
+        first_month (int): номер первого месяца куба от начала эры
+        areas (list[str]): регионы, индекс ― вторая ось куба
+        professions (list[str]): профессии, индекс ― третья ось куба
+        sums (np.ndarray): суммы зарплат формы (месяцы, регионы, профессии + 1)
+        counts (np.ndarray): число вакансий той же формы
+    """
+    def __init__(self, first_month, areas, professions, sums, counts):
+        """Инициализирует объект SalaryCube
+
+        Args:
+            first_month (int): номер первого месяца куба от начала эры
+            areas (list[str]): регионы
+            professions (list[str]): профессии
+            sums (np.ndarray): суммы зарплат
+            counts (np.ndarray): число вакансий
+        """
+        self.first_month = first_month
+        self.areas = list(areas)
+        self.professions = list(professions)
+        self.sums = sums
+        self.counts = counts
+
+    @classmethod
+    def from_arrays(cls, months, area_codes, salaries, area_values, professions, masks):
+        """Строит куб из столбцов вакансий
+
+        Args:
+            months (np.ndarray): номер месяца публикации от начала эры
+            area_codes (np.ndarray): коды регионов
+            salaries (np.ndarray): зарплаты
+            area_values (list[str]): регионы по кодам
+            professions (list[str]): профессии
+            masks (list[np.ndarray]): для каждой профессии ― какие вакансии к ней относятся
+
+        Returns:
+            SalaryCube: куб
+        """
+        first_month = int(months.min()) if len(months) else 0
+        present, local_areas = np.unique(area_codes, return_inverse=True)
+        shape = (int(months.max()) - first_month + 1 if len(months) else 0, len(present), len(professions) + 1)
+        cells = (months - first_month) * shape[1] + local_areas.reshape(-1)
+        indexes = [cells[mask] * shape[2] + index for index, mask in enumerate(masks)] + [cells * shape[2] + len(professions)]
+        weights = [salaries[mask] for mask in masks] + [salaries]
+        flat, size = np.concatenate(indexes), int(np.prod(shape))
+        sums = np.bincount(flat, weights=np.concatenate(weights), minlength=size).reshape(shape)
+        counts = np.bincount(flat, minlength=size).reshape(shape)
+        return cls(first_month, [area_values[code] for code in present.tolist()], professions, sums, counts)
+
+    @classmethod
+    def from_source(cls, source, professions, dictionary_directory=DICTIONARY_DIRECTORY):
+        """Строит куб по источнику вакансий за один проход, отбирая строки и считая зарплату как DataSet
+
+        Args:
+            source (DataSource): источник вакансий
+            professions (list[str]): профессии, ищутся в названии вакансии через elearn.matching
+            dictionary_directory (str): директория словарей регионов и валют (elearn.encoding)
+
+        Returns:
+            SalaryCube: куб
+        """
+        from elearn.dates import INVALID, split_dates
+        from elearn.datasource import Query
+        from elearn.encoding import get_dictionary
+        from elearn.matching import NameMatcher
+        from elearn.report import Vacancy
+
+        frame = source.read(Query(CUBE_COLUMNS)).dropna()
+        # курс берётся индексом массива по коду валюты; неизвестная валюта даёт NaN и, как в DataSet, отбрасывается
+        currencies = get_dictionary('salary_currency', dictionary_directory)
+        currency_codes = currencies.encode_array(frame['salary_currency'])
+        rates = currencies.get_table(Vacancy.currency_to_rub)[currency_codes]
+        years, months, _ = split_dates(frame['published_at'], errors='coerce')
+        valid = ~np.isnan(rates) & (years != INVALID)
+        frame, rates, years, months = frame[valid], rates[valid], years[valid], months[valid]
+        salaries = rates * (np.trunc(frame['salary_from'].astype(float)) + np.trunc(frame['salary_to'].astype(float))).to_numpy() / 2
+        areas = get_dictionary('area_name', dictionary_directory)
+        matcher = NameMatcher(frame['name'])
+        masks = [matcher.get_mask(profession) for profession in professions]
+        return cls.from_arrays(years * 12 + months - 1, areas.encode_array(frame['area_name']), salaries, areas.values, professions, masks)
+
+    def get_slot(self, profession):
+        return len(self.professions) if profession is None else self.professions.index(profession)
+
+    def get_range(self, date_from, date_to):
+        """Срез по первой оси куба для диапазона дат
+
+        Returns:
+            slice: месяцы куба, попадающие в диапазон
+        """
+        start = 0 if date_from is None else max(0, parse_month(date_from) - self.first_month)
+        stop = len(self.sums) if date_to is None else max(start, parse_month(date_to, end=True) - self.first_month + 1)
+        return slice(start, stop)
+
+    def get_slice(self, profession=None, area_name=None, date_from=None, date_to=None):
+        """Суммы и число вакансий по месяцам для профессии, региона и диапазона дат
+
+        Args:
+            profession (str or None): профессия из professions, None ― все вакансии
+            area_name (str or None): регион, None ― все регионы
+            date_from (str or None): первый месяц или год периода, включительно
+            date_to (str or None): последний месяц или год периода, включительно
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: номера месяцев, суммы зарплат, число вакансий
+        """
+        months, slot = self.get_range(date_from, date_to), self.get_slot(profession)
+        sums, counts = self.sums[months, :, slot], self.counts[months, :, slot]
+        if area_name is not None:
+            if area_name not in self.areas:
+                return np.arange(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+            index = self.areas.index(area_name)
+            sums, counts = sums[:, index], counts[:, index]
+        else:
+            sums, counts = sums.sum(axis=1), counts.sum(axis=1)
+        start = self.first_month + months.start
+        return np.arange(start, start + len(sums)), sums, counts
+
+    def rollup(self, granularity=YEAR, profession=None, area_name=None, date_from=None, date_to=None):
+        """Средняя зарплата и число вакансий по годам, кварталам или месяцам
+
+        Args:
+            granularity (str): year, quarter или month
+            profession (str or None): профессия, None ― все вакансии
+            area_name (str or None): регион, None ― все регионы
+            date_from (str or None): первый месяц или год периода
+            date_to (str or None): последний месяц или год периода
+
+        Returns:
+            tuple[dict, dict]: средняя зарплата и число вакансий по периодам, в которых есть вакансии
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError('Неизвестная детализация: {0!r}, доступны: {1}'.format(granularity, ', '.join(GRANULARITIES)))
+        months, sums, counts = self.get_slice(profession, area_name, date_from, date_to)
+        step = GRANULARITIES[granularity]
+        periods = months // step - (months[0] // step if len(months) else 0)
+        period_sums = np.bincount(periods, weights=sums, minlength=periods.max() + 1 if len(periods) else 0)
+        period_counts = np.bincount(periods, weights=counts, minlength=len(period_sums)).astype(np.int64)
+        salary, count = {}, {}
+        for index in np.flatnonzero(period_counts).tolist():
+            key = format_period(int(months[0] // step + index) * step, granularity)
+            salary[key] = int(period_sums[index] / period_counts[index])
+            count[key] = int(period_counts[index])
+        return salary, count
+
+    def by_area(self, profession=None, date_from=None, date_to=None):
+        """Средняя зарплата и число вакансий по регионам за период
+
+        Returns:
+            tuple[dict, dict]: средняя зарплата и число вакансий по регионам, в которых есть вакансии
+        """
+        months, slot = self.get_range(date_from, date_to), self.get_slot(profession)
+        sums, counts = self.sums[months, :, slot].sum(axis=0), self.counts[months, :, slot].sum(axis=0)
+        present = np.flatnonzero(counts).tolist()
+        return ({self.areas[index]: int(sums[index] / counts[index]) for index in present},
+                {self.areas[index]: int(counts[index]) for index in present})
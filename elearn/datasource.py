@@ -0,0 +1,580 @@
+import csv
+import os
+import re
+import sqlite3
+
+from elearn.cache import file_fingerprint, make_key
+from elearn.dates import INVALID, parse_year, split_dates
+from elearn.matching import NameMatcher, contains, normalize
+from elearn.parquet import YEAR, check_available
+from elearn.quality import EMPTY_FIELD, EMPTY_SALARY, MALFORMED_DATE, RAGGED_ROW, SALARY_COLUMNS, RejectedRow, classify_empty
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNAR_DIRECTORY = os.path.join(ROOT, '.cache', 'columnar')
+CHUNK_ROWS = 100000
+PARTITION_YEAR = re.compile(r'(\d{4})')
+NAME, AREA, DATE = 'name', 'area_name', 'published_at'
+
+
+class Query:
+    """Класс ― описание запроса к источнику вакансий: какие столбцы нужны и какие строки отобрать
+
+    Источник сам решает, как применить запрос: пропустить ненужные столбцы при разборе,
+    не открывать чанки с другими годами или передать условия в SQL
+
+    Attributes:
+        columns (list[str] or None): нужные столбцы, None ― все
+        year_from (int or None): первый год публикации, включительно
+        year_to (int or None): последний год публикации, включительно
+        area_name (str or None): регион
+        vacancy_name (str or None): профессия, ищется в названии вакансии через elearn.matching
+    """
+    def __init__(self, columns=None, year_from=None, year_to=None, area_name=None, vacancy_name=None):
+        """Инициализирует объект Query
+
+        Args:
+            columns (Iterable[str] or None): нужные столбцы
+            year_from (int or None): первый год
+            year_to (int or None): последний год
+            area_name (str or None): регион
+            vacancy_name (str or None): подстрока названия вакансии
+        """
+        self.columns = None if columns is None else list(columns)
+        self.year_from = year_from
+        self.year_to = year_to
+        self.area_name = area_name
+        self.vacancy_name = vacancy_name or None
+
+    @property
+    def has_years(self):
+        return self.year_from is not None or self.year_to is not None
+
+    @property
+    def predicate_columns(self):
+        """Столбцы, которые нужны для проверки условий
+
+        >>> Query(['salary'], year_from=2020, vacancy_name='Аналитик').predicate_columns
+        ['published_at', 'name']
+
+        Returns:
+            list[str]: столбцы
+        """
+        return [column for column, used in ((DATE, self.has_years), (AREA, self.area_name is not None), (NAME, self.vacancy_name is not None)) if used]
+
+    def get_read_columns(self, available):
+        """Столбцы, которые нужно прочитать из источника: запрошенные и нужные для условий
+
+        >>> Query(['salary'], area_name='Москва').get_read_columns(['name', 'salary', 'area_name', 'published_at'])
+        ['salary', 'area_name']
+
+        Args:
+            available (list[str]): столбцы источника
+
+        Returns:
+            list[str]: столбцы в порядке источника
+        """
+        columns = set(available if self.columns is None else self.columns) | set(self.predicate_columns)
+        return [column for column in available if column in columns]
+
+    def get_output_columns(self, available):
+        return list(available) if self.columns is None else [column for column in self.columns if column in available]
+
+    def contains_year(self, year):
+        """Проверяет, попадает ли год в диапазон запроса
+
+        Args:
+            year (int): год
+
+        Returns:
+            bool: попадает ли
+        """
+        return (self.year_from is None or year >= self.year_from) and (self.year_to is None or year <= self.year_to)
+
+    def matches(self, row):
+        """Проверяет строку-словарь из CSV
+
+        Год берётся через elearn.dates, как и в остальных источниках
+
+        >>> Query(year_from=2022).matches({'published_at': '15.12.2022'})
+        Traceback (most recent call last):
+        ...
+        elearn.quality.RejectedRow: некорректная дата
+
+        Args:
+            row (dict[str, str]): строка
+
+        Returns:
+            bool: подходит ли строка под условия
+
+        Raises:
+            RejectedRow: если при условии на годы дату нельзя разобрать
+        """
+        if self.area_name is not None and row[AREA] != self.area_name:
+            return False
+        if self.vacancy_name is not None and not contains(row[NAME], self.vacancy_name):
+            return False
+        if not self.has_years:
+            return True
+        try:
+            return self.contains_year(parse_year(row[DATE]))
+        except ValueError:
+            raise RejectedRow(MALFORMED_DATE)
+
+    def get_mask(self, frame):
+        """Векторно проверяет строки таблицы
+
+        Args:
+            frame (DataFrame): таблица, в которой есть столбцы из predicate_columns
+
+        Returns:
+            Series: булева маска подходящих строк
+        """
+        import pandas as pd
+
+        mask = pd.Series(True, index=frame.index)
+        if self.area_name is not None:
+            mask &= frame[AREA] == self.area_name
+        if self.vacancy_name is not None:
+            mask &= NameMatcher(frame[NAME]).get_mask(self.vacancy_name)
+        if self.has_years:
+            # строки с некорректной датой не попадают ни в один диапазон лет
+            years = pd.Series(split_dates(frame[DATE], errors='coerce')[0], index=frame.index)
+            mask &= years != INVALID
+            if self.year_from is not None:
+                mask &= years >= self.year_from
+            if self.year_to is not None:
+                mask &= years <= self.year_to
+        return mask
+
+    def apply(self, frame):
+        """Отбирает строки и столбцы таблицы по запросу
+
+        Args:
+            frame (DataFrame): таблица
+
+        Returns:
+            DataFrame: результат запроса
+        """
+        if self.predicate_columns:
+            frame = frame[self.get_mask(frame)]
+        return frame[self.get_output_columns(frame.columns)].reset_index(drop=True)
+
+
+class DataSource:
+    """Базовый класс источника вакансий
+
+    Наследники реализуют read и, если умеют читать без pandas, rows
+    """
+    def read(self, query=None):
+        """Читает вакансии в таблицу
+
+        Args:
+            query (Query or None): запрос, None ― все строки и столбцы
+
+        Returns:
+            DataFrame: вакансии
+        """
+        raise NotImplementedError
+
+    def rows(self, query=None, quality=None):
+        """Построчно читает вакансии, пропуская строки с пустыми значениями
+
+        Args:
+            query (Query or None): запрос
+            quality (QualityReport or None): куда записать число прочитанных и отброшенных строк
+
+        Yields:
+            dict: строка
+        """
+        frame = self.read(query)
+        empty = frame.isna().any(axis=1)
+        if quality is not None:
+            quality.rows += len(frame)
+            salaries = frame[[column for column in frame.columns if column in SALARY_COLUMNS]].isna().any(axis=1)
+            for reason, mask in ((EMPTY_SALARY, empty & salaries), (EMPTY_FIELD, empty & ~salaries)):
+                for row in frame[mask].to_dict('records'):
+                    quality.reject(reason, row)
+        yield from frame[~empty].to_dict('records')
+
+    def fingerprint(self):
+        """Отпечаток содержимого источника для кэшей
+
+        Returns:
+            str: отпечаток
+        """
+        raise NotImplementedError
+
+
+class CsvSource(DataSource):
+    """Класс ― один CSV-файл с вакансиями
+
+    Attributes:
+        path (str): путь до файла
+    """
+    def __init__(self, path):
+        """Инициализирует объект CsvSource
+
+        Args:
+            path (str): путь до файла
+        """
+        self.path = path
+
+    def get_columns(self):
+        """Заголовок файла
+
+        Returns:
+            list[str]: столбцы
+        """
+        with open(self.path, mode='r', encoding='utf-8-sig') as file:
+            return next(csv.reader(file), [])
+
+    def read(self, query=None):
+        import pandas as pd
+
+        query = query or Query()
+        columns = query.get_read_columns(self.get_columns())
+        if not query.predicate_columns:
+            return query.apply(pd.read_csv(self.path, usecols=columns))
+        # с условиями файл разбирается частями, и в памяти остаются только подходящие строки
+        parts = [query.apply(chunk) for chunk in pd.read_csv(self.path, usecols=columns, chunksize=CHUNK_ROWS)]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=query.get_output_columns(columns))
+
+    def rows(self, query=None, quality=None):
+        # проверка качества идёт после условий запроса, поэтому quality учитывает только строки, которые запрос отбирает;
+        # строку с неверным числом столбцов, пустым полем из условия или некорректной датой при условии на годы
+        # проверить нельзя, она считается отброшенной
+        query = query or Query()
+        with open(self.path, mode='r', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            header_length = len(header)
+            columns = query.get_read_columns(header)
+            indexes = [header.index(column) for column in columns]
+            output = query.get_output_columns(header)
+            predicate_columns = query.predicate_columns
+            for row in reader:
+                if len(row) != header_length:
+                    if quality is not None:
+                        quality.rows += 1
+                        quality.reject(RAGGED_ROW, row)
+                    continue
+                values = [row[index] for index in indexes]
+                record = dict(zip(columns, values))
+                try:
+                    if predicate_columns and '' not in (record[column] for column in predicate_columns) and not query.matches(record):
+                        continue
+                except RejectedRow as error:
+                    if quality is not None:
+                        quality.rows += 1
+                        quality.reject(error.reason, row)
+                    continue
+                if quality is not None:
+                    quality.rows += 1
+                if '' in values:
+                    if quality is not None:
+                        quality.reject(classify_empty(columns, values), row)
+                    continue
+                yield record if len(output) == len(record) else {column: record[column] for column in output}
+
+    def fingerprint(self):
+        return file_fingerprint(self.path)
+
+
+class PartitionedCsvSource(DataSource):
+    """Класс ― директория с CSV-чанками по годам (vacancies_by_<год>.csv, как их пишет 3.2.1.py)
+
+    Чанки, год которых не попадает в диапазон запроса, не открываются
+
+    Attributes:
+        directory (str): директория с чанками
+    """
+    def __init__(self, directory):
+        """Инициализирует объект PartitionedCsvSource
+
+        Args:
+            directory (str): директория с чанками
+        """
+        self.directory = directory
+
+    def get_partitions(self, query=None):
+        """Чанки, которые нужно прочитать для запроса
+
+        Args:
+            query (Query or None): запрос
+
+        Returns:
+            list[str]: пути до чанков
+        """
+        query = query or Query()
+        paths = []
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith('.csv'):
+                continue
+            match = PARTITION_YEAR.search(file_name)
+            if match is None or not query.has_years or query.contains_year(int(match.group(1))):
+                paths.append(os.path.join(self.directory, file_name))
+        return paths
+
+    def read(self, query=None):
+        import pandas as pd
+
+        query = query or Query()
+        parts = [CsvSource(path).read(query) for path in self.get_partitions(query)]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=query.columns)
+
+    def rows(self, query=None, quality=None):
+        for path in self.get_partitions(query):
+            yield from CsvSource(path).rows(query, quality)
+
+    def fingerprint(self):
+        return make_key(*((os.path.basename(path), file_fingerprint(path)) for path in self.get_partitions()))
+
+
+class SqliteSource(DataSource):
+    """Класс ― таблица вакансий в базе SQLite, условия и столбцы запроса передаются в SQL
+
+    Attributes:
+        database (str): путь до базы данных
+        table (str): таблица с вакансиями
+    """
+    def __init__(self, database, table='vacancies'):
+        """Инициализирует объект SqliteSource
+
+        Args:
+            database (str): путь до базы данных
+            table (str): таблица с вакансиями
+        """
+        self.database = database
+        self.table = table
+
+    def connect(self):
+        connection = sqlite3.connect(self.database)
+        connection.create_function('normalize', 1, lambda name: None if name is None else normalize(name), deterministic=True)
+        return connection
+
+    def get_columns(self):
+        """Столбцы таблицы
+
+        Returns:
+            list[str]: столбцы
+        """
+        with self.connect() as connection:
+            return [row[1] for row in connection.execute('PRAGMA table_info(`{0}`)'.format(self.table)) if row[1] != 'index']
+
+    def get_sql(self, query):
+        """Строит SQL-запрос с проекцией и условиями
+
+        Год сравнивается как строка по началу published_at, поэтому подходит и для дат вида YYYY-MM,
+        а профессия ищется через instr по названию, нормализованному той же функцией, что и в остальных
+        источниках: встроенные lower и LIKE не понимают кириллицу
+
+        Args:
+            query (Query): запрос
+
+        Returns:
+            tuple[str, list]: SQL и параметры
+        """
+        columns = query.get_output_columns(self.get_columns())
+        conditions, parameters = [], []
+        if query.year_from is not None:
+            conditions.append('`published_at` >= ?')
+            parameters.append('{0:04d}'.format(query.year_from))
+        if query.year_to is not None:
+            conditions.append('`published_at` < ?')
+            parameters.append('{0:04d}'.format(query.year_to + 1))
+        if query.area_name is not None:
+            conditions.append('`area_name` = ?')
+            parameters.append(query.area_name)
+        if query.vacancy_name is not None:
+            conditions.append('instr(normalize(`name`), ?) > 0')
+            parameters.append(normalize(query.vacancy_name))
+        sql = 'SELECT {0} FROM `{1}`'.format(', '.join('`{0}`'.format(column) for column in columns), self.table)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        return sql, parameters
+
+    def read(self, query=None):
+        import pandas as pd
+
+        sql, parameters = self.get_sql(query or Query())
+        with self.connect() as connection:
+            return pd.read_sql(sql, connection, params=parameters)
+
+    def rows(self, query=None, quality=None):
+        sql, parameters = self.get_sql(query or Query())
+        with self.connect() as connection:
+            cursor = connection.execute(sql, parameters)
+            columns = [description[0] for description in cursor.description]
+            for row in cursor:
+                if quality is not None:
+                    quality.rows += 1
+                if None not in row and '' not in row:
+                    yield dict(zip(columns, row))
+                elif quality is not None:
+                    quality.reject(classify_empty(columns, ['' if value is None else value for value in row]), row)
+
+    def fingerprint(self):
+        return make_key(file_fingerprint(self.database), self.table)
+
+
+class ParquetSource(DataSource):
+    """Класс ― файл Parquet, например, записанный elearn.parquet.ParquetWriter после конвертации
+
+    Читаются только нужные столбцы, а условия на год и регион передаются в pyarrow: группы строк,
+    у которых по статистике min/max столбца year нет нужных лет, не читаются с диска.
+    Профессия проверяется после чтения через elearn.matching. Если в файле нет столбца year,
+    условия проверяются по прочитанной таблице
+
+    Attributes:
+        path (str): путь до файла
+    """
+    def __init__(self, path):
+        """Инициализирует объект ParquetSource
+
+        Args:
+            path (str): путь до файла
+        """
+        check_available()
+        self.path = path
+
+    def get_columns(self):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(self.path).names
+
+    def read(self, query=None):
+        import pyarrow.parquet as pq
+
+        query = query or Query()
+        available = self.get_columns()
+        if YEAR not in available:
+            return query.apply(pq.read_table(self.path, columns=query.get_read_columns(available)).to_pandas())
+        filters = []
+        if query.year_from is not None:
+            filters.append((YEAR, '>=', query.year_from))
+        if query.year_to is not None:
+            filters.append((YEAR, '<=', query.year_to))
+        if query.area_name is not None:
+            filters.append((AREA, '==', query.area_name))
+        columns = query.get_output_columns(available)
+        read_columns = columns + [NAME] if query.vacancy_name is not None and NAME not in columns else columns
+        frame = pq.read_table(self.path, columns=read_columns, filters=filters or None).to_pandas()
+        if query.vacancy_name is not None:
+            frame = frame[NameMatcher(frame[NAME]).get_mask(query.vacancy_name)]
+        return frame[columns].reset_index(drop=True)
+
+    def fingerprint(self):
+        return file_fingerprint(self.path)
+
+
+class ColumnarCacheSource(DataSource):
+    """Класс ― кэш другого источника в виде отдельных файлов .npy на каждый столбец
+
+    При первом обращении источник читается целиком и раскладывается по столбцам, рядом сохраняются
+    столбец year и нормализованные названия вакансий (elearn.matching). Дальше запрос загружает только нужные столбцы, а условия проверяются по массивам
+    до сборки таблицы. Кэш привязан к отпечатку источника и перестраивается при его изменении
+
+    Attributes:
+        source (DataSource): исходный источник
+        directory (str): директория кэша
+    """
+    def __init__(self, source, directory=COLUMNAR_DIRECTORY):
+        """Инициализирует объект ColumnarCacheSource
+
+        Args:
+            source (DataSource): исходный источник
+            directory (str): директория кэша
+        """
+        self.source = source
+        self.directory = directory
+
+    def get_path(self):
+        """Директория кэша для текущего содержимого источника, строит кэш при необходимости
+
+        Returns:
+            str: путь
+        """
+        import numpy as np
+
+        path = os.path.join(self.directory, self.source.fingerprint())
+        if os.path.isdir(path):
+            return path
+        frame = self.source.read()
+        temporary = path + '.tmp{0}'.format(os.getpid())
+        os.makedirs(temporary, exist_ok=True)
+        for column in frame.columns:
+            values = frame[column].to_numpy()
+            np.save(os.path.join(temporary, column + '.npy'), values, allow_pickle=values.dtype == object)
+        if DATE in frame.columns:
+            years = split_dates(frame[DATE], errors='coerce')[0].astype(np.int32)
+            np.save(os.path.join(temporary, 'year.npy'), years)
+        if NAME in frame.columns:
+            matcher = NameMatcher(frame[NAME])
+            np.save(os.path.join(temporary, 'name_codes.npy'), matcher.codes)
+            np.save(os.path.join(temporary, 'name_normalized.npy'), matcher.names)
+        with open(os.path.join(temporary, 'columns.txt'), 'w', encoding='utf-8') as file:
+            file.write('\n'.join(frame.columns))
+        try:
+            os.replace(temporary, path)
+        except OSError:
+            # кэш уже построил параллельный процесс
+            import shutil
+
+            shutil.rmtree(temporary, ignore_errors=True)
+        return path
+
+    def read(self, query=None):
+        import numpy as np
+        import pandas as pd
+
+        query = query or Query()
+        path = self.get_path()
+        with open(os.path.join(path, 'columns.txt'), encoding='utf-8') as file:
+            available = file.read().split('\n')
+
+        def load(column):
+            return np.load(os.path.join(path, column + '.npy'), allow_pickle=True)
+
+        mask = None
+        if query.has_years:
+            years = np.load(os.path.join(path, 'year.npy'))
+            mask = (years != INVALID) & (years >= (query.year_from if query.year_from is not None else np.iinfo(np.int32).min)) \
+                & (years <= (query.year_to if query.year_to is not None else np.iinfo(np.int32).max))
+        if query.area_name is not None:
+            area_mask = load(AREA) == query.area_name
+            mask = area_mask if mask is None else mask & area_mask
+        if query.vacancy_name is not None:
+            if os.path.exists(os.path.join(path, 'name_normalized.npy')):
+                matcher = NameMatcher.from_arrays(np.load(os.path.join(path, 'name_codes.npy')), np.load(os.path.join(path, 'name_normalized.npy')))
+            else:
+                matcher = NameMatcher(load(NAME))
+            name_mask = matcher.get_mask(query.vacancy_name)
+            mask = name_mask if mask is None else mask & name_mask
+        columns = query.get_output_columns(available)
+        return pd.DataFrame({column: load(column) if mask is None else load(column)[mask] for column in columns}, columns=columns)
+
+    def fingerprint(self):
+        return self.source.fingerprint()
+
+
+def open_source(path, table='vacancies'):
+    """Открывает источник по пути: директория ― чанки, .db/.sqlite ― SQLite, .parquet ― Parquet, иначе ― CSV
+
+    >>> type(open_source('vacancies.db')).__name__, type(open_source('vacancies.csv')).__name__
+    ('SqliteSource', 'CsvSource')
+
+    Args:
+        path (str): путь до файла или директории
+        table (str): таблица для SQLite
+
+    Returns:
+        DataSource: источник
+    """
+    if os.path.isdir(path):
+        return PartitionedCsvSource(path)
+    if os.path.splitext(path)[1] in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteSource(path, table)
+    if os.path.splitext(path)[1] == '.parquet':
+        return ParquetSource(path)
+    return CsvSource(path)
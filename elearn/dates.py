@@ -0,0 +1,127 @@
+from functools import lru_cache
+
+
+DATE_LENGTH = 10
+SEPARATORS = (4, 7)
+DIGITS = (0, 1, 2, 3, 5, 6, 8, 9)
+
+
+DATE_CACHE = 4096
+INVALID = -1
+
+
+def parse_date(published_at):
+    """Разбирает дату публикации вакансии в формате ISO (например, 2022-12-15T05:12:41+0300)
+
+    Разбор построен на срезах по фиксированным позициям, как самый быстрый метод из profiler.py.
+    Время публикации почти у каждой вакансии своё, а день повторяется в тысячах строк, поэтому
+    запоминается разбор только первых 10 символов, и кэш ограничен DATE_CACHE днями
+
+    >>> parse_date('2022-12-15T05:12:41+0300')
+    (2022, 12, 15)
+    >>> parse_date('2020-09-20')
+    (2020, 9, 20)
+    >>> parse_date('15.12.2022')
+    Traceback (most recent call last):
+    ...
+    ValueError: Некорректная дата: '15.12.2022'
+
+    Args:
+        published_at (str): дата публикации, первые 10 символов которой имеют вид YYYY-MM-DD
+
+    Returns:
+        tuple[int, int, int]: год, месяц и день
+    """
+    try:
+        return _parse_day(published_at[:DATE_LENGTH])
+    except ValueError:
+        raise ValueError('Некорректная дата: {0!r}'.format(published_at)) from None
+
+
+@lru_cache(maxsize=DATE_CACHE)
+def _parse_day(date):
+    if len(date) != DATE_LENGTH or date[4] != '-' or date[7] != '-' or not (date[:4] + date[5:7] + date[8:]).isdigit():
+        raise ValueError(date)
+    year, month, day = int(date[:4]), int(date[5:7]), int(date[8:])
+    if not 1 <= month <= 12 or not 1 <= day <= 31:
+        raise ValueError(date)
+    return year, month, day
+
+
+def parse_year(published_at):
+    """Возвращает год публикации вакансии
+
+    >>> parse_year('2022-12-15T05:12:41+0300')
+    2022
+
+    Args:
+        published_at (str): дата публикации в формате ISO
+
+    Returns:
+        int: год
+    """
+    return parse_date(published_at)[0]
+
+
+def format_month(published_at):
+    """Возвращает месяц публикации вакансии в формате YYYY-MM, как в таблице курсов валют
+
+    >>> format_month('2022-12-15T05:12:41+0300')
+    '2022-12'
+
+    Args:
+        published_at (str): дата публикации в формате ISO
+
+    Returns:
+        str: месяц
+    """
+    year, month, _ = parse_date(published_at)
+    return '{0:04}-{1:02}'.format(year, month)
+
+
+def split_dates(dates, errors='raise'):
+    """Векторно переводит столбец дат в формате ISO в целочисленные массивы года, месяца и дня
+
+    Строки обрезаются до 10 байт, после чего цифры берутся по фиксированным смещениям
+    без разбора каждой строки в Python
+
+    >>> years, months, days = split_dates(['2022-12-15T05:12:41+0300', '2003-01-07T00:00:00+0400'])
+    >>> years.tolist(), months.tolist(), days.tolist()
+    ([2022, 2003], [12, 1], [15, 7])
+    >>> split_dates(['2022-12-15', '2022/12/15'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Некорректная дата в строке 1: '2022/12/15'
+    >>> split_dates(['2022-12-15', None], errors='coerce')[0].tolist()
+    [2022, -1]
+
+    Args:
+        dates (Iterable[str] or Series): столбец дат
+        errors (str): 'raise' ― ошибка на некорректной дате, 'coerce' ― год, месяц и день такой строки равны INVALID
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: массивы года, месяца и дня
+    """
+    import numpy as np
+
+    values = np.asarray(dates, dtype=object)
+    try:
+        raw = np.asarray(values, dtype='S{0}'.format(DATE_LENGTH))
+    except UnicodeEncodeError:
+        raw = np.array([str(value)[:DATE_LENGTH].encode('ascii', 'replace') for value in values], dtype='S{0}'.format(DATE_LENGTH))
+    matrix = raw.view(np.uint8).reshape(-1, DATE_LENGTH)
+    digits = matrix.astype(np.int32) - ord('0')
+    years = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    months = digits[:, 5] * 10 + digits[:, 6]
+    days = digits[:, 8] * 10 + digits[:, 9]
+    valid = (
+        (matrix[:, list(SEPARATORS)] == ord('-')).all(axis=1)
+        & ((digits[:, list(DIGITS)] >= 0) & (digits[:, list(DIGITS)] <= 9)).all(axis=1)
+        & (months >= 1) & (months <= 12) & (days >= 1) & (days <= 31)
+    )
+    if errors == 'coerce':
+        return tuple(np.where(valid, array, INVALID) for array in (years, months, days))
+    if not valid.all():
+        index = int(np.argmin(valid))
+        raise ValueError('Некорректная дата в строке {0}: {1!r}'.format(index, values[index]))
+    return years, months, days
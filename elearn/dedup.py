@@ -0,0 +1,166 @@
+import csv
+import hashlib
+import os
+import sqlite3
+
+
+SEPARATOR = '\x1f'
+
+
+def normalize_field(value):
+    """Значение поля в ключе: пропуски ― пустая строка, числа ― в одном виде, как бы они ни были записаны
+
+    >>> [normalize_field(value) for value in (90000, '90000.0', None, '', float('nan'), 'Москва')]
+    ['90000.0', '90000.0', '', '', '', 'Москва']
+    """
+    if value is None or value == '' or value != value:
+        return ''
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def get_vacancy_keys(vacancy_id, row):
+    """Ключи вакансии для поиска дублей: ключ, под которым она хранится, и ключи, с которыми она сравнивается
+
+    Вакансия с id из API хранится под id, а без id ― под хешем значимых полей. Вакансия с id сравнивается
+    по хешу только с вакансиями без id (например, собранными в CSV-файл до появления индекса),
+    поэтому разные вакансии с одинаковыми полями, но разными id, как у массовых публикаций одного
+    работодателя, не считаются дублями. Хеш вакансии с id хранится отдельно, чтобы с ней совпала такая же
+    вакансия без id. Числа и пропуски приводятся к одному виду, поэтому строка, прочитанная из CSV,
+    даёт тот же хеш, что и вакансия из ответа API
+
+    >>> row = ('Программист', 100, None, 'RUR', 'Москва', '2022-12-15T05:12:41+0300')
+    >>> key, matches, extra = get_vacancy_keys('73079421', row)
+    >>> key, matches[0][:5], extra[0][:8]
+    ('id:73079421', 'hash:', 'id-hash:')
+    >>> get_vacancy_keys(None, ('Программист', '100.0', '', 'RUR', 'Москва', '2022-12-15T05:12:41+0300'))[0] == matches[0]
+    True
+
+    Args:
+        vacancy_id (str or None): id вакансии
+        row (Iterable): поля вакансии: название, зарплата, регион, дата публикации
+
+    Returns:
+        tuple[str, tuple[str, ...], tuple[str, ...]]: ключ вакансии, другие ключи, любой из которых делает её дублем,
+        и ключи, которые запоминаются вместе с ней
+    """
+    fields = SEPARATOR.join(normalize_field(value) for value in row)
+    digest = hashlib.blake2b(fields.encode('utf-8'), digest_size=16).hexdigest()
+    if vacancy_id is None:
+        return 'hash:' + digest, ('id-hash:' + digest,), ()
+    return 'id:{0}'.format(vacancy_id), ('hash:' + digest,), ('id-hash:' + digest,)
+
+
+class DedupIndex:
+    """Класс ― постоянное множество уже сохранённых вакансий в SQLite с уникальным индексом по ключу
+
+    Проверка и добавление ключа делаются одним INSERT OR IGNORE, поэтому каждая строка пачки
+    стоит несколько поисков по индексу, а множество не нужно держать в памяти и оно переживает перезапуск.
+    Какие ключи сравниваются, описано в get_vacancy_keys. filter не фиксирует ключи:
+    вызывающий сначала сохраняет новые строки и только потом вызывает commit, поэтому после сбоя
+    между ними ключи откатываются и вакансии не теряются
+
+    Attributes:
+        path (str): путь до базы данных
+        connection (sqlite3.Connection): соединение с базой
+        added (int): сколько новых вакансий пропущено за время работы
+        duplicates (int): сколько дублей отброшено за время работы
+    """
+    def __init__(self, path):
+        """Инициализирует объект DedupIndex и создаёт таблицу, если её нет
+
+        Args:
+            path (str): путь до базы данных
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        self.added = 0
+        self.duplicates = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def filter(self, batch):
+        """Отбирает из пачки вакансии, которых ещё не было, и запоминает их ключи до commit или rollback
+
+        Args:
+            batch (Iterable[tuple[str or None, tuple]]): пары id вакансии и её строка
+
+        Returns:
+            list[tuple]: строки новых вакансий в исходном порядке
+        """
+        rows = []
+        for vacancy_id, row in batch:
+            key, matches, extra = get_vacancy_keys(vacancy_id, row)
+            if not any(self.contains(match) for match in matches) and self.insert(key):
+                for other in extra:
+                    self.insert(other)
+                rows.append(row)
+            else:
+                self.duplicates += 1
+        self.added += len(rows)
+        return rows
+
+    def contains(self, key):
+        return self.connection.execute('SELECT 1 FROM seen WHERE key = ?', (key,)).fetchone() is not None
+
+    def insert(self, key):
+        return self.connection.execute('INSERT OR IGNORE INTO seen (key) VALUES (?)', (key,)).rowcount == 1
+
+    def commit(self):
+        """Фиксирует ключи, отобранные filter, после того как строки сохранены"""
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def load_csv(self, path):
+        """Запоминает вакансии, которые уже лежат в CSV-файле, например, собранном до появления индекса
+
+        Args:
+            path (str): CSV-файл со столбцами вакансии без id
+        """
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                self.insert(get_vacancy_keys(None, row)[0])
+        self.commit()
+
+    def clear(self):
+        """Забывает все вакансии, например, когда файл с результатами удалён"""
+        with self.connection:
+            self.connection.execute('DELETE FROM seen')
+
+    def close(self):
+        self.connection.close()
+
+
+def open_index(path, output_file):
+    """Открывает индекс для файла с результатами
+
+    Если файла нет, индекс очищается, чтобы не терять вакансии. Если индекс пуст, а файл есть,
+    в индекс загружаются вакансии из файла, чтобы первый запуск не дописал их повторно
+
+    Args:
+        path (str): путь до базы данных индекса
+        output_file (str): CSV-файл, в который дописываются новые вакансии
+
+    Returns:
+        DedupIndex: индекс
+    """
+    index = DedupIndex(path)
+    if not os.path.exists(output_file):
+        index.clear()
+    elif not len(index):
+        index.load_csv(output_file)
+    return index
@@ -0,0 +1,165 @@
+import fcntl
+import functools
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DICTIONARY_DIRECTORY = os.path.join(ROOT, '.cache', 'dictionaries')
+MISSING = -1
+
+
+class Dictionary:
+    """Класс ― словарь столбца: каждому значению (региону, валюте) сопоставлен небольшой целый код
+
+    Коды только добавляются и никогда не меняются, поэтому словарь можно сохранить на диск и использовать
+    в следующих запусках и в других процессах: одинаковые значения получают одинаковые коды. Значения, которые
+    процесс добавил сам, получают коды этого процесса до save, которое согласует их с файлом.
+    По кодам группировка делается через np.bincount, а справочники вроде курсов валют ― через индекс массива
+
+    >>> areas = Dictionary()
+    >>> areas.encode_array(['Москва', 'Казань', 'Москва', None]).tolist()
+    [0, 1, 0, -1]
+    >>> areas.encode('Пермь'), areas.decode(1)
+    (2, 'Казань')
+
+    Attributes:
+        path (str or None): файл, в котором хранится словарь
+        values (list[str]): значения, индекс значения ― его код
+        codes (dict[str, int]): коды значений
+        saved (int): сколько значений уже записано в файл
+    """
+    def __init__(self, path=None):
+        """Инициализирует объект Dictionary и загружает сохранённые значения
+
+        Args:
+            path (str or None): JSON-файл словаря, None ― словарь только в памяти
+        """
+        self.path = path
+        self.values = []
+        self.codes = {}
+        if path is not None:
+            for value in self.read():
+                self.encode(value)
+        self.saved = len(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        """Возвращает код значения, добавляя значение в словарь при первой встрече
+
+        Args:
+            value (str): значение
+
+        Returns:
+            int: код
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode_array(self, values):
+        """Кодирует столбец целиком: каждое уникальное значение ищется в словаре один раз
+
+        Args:
+            values (Iterable[str]): столбец, пропуски (None, NaN) получают код MISSING
+
+        Returns:
+            np.ndarray: коды int32
+        """
+        import pandas as pd
+
+        uniques_codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        lookup = np.array([self.encode(value) for value in uniques] + [MISSING], dtype=np.int32)
+        return lookup[uniques_codes]
+
+    def decode(self, code):
+        return self.values[code]
+
+    def decode_array(self, codes):
+        """Превращает коды обратно в значения
+
+        Args:
+            codes (Iterable[int]): коды
+
+        Returns:
+            list[str]: значения
+        """
+        return [self.values[code] for code in codes]
+
+    def get_table(self, mapping, default=np.nan):
+        """Справочник в виде массива, индекс которого ― код значения
+
+        >>> currencies = Dictionary()
+        >>> currencies.get_table({'RUR': 1, 'USD': 60.66})[currencies.encode_array(['USD', 'RUR'])].tolist()
+        [60.66, 1.0]
+
+        Args:
+            mapping (dict[str, float]): справочник по значениям
+            default (float): значение для кодов, которых нет в справочнике
+
+        Returns:
+            np.ndarray: массив float64 длиной len(self) для всех значений из mapping
+        """
+        for value in mapping:
+            self.encode(value)
+        return np.array([mapping.get(value, default) for value in self.values], dtype=np.float64)
+
+    def save(self):
+        """Сохраняет новые значения в файл словаря, объединяя их со значениями, которые сохранили другие процессы
+
+        Файл меняется под блокировкой: он перечитывается, коды, которые уже в файле, не меняются, а новые значения
+        этого процесса дописываются в конец. Если другой процесс успел сохранить свои значения, коды значений
+        этого процесса сдвигаются, поэтому save возвращает таблицу перекодировки для уже закодированных массивов
+
+        >>> areas = Dictionary()
+        >>> codes = areas.encode_array(['Москва', None])
+        >>> areas.save()[codes].tolist()
+        [0, -1]
+
+        Returns:
+            np.ndarray: новый код для каждого старого кода, последний элемент переводит MISSING в MISSING
+        """
+        values = self.values
+        if self.path is not None and self.saved != len(self.values):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + '.lock', 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                saved = self.read()
+                known = set(saved)
+                merged = saved + [value for value in self.values if value not in known]
+                descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                    json.dump(merged, file, ensure_ascii=False)
+                os.replace(temporary, self.path)
+            self.values, self.codes = [], {}
+            for value in merged:
+                self.encode(value)
+            self.saved = len(self.values)
+        return np.array([self.codes[value] for value in values] + [MISSING], dtype=np.int32)
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+
+@functools.lru_cache(maxsize=None)
+def get_dictionary(column, directory=DICTIONARY_DIRECTORY):
+    """Возвращает общий для процесса словарь столбца, сохранённый в директории кэша
+
+    Args:
+        column (str): столбец, например area_name или salary_currency
+        directory (str): директория со словарями
+
+    Returns:
+        Dictionary: словарь столбца
+    """
+    return Dictionary(os.path.join(directory, column + '.json'))
@@ -0,0 +1,122 @@
+from itertools import chain, islice
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+
+WIDTH_SAMPLE = 1000
+THIN = Side(border_style='thin', color='00000000')
+BORDER = Border(left=THIN, bottom=THIN, right=THIN, top=THIN)
+HEADER = 'report_header'
+CELL = 'report_cell'
+PERCENT = 'report_percent'
+
+
+def make_styles():
+    """Создаёт именованные стили отчёта: они регистрируются в книге один раз и переиспользуются всеми ячейками
+
+    Returns:
+        dict[str, NamedStyle]: стили заголовка, обычной ячейки и ячейки с процентами
+    """
+    return {
+        HEADER: NamedStyle(name=HEADER, font=Font(bold=True), border=BORDER),
+        CELL: NamedStyle(name=CELL, border=BORDER),
+        PERCENT: NamedStyle(name=PERCENT, border=BORDER, number_format='0.00%'),
+    }
+
+
+class StreamingExcelWriter:
+    """Класс записывает Excel-отчёт потоково через write-only книгу openpyxl
+
+    Строки сразу сериализуются на диск, поэтому память не растёт с количеством строк,
+    а стили не создаются для каждой ячейки, а берутся из заранее зарегистрированных NamedStyle
+
+    Attributes:
+        wb (Workbook): write-only книга
+        styles (dict[str, NamedStyle]): именованные стили, зарегистрированные в книге
+    """
+    def __init__(self):
+        """Инициализирует объект StreamingExcelWriter и регистрирует стили"""
+        self.wb = Workbook(write_only=True)
+        self.styles = make_styles()
+        for style in self.styles.values():
+            self.wb.add_named_style(style)
+
+    def add_sheet(self, title, header, rows, widths=None, bordered=None, percent=()):
+        """Добавляет лист и потоково записывает в него строки
+
+        Ширина столбцов в write-only режиме задаётся до записи строк, поэтому, если widths не передан,
+        она считается по заголовку и первым WIDTH_SAMPLE строкам
+
+        Args:
+            title (str): название листа
+            header (list[str]): заголовок
+            rows (Iterable[list]): строки, могут быть генератором
+            widths (list[int] or None): ширина столбцов без отступа
+            bordered (Iterable[int] or None): индексы столбцов с рамкой, по умолчанию ― все
+            percent (Iterable[int]): индексы столбцов в процентном формате
+        """
+        ws = self.wb.create_sheet(title)
+        rows = iter(rows)
+        sample = list(islice(rows, WIDTH_SAMPLE))
+        if widths is None:
+            widths = self.get_widths([header] + sample)
+        for index, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(index)].width = width + 2
+
+        bordered = set(range(len(header)) if bordered is None else bordered)
+        percent = set(percent)
+        ws.append([self.make_cell(ws, value, HEADER if index in bordered else None) for index, value in enumerate(header)])
+        row_styles = [PERCENT if index in percent else CELL if index in bordered else None for index in range(len(header))]
+        for row in chain(sample, rows):
+            ws.append([self.make_cell(ws, value, style) for value, style in zip(row, row_styles)])
+
+    @staticmethod
+    def make_cell(ws, value, style):
+        """Создаёт ячейку write-only листа с именованным стилем
+
+        Args:
+            ws (WriteOnlyWorksheet): лист
+            value: значение ячейки
+            style (str or None): название стиля
+
+        Returns:
+            WriteOnlyCell: ячейка
+        """
+        cell = WriteOnlyCell(ws, value=value)
+        if style is not None:
+            cell.style = style
+        return cell
+
+    @staticmethod
+    def get_widths(rows):
+        """Считает ширину столбцов по длине самого длинного значения
+
+        >>> StreamingExcelWriter.get_widths([['Город', 'Доля'], ['Санкт-Петербург', 0.0712]])
+        [15, 6]
+
+        Args:
+            rows (list[list]): строки
+
+        Returns:
+            list[int]: ширина каждого столбца
+        """
+        widths = []
+        for row in rows:
+            for index, value in enumerate(row):
+                length = len(str(value))
+                if index < len(widths):
+                    widths[index] = max(widths[index], length)
+                else:
+                    widths.append(length)
+        return widths
+
+    def save(self, file_name):
+        """Сохраняет книгу
+
+        Args:
+            file_name (str): путь до файла
+        """
+        self.wb.save(file_name)
@@ -3,6 +3,10 @@ from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Border, Side
 
+from elearn.dates import parse_year
+from elearn.matching import contains
+from elearn.ranking import top_n
+
 
 class Vacancy:
     """Класс для представления вакансии
@@ -49,7 +53,7 @@ class Vacancy:
         self.salary_currency = vacancy['salary_currency']
         self.salary_average = self.get_average_salary()
         self.area_name = vacancy['area_name']
-        self.year = int(vacancy['published_at'][:4])
+        self.year = parse_year(vacancy['published_at'])
 
     def get_average_salary(self):
         """Метод высчитывает среднюю зарплату в рублях
@@ -182,7 +186,7 @@ class DataSet:
         for vacancy_dictionary in self.csv_reader():
             vacancy = Vacancy(vacancy_dictionary)
             self.increment(salary, vacancy.year, [vacancy.salary_average])
-            if vacancy.name.find(self.vacancy_name) != -1:
+            if contains(vacancy.name, self.vacancy_name):
                 self.increment(salary_of_vacancy_name, vacancy.year, [vacancy.salary_average])
             self.increment(salary_city, vacancy.area_name, [vacancy.salary_average])
             count_of_vacancies += 1
@@ -198,17 +202,10 @@ class DataSet:
         stats2 = self.average(salary_of_vacancy_name)
         stats3 = self.average(salary_city)
 
-        stats4 = {}
-        for year, salaries in salary_city.items():
-            stats4[year] = round(len(salaries) / count_of_vacancies, 4)
-        stats4 = list(filter(lambda a: a[-1] >= 0.01, [(key, value) for key, value in stats4.items()]))
-        self.sort_list_of_tuples_by_value(stats4)
-        stats5 = stats4.copy()
-        stats4 = dict(stats4)
-        stats3 = list(filter(lambda a: a[0] in list(stats4.keys()), [(key, value) for key, value in stats3.items()]))
-        self.sort_list_of_tuples_by_value(stats3)
-        stats3 = dict(stats3[:10])
-        stats5 = dict(stats5[:10])
+        shares = [(city, round(len(salaries) / count_of_vacancies, 4)) for city, salaries in salary_city.items()]
+        frequent = {city for city, share in shares if share >= 0.01}
+        stats3 = dict(top_n(stats3.items(), allowed=frequent))
+        stats5 = dict(top_n(shares, threshold=0.01))
 
         return stats, vacancies_number, stats2, vacancies_number_by_name, stats3, stats5
 
@@ -347,8 +344,7 @@ class Report:
             for col in 'ABDE':
                 ws2[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
 
-        self.stats1[1] = 1
-        for row, _ in enumerate(self.stats1):
+        for row in range(len(self.stats1) + 1):
             for col in 'ABCDE':
                 ws1[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
 
@@ -0,0 +1,101 @@
+import functools
+import re
+
+
+WHITESPACE = re.compile(r'\s+')
+NAME_CACHE = 65536
+
+
+@functools.lru_cache(maxsize=NAME_CACHE)
+def normalize(text):
+    """Приводит название к виду, в котором ищется профессия: без регистра, ё как е, пробелы схлопнуты
+
+    Названия вакансий сильно повторяются, поэтому результат кэшируется и построчное сравнение
+    нормализует каждое уникальное название один раз
+
+    >>> normalize('  Ведущий   ЁЛОЧНЫЙ\\tпрограммист ')
+    'ведущий елочный программист'
+
+    Args:
+        text (str): название вакансии или профессии
+
+    Returns:
+        str: нормализованная строка
+    """
+    return WHITESPACE.sub(' ', text.casefold().replace('ё', 'е')).strip()
+
+
+def contains(name, vacancy_name):
+    """Проверяет одну вакансию: входит ли профессия в название как подстрока после нормализации
+
+    >>> contains('Старший АНАЛИТИК  данных', 'аналитик данных'), contains('Аналитик', 'Analyst')
+    (True, False)
+
+    Args:
+        name (str): название вакансии
+        vacancy_name (str): профессия
+
+    Returns:
+        bool: подходит ли вакансия
+    """
+    return normalize(vacancy_name) in normalize(name)
+
+
+class NameMatcher:
+    """Класс ― столбец нормализованных названий вакансий, по которому профессия ищется как подстрока
+
+    Названия нормализуются один раз при создании, причём только уникальные: столбец хранится кодами
+    уникальных названий. Поиск профессии проверяет каждое уникальное название один раз без регулярных
+    выражений и раскладывает результат по кодам, поэтому маска совпадает с contains для каждой строки
+
+    >>> matcher = NameMatcher(['Программист Python', 'ПРОГРАММИСТ', None, 'Аналитик'])
+    >>> matcher.get_mask('программист').tolist()
+    [True, True, False, False]
+
+    Attributes:
+        codes (np.ndarray): код уникального названия для каждой строки, -1 ― пропуск
+        names (np.ndarray): нормализованные уникальные названия
+    """
+    def __init__(self, names):
+        """Инициализирует объект NameMatcher
+
+        Args:
+            names (Iterable[str]): столбец названий вакансий, пропуски (None, NaN) не подходят ни под одну профессию
+        """
+        import numpy as np
+        import pandas as pd
+
+        self.codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        self.names = np.array([normalize(name) for name in uniques], dtype=str)
+
+    @classmethod
+    def from_arrays(cls, codes, names):
+        """Восстанавливает объект по сохранённым codes и names, не нормализуя названия заново
+
+        Args:
+            codes (np.ndarray): коды уникальных названий
+            names (np.ndarray): нормализованные уникальные названия
+
+        Returns:
+            NameMatcher: объект
+        """
+        matcher = cls([])
+        matcher.codes, matcher.names = codes, names
+        return matcher
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get_mask(self, vacancy_name):
+        """Отбирает вакансии профессии
+
+        Args:
+            vacancy_name (str): профессия
+
+        Returns:
+            np.ndarray: булева маска подходящих строк
+        """
+        import numpy as np
+
+        found = np.char.find(self.names, normalize(vacancy_name)) != -1 if len(self.names) else np.zeros(0, dtype=bool)
+        return np.append(found, False)[self.codes]
@@ -0,0 +1,107 @@
+import importlib.util
+import os
+
+from elearn.quality import SALARY_COLUMNS
+
+
+ROW_GROUP_ROWS = 100000
+COMPRESSION = 'zstd'
+YEAR = 'year'
+DATE = 'published_at'
+
+
+def is_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def check_available():
+    """Проверяет, что установлен pyarrow, без которого Parquet не читается и не пишется"""
+    if not is_available():
+        raise ImportError('Для Parquet нужен пакет pyarrow: pip install pyarrow')
+
+
+def get_schema(columns):
+    """Схема файла: зарплаты ― float64, год ― int16, остальные столбцы ― строки
+
+    Args:
+        columns (Iterable[str]): столбцы таблицы без year
+
+    Returns:
+        pyarrow.Schema: схема
+    """
+    import pyarrow as pa
+
+    fields = [pa.field(column, pa.float64() if column in SALARY_COLUMNS else pa.string()) for column in columns if column != YEAR]
+    return pa.schema(fields + [pa.field(YEAR, pa.int16())])
+
+
+class ParquetWriter:
+    """Класс пишет таблицы вакансий в сжатый колоночный файл Parquet
+
+    К каждой таблице добавляется столбец year из published_at, и строки каждого года пишутся отдельными
+    группами строк (row groups) не больше row_group_rows. Для каждой группы Parquet хранит min/max столбцов,
+    поэтому читатель с условием на год пропускает группы других лет, не читая их с диска, и читает
+    только нужные столбцы. Файл пишется во временный и появляется под своим именем только после close
+
+    Attributes:
+        path (str): итоговый файл
+        row_group_rows (int): наибольшее число строк в группе
+        compression (str): алгоритм сжатия
+        schema (pyarrow.Schema or None): схема, определяется по первой таблице
+    """
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+        """Инициализирует объект ParquetWriter
+
+        Args:
+            path (str): итоговый файл
+            row_group_rows (int): наибольшее число строк в группе
+            compression (str): алгоритм сжатия
+        """
+        check_available()
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.schema = None
+        self.temporary = '{0}.tmp{1}'.format(path, os.getpid())
+        self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, *args):
+        if error_type is None:
+            self.close()
+        else:
+            if self.writer is not None:
+                self.writer.close()
+            if os.path.exists(self.temporary):
+                os.remove(self.temporary)
+
+    def write(self, frame):
+        """Дописывает таблицу группами строк по годам
+
+        Args:
+            frame (DataFrame): таблица со столбцом published_at
+        """
+        import pandas as pd
+        import pyarrow as pa
+        from elearn.dates import split_dates
+
+        if self.writer is None:
+            self.open(frame.columns)
+        frame = frame.assign(**{column: pd.to_numeric(frame[column]) for column in frame.columns if column in SALARY_COLUMNS})
+        frame = frame.assign(**{YEAR: split_dates(frame[DATE])[0]})
+        for _, group in frame.groupby(YEAR, sort=True):
+            self.writer.write_table(pa.Table.from_pandas(group, schema=self.schema, preserve_index=False), row_group_size=self.row_group_rows)
+
+    def open(self, columns):
+        import pyarrow.parquet as pq
+
+        self.schema = get_schema(columns)
+        self.writer = pq.ParquetWriter(self.temporary, self.schema, compression=self.compression)
+
+    def close(self):
+        if self.writer is None:
+            self.open([DATE])
+        self.writer.close()
+        os.replace(self.temporary, self.path)
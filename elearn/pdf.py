@@ -0,0 +1,217 @@
+import base64
+import copy
+import functools
+import importlib.util
+import io
+import os
+
+
+PDFKIT = 'pdfkit'
+FPDF_BACKEND = 'fpdf'
+PDF_BACKENDS = (PDFKIT, FPDF_BACKEND)
+FONT_FAMILY = 'DejaVuSans'
+FONTS = {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf'}
+GAP = 6
+
+
+def check_backend(backend):
+    """Проверяет, что PDF-бэкенд известен и доступен
+
+    >>> check_backend('pdfkit')
+    >>> check_backend('reportlab')
+    Traceback (most recent call last):
+    ...
+    ValueError: Неизвестный PDF-бэкенд: 'reportlab', доступны: pdfkit, fpdf
+
+    Args:
+        backend (str): название бэкенда: pdfkit или fpdf
+    """
+    if backend not in PDF_BACKENDS:
+        raise ValueError('Неизвестный PDF-бэкенд: {0!r}, доступны: {1}'.format(backend, ', '.join(PDF_BACKENDS)))
+    if backend == FPDF_BACKEND and importlib.util.find_spec('fpdf') is None:
+        raise ImportError('Для PDF-бэкенда fpdf нужен пакет fpdf2: pip install fpdf2')
+
+
+def is_available(backend):
+    """Проверяет, может ли PDF-бэкенд работать на этой машине
+
+    Args:
+        backend (str): название бэкенда
+
+    Returns:
+        bool: для pdfkit ― найден ли wkhtmltopdf, для fpdf ― установлен ли fpdf2
+    """
+    if backend == FPDF_BACKEND:
+        return importlib.util.find_spec('fpdf') is not None
+    check_backend(backend)
+    import pdfkit
+
+    try:
+        pdfkit.configuration()
+    except OSError:
+        return False
+    return True
+
+
+def to_data_uri(png):
+    """Превращает PNG в data URI, который можно подставить в src тега img
+
+    >>> to_data_uri(b'PNG')
+    'data:image/png;base64,UE5H'
+
+    Args:
+        png (bytes): PNG
+
+    Returns:
+        str: data URI
+    """
+    return 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+
+def html_to_pdf(html, file_name):
+    """Сохраняет HTML в PDF через wkhtmltopdf (pdfkit), запуская отдельный процесс
+
+    Args:
+        html (str): отрендеренный HTML-шаблон
+        file_name (str): путь до PDF-файла
+    """
+    import pdfkit
+
+    pdfkit.from_string(html, file_name, options={"enable-local-file-access": ""})
+
+
+@functools.lru_cache(maxsize=None)
+def get_font_directory():
+    """Директория со шрифтами DejaVu из поставки matplotlib
+
+    Returns:
+        str: путь до директории
+    """
+    import matplotlib
+
+    return os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+
+
+@functools.lru_cache(maxsize=None)
+def load_fonts():
+    """Разбирает TTF-файлы шрифтов один раз на процесс
+
+    Returns:
+        dict[str, TTFFont]: шрифты fpdf2 по ключу семейства и начертания
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    for style, file_name in FONTS.items():
+        pdf.add_font(FONT_FAMILY, style, os.path.join(get_font_directory(), file_name))
+    return pdf.fonts
+
+
+def add_fonts(pdf):
+    """Подключает к документу шрифты из load_fonts без повторного разбора TTF
+
+    Ширины символов и cmap у всех документов процесса общие, а TTFont и набор использованных глифов у каждого свои:
+    при сохранении fpdf2 вырезает из TTFont подмножество глифов документа
+
+    Args:
+        pdf (FPDF): документ fpdf2
+    """
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+
+    for key, font in load_fonts().items():
+        font = copy.copy(font)
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = ttLib.TTFont(font.ttffile, recalcTimestamp=False, lazy=True)
+        font.subset = SubsetMap(font)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        pdf.fonts[key] = font
+
+
+class PdfDocument:
+    """Класс собирает PDF-отчёт прямо в процессе через fpdf2, без wkhtmltopdf и без сети
+
+    Шрифт DejaVu Sans берётся из поставки matplotlib, поэтому кириллица работает на любой машине,
+    где установлены зависимости проекта; TTF-файлы разбираются один раз на процесс
+
+    Attributes:
+        pdf (FPDF): документ fpdf2
+    """
+    def __init__(self):
+        """Инициализирует объект PdfDocument и подключает локальные шрифты"""
+        check_backend(FPDF_BACKEND)
+        from fpdf import FPDF
+
+        self.pdf = FPDF()
+        add_fonts(self.pdf)
+        self.pdf.set_font(FONT_FAMILY, size=9)
+        self.pdf.add_page()
+
+    def heading(self, text, level=1):
+        """Добавляет заголовок по центру страницы
+
+        Args:
+            text (str): текст заголовка
+            level (int): уровень заголовка, как h1 и h2 в HTML-шаблонах
+        """
+        self.pdf.set_font(FONT_FAMILY, 'B', 16 if level == 1 else 13)
+        self.pdf.multi_cell(0, 8 if level == 1 else 7, text, align='C', new_x='LMARGIN', new_y='NEXT')
+        self.pdf.ln(3)
+        self.pdf.set_font(FONT_FAMILY, size=9)
+
+    def image(self, png):
+        """Добавляет изображение на всю ширину страницы
+
+        Args:
+            png (bytes): PNG
+        """
+        self.pdf.image(io.BytesIO(png), w=self.pdf.epw)
+        self.pdf.ln(3)
+
+    def table(self, header, rows):
+        """Добавляет таблицу на всю ширину страницы
+
+        Args:
+            header (list[str]): заголовок
+            rows (Iterable[Iterable]): строки
+        """
+        self.tables([(header, rows)])
+
+    def tables(self, tables):
+        """Добавляет таблицы рядом друг с другом, как таблицы с float в HTML-шаблонах
+
+        Args:
+            tables (list[tuple[list[str], Iterable[Iterable]]]): заголовок и строки каждой таблицы
+        """
+        from fpdf import FontFace
+
+        pdf = self.pdf
+        width = (pdf.epw - GAP * (len(tables) - 1)) / len(tables)
+        top, left, bottom = pdf.get_y(), pdf.l_margin, pdf.get_y()
+        for index, (header, rows) in enumerate(tables):
+            pdf.set_left_margin(left + index * (width + GAP))
+            pdf.set_xy(pdf.l_margin, top)
+            with pdf.table(width=width, align='LEFT', text_align='CENTER', headings_style=FontFace(emphasis='BOLD')) as table:
+                for row in [header, *rows]:
+                    table.row([str(value) for value in row])
+            bottom = max(bottom, pdf.get_y())
+        pdf.set_left_margin(left)
+        pdf.set_xy(left, bottom)
+        pdf.ln(3)
+
+    def output(self):
+        """Возвращает документ
+
+        Returns:
+            bytes: PDF
+        """
+        return bytes(self.pdf.output())
+
+    def save(self, file_name):
+        """Сохраняет документ
+
+        Args:
+            file_name (str): путь до PDF-файла
+        """
+        self.pdf.output(file_name)
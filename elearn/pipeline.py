@@ -0,0 +1,444 @@
+import asyncio
+import calendar
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.request import urlopen
+from xml.etree import ElementTree
+
+from elearn.dates import format_month, parse_year
+from elearn.dedup import DedupIndex
+from elearn.matching import contains
+from elearn.ranking import top_n
+from elearn.quality import EMPTY_SALARY, MALFORMED_DATE, MISSING_RATE, QualityReport
+
+
+HH_URL = 'https://api.hh.ru/vacancies?specialization=1&per_page=100&page={0}&date_from={1}&date_to={2}'
+CBR_URL = 'https://www.cbr.ru/scripts/XML_daily.asp?date_req={0:02d}/{1:02d}/{2}'
+PATH_TO_RATES = '../data/currency_value.csv'
+DAY = '2022-12-15'
+VACANCY_NAME = 'Программист'
+WINDOWS = 3
+PAGES = 20
+QUEUE_SIZE = 8
+HARVESTERS = 4
+TIMEOUT = 30
+HARVEST, CONVERT, AGGREGATE = 'harvest', 'convert', 'aggregate'
+
+
+def get_url(page, date_from, date_to):
+    """URL страницы вакансий API hh.ru
+
+    Args:
+        page (int): номер страницы
+        date_from (str): левая граница даты
+        date_to (str): правая граница даты
+
+    Returns:
+        str: URL, по которому можно сделать запрос к API hh.ru
+    """
+    return HH_URL.format(page, date_from, date_to)
+
+
+def get_day_urls(day, windows=WINDOWS, pages=PAGES):
+    """URL всех страниц вакансий за день: API отдаёт не больше 2000 вакансий на запрос, поэтому день делится на окна
+
+    >>> urls = get_day_urls('2022-12-15')
+    >>> len(urls), urls[20].split('&')[2:]
+    (60, ['page=0', 'date_from=2022-12-15T08:00:00', 'date_to=2022-12-15T16:00:00'])
+
+    Args:
+        day (str): день в формате YYYY-MM-DD
+        windows (int): на сколько равных окон делится день
+        pages (int): сколько страниц запрашивать в каждом окне
+
+    Returns:
+        list[str]: URL
+    """
+    start, step = datetime.fromisoformat(day), timedelta(days=1) / windows
+    bounds = [(start + step * window).isoformat() for window in range(windows + 1)]
+    return [get_url(page, date_from, date_to) for date_from, date_to in zip(bounds, bounds[1:]) for page in range(pages)]
+
+
+def parse_vacancy(vacancy):
+    """Строка вакансии из ответа API hh.ru
+
+    Args:
+        vacancy (dict): вакансия из API
+
+    Returns:
+        tuple: название, зарплата от, зарплата до, валюта, регион, дата публикации
+    """
+    name, area_name, published_at = vacancy['name'], vacancy['area']['name'], vacancy['published_at']
+    salary_from, salary_to, salary_currency = None, None, None
+    salary = vacancy['salary']
+    if salary:
+        salary_from = salary['from']
+        salary_to = salary['to']
+        salary_currency = salary['currency']
+    return name, salary_from, salary_to, salary_currency, area_name, published_at
+
+
+def convert_salary(salary_from, salary_to, rate):
+    """Зарплата в рублях, как в 3.4.1: середина вилки, а если одна граница не указана ― другая граница
+
+    >>> convert_salary(100, 200, 2), convert_salary(None, 300, 1), convert_salary(0, 300, 1)
+    (300.0, 300.0, 300.0)
+
+    Args:
+        salary_from (float or None): нижняя граница вилки
+        salary_to (float or None): верхняя граница вилки
+        rate (float): курс валюты к рублю
+
+    Returns:
+        float: зарплата в рублях
+    """
+    salary_from, salary_to = salary_from or 0, salary_to or 0
+    result = max(salary_from, salary_to) if salary_from == 0 or salary_to == 0 else (salary_from + salary_to) / 2
+    return float(round(result * rate, 0))
+
+
+def read_url(url):
+    with urlopen(url, timeout=TIMEOUT) as response:
+        return response.read()
+
+
+async def fetch_hh_page(url):
+    """Вакансии одной страницы API hh.ru; запрос выполняется в потоке, чтобы не блокировать цикл событий"""
+    return json.loads(await asyncio.to_thread(read_url, url))['items']
+
+
+async def fetch_cbr_rates(month):
+    """Курсы валют ЦБ к рублю на последний день месяца, как в 3.3.1
+
+    Args:
+        month (str): месяц в формате YYYY-MM
+
+    Returns:
+        dict[str, float]: курс за единицу валюты по коду валюты
+    """
+    year, number = map(int, month.split('-'))
+    root = ElementTree.fromstring(await asyncio.to_thread(read_url, CBR_URL.format(calendar.monthrange(year, number)[1], number, year)))
+    return {valute.findtext('CharCode'): round(float(valute.findtext('Value').replace(',', '.')) / float(valute.findtext('Nominal')), 6)
+            for valute in root.iter('Valute')}
+
+
+def read_rates(path):
+    """Курсы из файла 3.3.1, чтобы не запрашивать у ЦБ уже известные месяцы
+
+    Args:
+        path (str): CSV-файл со столбцом date (YYYY-MM) и столбцами валют
+
+    Returns:
+        dict[str, dict[str, float]]: курсы валют по месяцам
+    """
+    import pandas as pd
+
+    frame = pd.read_csv(path).set_index('date')
+    return {month: {currency: rate for currency, rate in rates.items() if pd.notna(rate)} for month, rates in frame.iterrows()}
+
+
+class RateCache:
+    """Класс ― курсы валют по месяцам, которые запрашиваются только для месяцев, которых ещё нет
+
+    Одновременные запросы одного месяца из разных пачек ждут один и тот же запрос к ЦБ. Если запрос не удался,
+    курсов месяца нет: get_rate возвращает None, а следующая пачка с этим месяцем запросит его заново
+
+    Attributes:
+        fetch_rates (Callable[[str], Awaitable[dict]]): запрос курсов за месяц
+        rates (dict[str, dict[str, float]]): известные курсы по месяцам
+        fetched (int): сколько месяцев запрошено
+        failed (int): сколько запросов не удалось
+    """
+    def __init__(self, fetch_rates, rates=None):
+        """Инициализирует объект RateCache
+
+        Args:
+            fetch_rates (Callable[[str], Awaitable[dict]]): запрос курсов за месяц
+            rates (dict or None): заранее известные курсы, например, из read_rates
+        """
+        self.fetch_rates = fetch_rates
+        self.rates = dict(rates or {})
+        self.pending = {}
+        self.fetched = 0
+        self.failed = 0
+
+    async def load(self, months):
+        """Дожидается курсов всех месяцев, запрашивая недостающие параллельно
+
+        Args:
+            months (Iterable[str]): месяцы в формате YYYY-MM
+        """
+        missing = [month for month in set(months) if month not in self.rates]
+        for month in missing:
+            if month not in self.pending:
+                self.pending[month] = asyncio.ensure_future(self.fetch_rates(month))
+                self.fetched += 1
+        futures = [(month, self.pending[month]) for month in missing]
+        for month, future in futures:
+            try:
+                self.rates[month] = await future
+            except Exception:
+                # ошибку сети или ответа ЦБ получает каждая пачка, ждавшая этот запрос, но считается она один раз
+                if self.pending.get(month) is future:
+                    self.failed += 1
+            finally:
+                if self.pending.get(month) is future:
+                    del self.pending[month]
+
+    def get_rate(self, month, currency):
+        """Курс уже загруженного месяца: рубль ― 1, неизвестная валюта или месяц без курсов ― None"""
+        return 1 if currency == 'RUR' else self.rates.get(month, {}).get(currency)
+
+
+class StageMetrics:
+    """Класс ― счётчики стадии конвейера
+
+    Attributes:
+        name (str): стадия
+        batches (int): сколько пачек обработано
+        rows_in (int): сколько строк пришло
+        rows_out (int): сколько строк передано дальше
+        busy (float): сколько секунд стадия работала, включая ожидание API
+        blocked (float): сколько секунд стадия ждала места в очереди следующей стадии
+    """
+    def __init__(self, name):
+        """Инициализирует объект StageMetrics
+
+        Args:
+            name (str): стадия
+        """
+        self.name = name
+        self.batches = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+
+    @property
+    def throughput(self):
+        return self.rows_out / self.busy if self.busy else 0.0
+
+    def record(self, rows_in, rows_out, seconds):
+        self.batches += 1
+        self.rows_in += rows_in
+        self.rows_out += rows_out
+        self.busy += seconds
+
+    def __str__(self):
+        return '{0}: пачек {1}, строк {2} → {3}, {4:.0f} строк/с, ожидание очереди {5:.2f} с'.format(
+            self.name, self.batches, self.rows_in, self.rows_out, self.throughput, self.blocked)
+
+
+class IncrementalStatistic:
+    """Класс ― статистика в формате DataSet.get_statistic, которая обновляется каждой пачкой без хранения вакансий
+
+    Для каждого года, года выбранной профессии и города хранятся сумма зарплат, число вакансий с зарплатой
+    и число всех вакансий. Средние считаются по вакансиям с зарплатой, количества и доли ― по всем, как в 3.4.3
+
+    Attributes:
+        vacancy_name (str): профессия
+        years (dict[int, list]): итоги по годам
+        vacancy_years (dict[int, list]): итоги по годам для профессии
+        cities (dict[str, list]): итоги по городам
+        count (int): сколько всего вакансий
+    """
+    def __init__(self, vacancy_name):
+        """Инициализирует объект IncrementalStatistic
+
+        Args:
+            vacancy_name (str): профессия
+        """
+        self.vacancy_name = vacancy_name
+        self.years = {}
+        self.vacancy_years = {}
+        self.cities = {}
+        self.count = 0
+
+    def add(self, rows):
+        """Учитывает пачку вакансий
+
+        Args:
+            rows (Iterable[tuple]): название, зарплата в рублях или None, регион, дата публикации
+        """
+        for name, salary, area_name, published_at in rows:
+            year = parse_year(published_at)
+            totals = [self.years.setdefault(year, [0.0, 0, 0]), self.cities.setdefault(area_name, [0.0, 0, 0])]
+            if contains(name, self.vacancy_name):
+                totals.append(self.vacancy_years.setdefault(year, [0.0, 0, 0]))
+            for total in totals:
+                total[2] += 1
+                if salary is not None:
+                    total[0] += salary
+                    total[1] += 1
+            self.count += 1
+
+    def get_statistic(self):
+        """Текущая статистика
+
+        Returns:
+            tuple[dict, dict, dict, dict, dict, dict]: статистика по годам, по годам для профессии и по городам
+        """
+        def average(total):
+            return int(total[0] / total[1]) if total[1] else 0
+
+        years = sorted(self.years)
+        empty = [0.0, 0, 0]
+        shares = [(city, round(total[2] / self.count, 4)) for city, total in self.cities.items()]
+        frequent = {city for city, share in shares if share >= 0.01}
+        salaries = top_n(((city, average(total)) for city, total in self.cities.items() if total[1]), allowed=frequent)
+        shares = top_n(shares, threshold=0.01)
+        return ({year: average(self.years[year]) for year in years}, {year: self.years[year][2] for year in years},
+                {year: average(self.vacancy_years.get(year, empty)) for year in years}, {year: self.vacancy_years.get(year, empty)[2] for year in years},
+                dict(salaries), dict(shares))
+
+
+class VacancyPipeline:
+    """Класс ― конвейер сбор → конвертация → статистика в одном процессе, без промежуточных CSV-файлов
+
+    Стадии ― корутины, соединённые очередями asyncio.Queue ограниченного размера: когда следующая стадия
+    не успевает, предыдущая ждёт места в очереди (backpressure), поэтому в памяти не больше queue_size пачек
+    на очередь. Сбор запрашивает страницы параллельно в harvesters корутинах и отбрасывает дубли,
+    конвертация переводит зарплаты в рубли, дозапрашивая курсы для новых месяцев, а статистика
+    обновляется каждой пачкой и доступна в любой момент. Запросы к API передаются снаружи, что позволяет
+    подменить их в тестах. Для каждой стадии ведутся счётчики StageMetrics
+
+    Attributes:
+        fetch_page (Callable[[str], Awaitable[list[dict]]]): запрос страницы вакансий
+        rates (RateCache): курсы валют
+        index (DedupIndex): уже полученные вакансии
+        statistic (IncrementalStatistic): статистика
+        quality (QualityReport): вакансии, оставшиеся без зарплаты, по причинам
+        metrics (dict[str, StageMetrics]): счётчики стадий
+        queue_size (int): размер очередей между стадиями, в пачках
+        harvesters (int): сколько страниц запрашивать одновременно
+    """
+    def __init__(self, vacancy_name, fetch_page=fetch_hh_page, fetch_rates=fetch_cbr_rates, rates=None, index=None,
+                 queue_size=QUEUE_SIZE, harvesters=HARVESTERS, quality=None):
+        """Инициализирует объект VacancyPipeline
+
+        Args:
+            vacancy_name (str): профессия
+            fetch_page (Callable[[str], Awaitable[list[dict]]]): запрос страницы вакансий
+            fetch_rates (Callable[[str], Awaitable[dict]]): запрос курсов за месяц
+            rates (dict or None): заранее известные курсы
+            index (DedupIndex or None): индекс для дублей, None ― в памяти на время работы
+            queue_size (int): размер очередей между стадиями
+            harvesters (int): сколько страниц запрашивать одновременно
+            quality (QualityReport or None): куда записывать вакансии без зарплаты
+        """
+        self.fetch_page = fetch_page
+        self.rates = RateCache(fetch_rates, rates)
+        self.index = DedupIndex(':memory:') if index is None else index
+        self.statistic = IncrementalStatistic(vacancy_name)
+        self.quality = QualityReport() if quality is None else quality
+        self.metrics = {stage: StageMetrics(stage) for stage in (HARVEST, CONVERT, AGGREGATE)}
+        self.queue_size = queue_size
+        self.harvesters = harvesters
+
+    async def put(self, queue, batch, stage):
+        start = time.perf_counter()
+        await queue.put(batch)
+        self.metrics[stage].blocked += time.perf_counter() - start
+
+    async def harvest(self, urls, output):
+        urls = iter(urls)
+
+        async def worker():
+            # итератор общий, поэтому каждую страницу берёт ровно одна корутина
+            for url in urls:
+                start = time.perf_counter()
+                items = await self.fetch_page(url)
+                rows = self.index.filter((item.get('id'), parse_vacancy(item)) for item in items)
+                self.metrics[HARVEST].record(len(items), len(rows), time.perf_counter() - start)
+                await self.put(output, rows, HARVEST)
+
+        await asyncio.gather(*(worker() for _ in range(self.harvesters)))
+        await output.put(None)
+
+    async def convert(self, source, output):
+        while True:
+            batch = await source.get()
+            if batch is None:
+                break
+            start = time.perf_counter()
+            months = []
+            for row in batch:
+                try:
+                    months.append(format_month(row[5]))
+                except ValueError:
+                    months.append(None)
+            await self.rates.load(month for row, month in zip(batch, months) if month is not None and row[3] is not None)
+            rows = []
+            for row, month in zip(batch, months):
+                name, salary_from, salary_to, salary_currency, area_name, published_at = row
+                self.quality.rows += 1
+                salary = None
+                if month is None:
+                    # без года вакансию нельзя учесть в статистике
+                    self.quality.reject(MALFORMED_DATE, row)
+                    continue
+                if salary_from is None and salary_to is None or salary_currency is None:
+                    self.quality.reject(EMPTY_SALARY, row)
+                else:
+                    rate = self.rates.get_rate(month, salary_currency)
+                    if rate is None:
+                        self.quality.reject(MISSING_RATE, row)
+                    else:
+                        salary = convert_salary(salary_from, salary_to, rate)
+                rows.append((name, salary, area_name, published_at))
+            self.metrics[CONVERT].record(len(batch), len(rows), time.perf_counter() - start)
+            await self.put(output, rows, CONVERT)
+        await output.put(None)
+
+    async def aggregate(self, source):
+        while True:
+            batch = await source.get()
+            if batch is None:
+                break
+            start = time.perf_counter()
+            self.statistic.add(batch)
+            self.metrics[AGGREGATE].record(len(batch), len(batch), time.perf_counter() - start)
+
+    async def run(self, urls):
+        """Прогоняет страницы через все стадии
+
+        Если одна из стадий падает, остальные отменяются, а ошибка пробрасывается. Статистика живёт только в памяти,
+        поэтому ключи новых вакансий фиксируются в индексе после того, как все пачки учтены в статистике,
+        а при ошибке откатываются: следующий запуск снова получит эти вакансии, а не потеряет их
+
+        Args:
+            urls (Iterable[str]): страницы вакансий
+
+        Returns:
+            IncrementalStatistic: статистика
+        """
+        harvested, converted = asyncio.Queue(self.queue_size), asyncio.Queue(self.queue_size)
+        tasks = [asyncio.ensure_future(stage) for stage in (self.harvest(urls, harvested), self.convert(harvested, converted), self.aggregate(converted))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            self.index.rollback()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+        self.index.commit()
+        return self.statistic
+
+
+def main(day=DAY, vacancy_name=VACANCY_NAME):
+    """Собирает вакансии за день и печатает статистику и счётчики стадий"""
+    from elearn.report import DataSet
+
+    pipeline = VacancyPipeline(vacancy_name, rates=read_rates(PATH_TO_RATES))
+    statistic = asyncio.run(pipeline.run(get_day_urls(day)))
+    DataSet.print_statistic(*statistic.get_statistic(), quality=pipeline.quality)
+    print('Отброшено дублей: {0}, запрошено курсов за месяцев: {1}'.format(pipeline.index.duplicates, pipeline.rates.fetched))
+    for metrics in pipeline.metrics.values():
+        print(metrics)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,216 @@
+import functools
+import io
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageStats:
+    """Класс ― подобие DTO-объекта, который накапливает замеры одной стадии обработки
+
+    Attributes:
+        name (str): название стадии (read, parse, aggregate, convert, render и т.д.)
+        calls (int): сколько раз стадия выполнялась
+        wall (float): суммарное реальное время в секундах
+        cpu (float): суммарное процессорное время текущего процесса в секундах
+        rows (int): количество обработанных строк
+        peak_memory (int): пиковый объём памяти, выделенной Python за время стадии, в байтах
+    """
+    def __init__(self, name):
+        """Инициализирует объект StageStats
+
+        Args:
+            name (str): название стадии
+        """
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows = 0
+        self.peak_memory = 0
+
+    @property
+    def rows_per_second(self):
+        """Пропускная способность стадии
+
+        Returns:
+            float: строк в секунду, 0 если строки не учитывались
+        """
+        return self.rows / self.wall if self.wall else 0.0
+
+
+class StageRun:
+    """Класс описывает один запуск стадии, через него код стадии может сообщить количество строк
+
+    Attributes:
+        rows (int or None): количество обработанных строк
+    """
+    def __init__(self, rows=None):
+        """Инициализирует объект StageRun
+
+        Args:
+            rows (int or None): количество строк, если оно известно заранее
+        """
+        self.rows = rows
+        self.peak_memory = 0
+
+
+class Profiler:
+    """Класс собирает время, процессорное время, количество строк и пиковую память по стадиям конвейера
+
+    Стадии могут быть вложенными: пиковая память вложенной стадии учитывается и во внешней.
+    Профиль cProfile снимается только для стадий верхнего уровня, так как два профилировщика
+    одновременно работать не могут.
+
+    Attributes:
+        stages (dict[str, StageStats]): замеры по стадиям в порядке первого запуска
+        profile_dir (str or None): директория для дампов cProfile (<стадия>.prof), None ― не профилировать
+        sort (str): ключ сортировки pstats при печати профиля
+        limit (int): сколько строк профиля печатать, 0 ― не печатать
+        trace_memory (bool): замерять ли пиковую память через tracemalloc
+    """
+    def __init__(self, profile_dir=None, sort='cumulative', limit=0, trace_memory=True):
+        """Инициализирует объект Profiler
+
+        Args:
+            profile_dir (str or None): директория для дампов cProfile
+            sort (str): ключ сортировки pstats
+            limit (int): сколько строк отсортированного профиля печатать после стадии
+            trace_memory (bool): замерять ли пиковую память
+        """
+        self.stages = {}
+        self.profile_dir = profile_dir
+        self.sort = sort
+        self.limit = limit
+        self.trace_memory = trace_memory
+        self._running = []
+        self._tracing_started = False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Контекстный менеджер, замеряющий одну стадию
+
+        >>> profiler = Profiler(trace_memory=False)
+        >>> with profiler.stage('parse') as run:
+        ...     run.rows = len([line.split(',') for line in ['a,b', 'c,d']])
+        >>> profiler.stages['parse'].calls, profiler.stages['parse'].rows
+        (1, 2)
+
+        Args:
+            name (str): название стадии
+            rows (int or None): количество строк, если оно известно заранее
+
+        Yields:
+            StageRun: запуск стадии, в поле rows которого можно записать количество строк
+        """
+        run = StageRun(rows)
+        profile = self._start_profile()
+        self._start_memory()
+        self._running.append(run)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield run
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._running.pop()
+            self._stop_memory(run)
+            if profile is not None:
+                profile.disable()
+                self._dump_profile(name, profile)
+            self.record(name, wall, cpu, run.rows or 0, run.peak_memory)
+
+    def record(self, name, wall, cpu=0.0, rows=0, peak_memory=0):
+        """Добавляет замер стадии, выполненной вне stage (например, в другом процессе)
+
+        Args:
+            name (str): название стадии
+            wall (float): реальное время в секундах
+            cpu (float): процессорное время в секундах
+            rows (int): количество обработанных строк
+            peak_memory (int): пиковая память в байтах
+        """
+        stats = self.stages.setdefault(name, StageStats(name))
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu += cpu
+        stats.rows += rows
+        stats.peak_memory = max(stats.peak_memory, peak_memory)
+
+    def wrap(self, name=None, rows=None):
+        """Декоратор, замеряющий каждый вызов функции как стадию
+
+        Args:
+            name (str or None): название стадии, по умолчанию ― имя функции
+            rows (Callable or None): функция, которая по результату вызова возвращает количество строк
+
+        Returns:
+            Callable: декоратор
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__) as run:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        run.rows = rows(result)
+                return result
+            return wrapper
+        return decorator
+
+    def _start_profile(self):
+        if (self.profile_dir is None and not self.limit) or self._running:
+            return None
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def _dump_profile(self, name, profile):
+        if self.profile_dir is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profile.dump_stats(os.path.join(self.profile_dir, '{0}.prof'.format(name)))
+        if self.limit:
+            import pstats
+
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats(self.sort).print_stats(self.limit)
+            print('Профиль стадии «{0}»\n{1}'.format(name, stream.getvalue()))
+
+    def _start_memory(self):
+        if not self.trace_memory:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing_started = True
+        if self._running:
+            parent = self._running[-1]
+            parent.peak_memory = max(parent.peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    def _stop_memory(self, run):
+        if not self.trace_memory:
+            return
+        run.peak_memory = max(run.peak_memory, tracemalloc.get_traced_memory()[1])
+        if self._running:
+            parent = self._running[-1]
+            parent.peak_memory = max(parent.peak_memory, run.peak_memory)
+        elif self._tracing_started:
+            tracemalloc.stop()
+            self._tracing_started = False
+
+    def format_table(self):
+        """Формирует таблицу с разбивкой по стадиям
+
+        Returns:
+            str: таблица с временем, процессорным временем, строками, скоростью и пиковой памятью стадий
+        """
+        lines = ['{0:<24} {1:>6} {2:>10} {3:>10} {4:>10} {5:>12} {6:>10}'.format('Стадия', 'Вызовы', 'Время, с', 'CPU, с', 'Строки', 'Строк/с', 'Память, МБ')]
+        for stats in self.stages.values():
+            lines.append('{0.name:<24} {0.calls:>6} {0.wall:>10.3f} {0.cpu:>10.3f} {0.rows:>10} {0.rows_per_second:>12.0f} {1:>10.2f}'.format(stats, stats.peak_memory / 2 ** 20))
+        return '\n'.join(lines)
+
+    def print_table(self):
+        """Печатает таблицу с разбивкой по стадиям"""
+        print(self.format_table())
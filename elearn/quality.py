@@ -0,0 +1,133 @@
+RAGGED_ROW = 'ragged_row'
+EMPTY_FIELD = 'empty_field'
+EMPTY_SALARY = 'empty_salary'
+MALFORMED_SALARY = 'malformed_salary'
+UNKNOWN_CURRENCY = 'unknown_currency'
+MISSING_RATE = 'missing_rate'
+MALFORMED_DATE = 'malformed_date'
+REASONS = {
+    RAGGED_ROW: 'неверное число столбцов',
+    EMPTY_FIELD: 'пустое поле',
+    EMPTY_SALARY: 'нет зарплаты',
+    MALFORMED_SALARY: 'зарплата не число',
+    UNKNOWN_CURRENCY: 'неизвестная валюта',
+    MISSING_RATE: 'нет курса валюты',
+    MALFORMED_DATE: 'некорректная дата',
+}
+SALARY_COLUMNS = ('salary_from', 'salary_to', 'salary')
+
+
+class RejectedRow(ValueError):
+    """Исключение для строки, которую нельзя учесть в статистике
+
+    Attributes:
+        reason (str): причина из REASONS
+    """
+    def __init__(self, reason):
+        """Инициализирует объект RejectedRow
+
+        Args:
+            reason (str): причина из REASONS
+        """
+        super().__init__(REASONS[reason])
+        self.reason = reason
+
+
+def classify_empty(columns, values):
+    """Причина отказа для строки с пустыми значениями
+
+    >>> classify_empty(['name', 'salary_from', 'salary_to'], ['Программист', '', '100'])
+    'empty_salary'
+    >>> classify_empty(['name', 'area_name'], ['Программист', ''])
+    'empty_field'
+
+    Args:
+        columns (list[str]): столбцы
+        values (list[str]): значения
+
+    Returns:
+        str: EMPTY_SALARY, если пуста зарплата, иначе EMPTY_FIELD
+    """
+    for column, value in zip(columns, values):
+        if value == '' and column in SALARY_COLUMNS:
+            return EMPTY_SALARY
+    return EMPTY_FIELD
+
+
+class QualityReport:
+    """Класс ― счётчики проверки данных, которые заполняются прямо во время чтения, без второго прохода
+
+    Для каждой причины отказа хранится число строк и, если задан sample_size, первые sample_size строк как пример
+
+    >>> quality = QualityReport(sample_size=1)
+    >>> quality.rows = 3
+    >>> quality.reject(UNKNOWN_CURRENCY, {'salary_currency': 'XYZ'})
+    >>> quality.reject(UNKNOWN_CURRENCY, {'salary_currency': 'ABC'})
+    >>> quality.rejected, quality.samples
+    (2, {'unknown_currency': [{'salary_currency': 'XYZ'}]})
+    >>> print(quality)
+    Проверено строк: 3, отброшено: 2 (неизвестная валюта: 2)
+
+    Attributes:
+        sample_size (int): сколько отброшенных строк каждой причины сохранять, 0 ― не сохранять
+        rows (int): сколько строк проверено
+        rejects (dict[str, int]): число отброшенных строк по причинам
+        samples (dict[str, list]): примеры отброшенных строк по причинам
+    """
+    def __init__(self, sample_size=0):
+        """Инициализирует объект QualityReport
+
+        Args:
+            sample_size (int): сколько отброшенных строк каждой причины сохранять
+        """
+        self.sample_size = sample_size
+        self.rows = 0
+        self.rejects = {}
+        self.samples = {}
+
+    @property
+    def rejected(self):
+        return sum(self.rejects.values())
+
+    def reject(self, reason, row=None):
+        """Учитывает отброшенную строку
+
+        Args:
+            reason (str): причина из REASONS
+            row: сама строка для примера
+        """
+        self.rejects[reason] = self.rejects.get(reason, 0) + 1
+        if self.sample_size:
+            sample = self.samples.setdefault(reason, [])
+            if len(sample) < self.sample_size:
+                sample.append(row)
+
+    def merge(self, other):
+        """Добавляет счётчики другого отчёта, например, посчитанного в другом процессе
+
+        Args:
+            other (QualityReport): отчёт
+        """
+        self.rows += other.rows
+        for reason, count in other.rejects.items():
+            self.rejects[reason] = self.rejects.get(reason, 0) + count
+        for reason, rows in other.samples.items():
+            sample = self.samples.setdefault(reason, [])
+            sample.extend(rows[:max(0, self.sample_size - len(sample))])
+
+    def as_dict(self):
+        return {'rows': self.rows, 'rejects': dict(self.rejects), 'samples': {reason: list(rows) for reason, rows in self.samples.items()}}
+
+    @classmethod
+    def from_dict(cls, state, sample_size=0):
+        quality = cls(sample_size)
+        quality.rows = state['rows']
+        quality.rejects = dict(state['rejects'])
+        quality.samples = {reason: list(rows) for reason, rows in state['samples'].items()}
+        return quality
+
+    def __str__(self):
+        line = 'Проверено строк: {0}, отброшено: {1}'.format(self.rows, self.rejected)
+        if self.rejects:
+            line += ' ({0})'.format(', '.join('{0}: {1}'.format(REASONS[reason], count) for reason, count in sorted(self.rejects.items(), key=lambda item: -item[1])))
+        return line
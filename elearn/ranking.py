@@ -0,0 +1,42 @@
+import heapq
+from operator import itemgetter
+
+
+TOP = 10
+VALUE = itemgetter(1)
+
+
+def top_n(pairs, n=TOP, threshold=None, allowed=None, key=VALUE, reverse=True):
+    """Первые n пар (ключ, значение) по убыванию значения без сортировки всего списка
+
+    Пары проходят одним потоком: отсев по порогу и по множеству допустимых ключей делается на лету,
+    а лучшие n хранятся в куче, поэтому время ― O(len(pairs) * log n), а память ― O(n), сколько бы ни было
+    городов или работодателей. Результат тот же, что у sorted(..., reverse=True)[:n]: при равных значениях
+    раньше идёт пара, которая раньше встретилась, если key не добавляет свой порядок для равных
+
+    >>> shares = {'Москва': 0.3, 'Казань': 0.005, 'Пермь': 0.1, 'Омск': 0.3}
+    >>> top_n(shares.items(), 2, threshold=0.01)
+    [('Москва', 0.3), ('Омск', 0.3)]
+    >>> top_n(shares.items(), None, allowed={'Пермь', 'Казань'}, reverse=False)
+    [('Казань', 0.005), ('Пермь', 0.1)]
+    >>> top_n(shares.items(), 1, key=lambda pair: (pair[1], pair[0]))
+    [('Омск', 0.3)]
+
+    Args:
+        pairs (Iterable[tuple]): пары ключ ― значение, например, dict.items()
+        n (int or None): сколько пар вернуть, None ― все подходящие
+        threshold (float or None): наименьшее значение, которое попадает в рейтинг
+        allowed (Container or None): допустимые ключи, лучше set: проверка ― одна операция
+        key (Callable[[tuple], Any]): по чему ранжировать, по умолчанию ― значение
+        reverse (bool): по убыванию; False ― первые n по возрастанию
+
+    Returns:
+        list[tuple]: пары в порядке рейтинга
+    """
+    if threshold is not None:
+        pairs = (pair for pair in pairs if pair[1] >= threshold)
+    if allowed is not None:
+        pairs = (pair for pair in pairs if pair[0] in allowed)
+    if n is None:
+        return sorted(pairs, key=key, reverse=reverse)
+    return heapq.nlargest(n, pairs, key=key) if reverse else heapq.nsmallest(n, pairs, key=key)
@@ -1,12 +1,37 @@
-import csv
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Border, Side
-import matplotlib.pyplot as plt
-import numpy as np
-from jinja2 import Environment, FileSystemLoader
-import pathlib
-import pdfkit
+import argparse
+import concurrent.futures
+import os
+import time
+from collections import namedtuple
+
+from elearn.cache import ArtifactCache, make_key, report_key
+from elearn.datasource import Query, open_source
+from elearn.dates import parse_date
+from elearn.matching import contains
+from elearn.pdf import PDFKIT, PdfDocument, check_backend, html_to_pdf, to_data_uri
+from elearn.profiling import Profiler
+from elearn.ranking import top_n
+from elearn.quality import MALFORMED_DATE, MALFORMED_SALARY, UNKNOWN_CURRENCY, QualityReport, RejectedRow
+from elearn.sketches import MEDIAN, P90, KllSketch, SpaceSaving, exact_quantile
+from elearn.templating import get_template_renderer
+
+
+class FrozenDict(dict):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('Статистика отчёта доступна только для чтения')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+ReportStats = namedtuple('ReportStats', ['vacancy_name', 'stats1', 'stats2', 'stats3', 'stats4', 'stats5', 'stats6', 'quantiles'], defaults=(None,))
+
+
+def make_report_stats(vacancy_name, stats1, stats2, stats3, stats4, stats5, stats6, quantiles=None):
+    return ReportStats(vacancy_name, *(FrozenDict(stats) for stats in (stats1, stats2, stats3, stats4, stats5, stats6)),
+                       None if quantiles is None else FrozenDict(quantiles))
 
 
 class Vacancy:
@@ -17,18 +42,35 @@ class Vacancy:
 
     def __init__(self, vacancy):
         self.name = vacancy['name']
-        self.salary_from = int(float(vacancy['salary_from']))
-        self.salary_to = int(float(vacancy['salary_to']))
+        try:
+            self.salary_from = int(float(vacancy['salary_from']))
+            self.salary_to = int(float(vacancy['salary_to']))
+        except ValueError:
+            raise RejectedRow(MALFORMED_SALARY)
         self.salary_currency = vacancy['salary_currency']
+        if self.salary_currency not in self.currency_to_rub:
+            raise RejectedRow(UNKNOWN_CURRENCY)
         self.salary_average = self.currency_to_rub[self.salary_currency] * (self.salary_from + self.salary_to) / 2
         self.area_name = vacancy['area_name']
-        self.year = int(vacancy['published_at'][:4])
+        try:
+            self.year, self.month, _ = parse_date(vacancy['published_at'])
+        except ValueError:
+            raise RejectedRow(MALFORMED_DATE)
 
 
 class DataSet:
-    def __init__(self, file_name, vacancy_name):
+    # в режиме sketch города считаются через Space-Saving, а медиана и 90-й перцентиль ― через KLL,
+    # поэтому память не зависит от числа вакансий; ошибки описаны в elearn/sketches.py
+    CITY_CAPACITY = 1000
+    QUANTILE_K = 200
+
+    def __init__(self, file_name, vacancy_name, area_name=None, sketch=False, quality=None):
         self.file_name = file_name
         self.vacancy_name = vacancy_name
+        self.area_name = area_name
+        self.sketch = sketch
+        self.quantiles = {}
+        self.quality = QualityReport() if quality is None else quality
 
     @staticmethod
     def increment(dictionary, key, amount):
@@ -45,89 +87,216 @@ class DataSet:
         return new_dictionary
 
     def csv_reader(self):
-        with open(self.file_name, mode='r', encoding='utf-8-sig') as file:
-            reader = csv.reader(file)
-            header = next(reader)
-            header_length = len(header)
-            for row in reader:
-                if '' not in row and len(row) == header_length:
-                    yield dict(zip(header, row))
+        # file_name может быть CSV-файлом, директорией с чанками или базой SQLite, регион фильтрует сам источник
+        yield from open_source(self.file_name).rows(Query(area_name=self.area_name), self.quality)
+
+    def read_vacancies(self):
+        # строки проверяются в том же проходе, отброшенные учитываются в self.quality по причинам
+        for vacancy_dictionary in self.csv_reader():
+            try:
+                vacancy = Vacancy(vacancy_dictionary)
+            except RejectedRow as error:
+                self.quality.reject(error.reason, vacancy_dictionary)
+                continue
+            yield vacancy
 
     def get_statistic(self):
+        return self.get_batch_statistic([self.vacancy_name])[self.vacancy_name]
+
+    def get_batch_statistic(self, vacancy_names):
+        if self.sketch:
+            return self.get_sketch_statistic(vacancy_names)
         salary = {}
-        salary_of_vacancy_name = {}
+        salary_of_vacancy_names = {vacancy_name: {} for vacancy_name in vacancy_names}
         salary_city = {}
         count_of_vacancies = 0
 
-        for vacancy_dictionary in self.csv_reader():
-            vacancy = Vacancy(vacancy_dictionary)
+        for vacancy in self.read_vacancies():
             self.increment(salary, vacancy.year, [vacancy.salary_average])
-            if vacancy.name.find(self.vacancy_name) != -1:
-                self.increment(salary_of_vacancy_name, vacancy.year, [vacancy.salary_average])
+            for vacancy_name, salary_of_vacancy_name in salary_of_vacancy_names.items():
+                if contains(vacancy.name, vacancy_name):
+                    self.increment(salary_of_vacancy_name, vacancy.year, [vacancy.salary_average])
             self.increment(salary_city, vacancy.area_name, [vacancy.salary_average])
             count_of_vacancies += 1
 
         vacancies_number = dict([(key, len(value)) for key, value in salary.items()])
-        vacancies_number_by_name = dict([(key, len(value)) for key, value in salary_of_vacancy_name.items()])
-
-        if not salary_of_vacancy_name:
-            salary_of_vacancy_name = dict([(key, [0]) for key, value in salary.items()])
-            vacancies_number_by_name = dict([(key, 0) for key, value in vacancies_number.items()])
-
         stats = self.average(salary)
-        stats2 = self.average(salary_of_vacancy_name)
-        stats3 = self.average(salary_city)
-
-        stats4 = {}
-        for year, salaries in salary_city.items():
-            stats4[year] = round(len(salaries) / count_of_vacancies, 4)
-        stats4 = list(filter(lambda a: a[-1] >= 0.01, [(key, value) for key, value in stats4.items()]))
-        stats4.sort(key=lambda a: a[-1], reverse=True)
-        stats5 = stats4.copy()
-        stats4 = dict(stats4)
-        stats3 = list(filter(lambda a: a[0] in list(stats4.keys()), [(key, value) for key, value in stats3.items()]))
-        stats3.sort(key=lambda a: a[-1], reverse=True)
-        stats3 = dict(stats3[:10])
-        stats5 = dict(stats5[:10])
-
-        return stats, vacancies_number, stats2, vacancies_number_by_name, stats3, stats5
+
+        # в рейтинги попадают города с долей не меньше 1%, лучшие 10 отбираются кучей, а не сортировкой всех городов
+        shares = [(city, round(len(salaries) / count_of_vacancies, 4)) for city, salaries in salary_city.items()]
+        frequent = {city for city, share in shares if share >= 0.01}
+        stats3 = dict(top_n(self.average(salary_city).items(), allowed=frequent))
+        stats5 = dict(top_n(shares, threshold=0.01))
+
+        statistics = {}
+        for vacancy_name, salary_of_vacancy_name in salary_of_vacancy_names.items():
+            stats2 = self.average(salary_of_vacancy_name)
+            stats2 = dict([(year, stats2.get(year, 0)) for year in stats])
+            vacancies_number_by_name = dict([(year, len(salary_of_vacancy_name.get(year, []))) for year in stats])
+            statistics[vacancy_name] = stats, vacancies_number, stats2, vacancies_number_by_name, stats3, stats5
+            self.quantiles[vacancy_name] = dict([(year, (int(exact_quantile(salary_of_vacancy_name[year], MEDIAN)), int(exact_quantile(salary_of_vacancy_name[year], P90))))
+                                                 if year in salary_of_vacancy_name else (year, (0, 0)) for year in stats])
+        return statistics
+
+    def get_sketch_statistic(self, vacancy_names):
+        salary = {}
+        salary_of_vacancy_names = {vacancy_name: {} for vacancy_name in vacancy_names}
+        cities = SpaceSaving(self.CITY_CAPACITY)
+
+        for vacancy in self.read_vacancies():
+            if vacancy.year not in salary:
+                salary[vacancy.year] = [0, 0]
+            salary[vacancy.year][0] += vacancy.salary_average
+            salary[vacancy.year][1] += 1
+            for vacancy_name, salary_of_vacancy_name in salary_of_vacancy_names.items():
+                if contains(vacancy.name, vacancy_name):
+                    if vacancy.year not in salary_of_vacancy_name:
+                        salary_of_vacancy_name[vacancy.year] = [0, KllSketch(self.QUANTILE_K)]
+                    salary_of_vacancy_name[vacancy.year][0] += vacancy.salary_average
+                    salary_of_vacancy_name[vacancy.year][1].add(vacancy.salary_average)
+            cities.add(vacancy.area_name, vacancy.salary_average)
+
+        stats = dict([(year, int(total / count)) for year, (total, count) in salary.items()])
+        vacancies_number = dict([(year, count) for year, (total, count) in salary.items()])
+        shares = [(city, round(count / cities.count, 4)) for city, count in cities.most_common()]
+        shares = [(city, share) for city, share in shares if share >= 0.01]
+        stats3 = dict(top_n((city, int(cities.get_mean(city))) for city, share in shares))
+        stats5 = dict(shares[:10])
+
+        statistics = {}
+        for vacancy_name, salary_of_vacancy_name in salary_of_vacancy_names.items():
+            stats2 = dict([(year, int(salary_of_vacancy_name[year][0] / len(salary_of_vacancy_name[year][1])) if year in salary_of_vacancy_name else 0) for year in stats])
+            vacancies_number_by_name = dict([(year, len(salary_of_vacancy_name[year][1]) if year in salary_of_vacancy_name else 0) for year in stats])
+            statistics[vacancy_name] = stats, vacancies_number, stats2, vacancies_number_by_name, stats3, stats5
+            self.quantiles[vacancy_name] = dict([(year, (int(salary_of_vacancy_name[year][1].quantile(MEDIAN)), int(salary_of_vacancy_name[year][1].quantile(P90))))
+                                                 if year in salary_of_vacancy_name else (year, (0, 0)) for year in stats])
+        return statistics
 
     @staticmethod
-    def print_statistic(stats1, stats2, stats3, stats4, stats5, stats6):
+    def print_statistic(stats1, stats2, stats3, stats4, stats5, stats6, quantiles=None, quality=None):
         print('Динамика уровня зарплат по годам: {0}'.format(stats1))
         print('Динамика количества вакансий по годам: {0}'.format(stats2))
         print('Динамика уровня зарплат по годам для выбранной профессии: {0}'.format(stats3))
         print('Динамика количества вакансий по годам для выбранной профессии: {0}'.format(stats4))
         print('Уровень зарплат по городам (в порядке убывания): {0}'.format(stats5))
         print('Доля вакансий по городам (в порядке убывания): {0}'.format(stats6))
+        if quantiles is not None:
+            print('Медиана и 90-й перцентиль зарплат по годам для выбранной профессии: {0}'.format(quantiles))
+        if quality is not None:
+            print(quality)
 
 
 class InputConnect:
-    def __init__(self, file_name=None, vacancy_name=None):
+    def __init__(self, file_name=None, vacancy_name=None, profiler=None, pdf_backend=PDFKIT, cache=None, force=False, area_name=None, output_dir='.', sketch=False):
         self.file_name = input('Введите название файла: ') if file_name is None else file_name
         self.vacancy_name = input('Введите название профессии: ') if vacancy_name is None else vacancy_name
+        # tracemalloc замедляет выделение памяти в разы, поэтому по умолчанию память не замеряется
+        self.profiler = Profiler(trace_memory=False) if profiler is None else profiler
+        self.pdf_backend = pdf_backend
+        self.cache = ArtifactCache(force=force) if cache is None else cache
+        self.area_name = area_name
+        self.output_dir = output_dir
+        self.sketch = sketch
+        self.quantiles = None
+        self.quality = None
 
     def generate_all(self):
         stats1, stats2, stats3, stats4, stats5, stats6 = self.generate_statistics(True)
         self.generate_vacancies(stats1, stats2, stats3, stats4, stats5, stats6)
+        self.profiler.print_table()
+        print(self.cache.format_counters())
+
+    def get_report_key(self, template=None):
+        key = report_key(self.file_name, self.vacancy_name, self.area_name, template)
+        return make_key(key, 'sketch') if self.sketch else key
+
+    def get_artifact_key(self, artifact):
+        if artifact == 'pdf':
+            return make_key(self.get_report_key('pdf_template.html'), artifact, self.pdf_backend)
+        return make_key(self.get_report_key(), artifact)
 
     def generate_statistics(self, is_print=False):
-        dataset = DataSet(self.file_name, self.vacancy_name)
-        stats1, stats2, stats3, stats4, stats5, stats6 = dataset.get_statistic()
+        dataset = DataSet(self.file_name, self.vacancy_name, self.area_name, self.sketch, QualityReport(REJECT_SAMPLES))
+        key = self.get_report_key()
+        cached = self.cache.load(key)
+        if cached is None:
+            with self.profiler.stage('statistics') as run:
+                statistics = dataset.get_statistic()
+                run.rows = sum(statistics[1].values())
+            cached = statistics, dataset.quantiles[self.vacancy_name], dataset.quality
+            self.cache.save(key, cached)
+        (stats1, stats2, stats3, stats4, stats5, stats6), self.quantiles, self.quality = cached
         if is_print:
-            dataset.print_statistic(stats1, stats2, stats3, stats4, stats5, stats6)
+            dataset.print_statistic(stats1, stats2, stats3, stats4, stats5, stats6, self.quantiles, self.quality)
         return stats1, stats2, stats3, stats4, stats5, stats6
 
-    def generate_vacancies(self, stats1, stats2, stats3, stats4, stats5, stats6):
-        report = Report(self.vacancy_name, stats1, stats2, stats3, stats4, stats5, stats6)
-        report.generate_excel()
-        report.generate_image()
-        report.generate_pdf()
+    def generate_vacancies(self, stats1, stats2, stats3, stats4, stats5, stats6, parallel=True, artifacts=None):
+        snapshot = make_report_stats(self.vacancy_name, stats1, stats2, stats3, stats4, stats5, stats6, self.quantiles)
+        artifacts = tuple(ARTIFACTS if artifacts is None else artifacts)
+        if 'pdf' in artifacts and 'image' not in artifacts:
+            artifacts += ('image',)
+        keys = {artifact: self.get_artifact_key(artifact) for artifact in artifacts}
+        # артефакты с неизменившимися входными данными берутся из кэша, строятся только остальные
+        missing = tuple(artifact for artifact in ARTIFACTS if artifact in artifacts and not self.cache.restore(keys[artifact], ARTIFACT_FILES[artifact], self.output_dir))
+        if parallel:
+            for artifact, (wall, cpu) in ReportPipeline(snapshot, output_dir=self.output_dir, pdf_backend=self.pdf_backend).run(missing).items():
+                self.profiler.record(artifact, wall, cpu)
+        else:
+            report = Report(*snapshot, output_dir=self.output_dir)
+            if 'excel' in missing:
+                with self.profiler.stage('excel'):
+                    report.generate_excel()
+            if 'image' in missing:
+                with self.profiler.stage('image'):
+                    report.generate_image()
+            if 'pdf' in missing:
+                with self.profiler.stage('pdf'):
+                    report.generate_pdf(backend=self.pdf_backend)
+        for artifact in missing:
+            self.cache.put(keys[artifact], ARTIFACT_FILES[artifact], os.path.join(self.output_dir, ARTIFACT_FILES[artifact]))
+
+
+REJECT_SAMPLES = 5
+ARTIFACTS = {'excel': 'generate_excel', 'image': 'generate_image', 'pdf': 'generate_pdf'}
+ARTIFACT_FILES = {'excel': 'report.xlsx', 'image': 'graph.png', 'pdf': 'report.pdf'}
+
+
+def render_artifact(artifact, snapshot, output_dir='.', *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = getattr(Report(*snapshot, output_dir=output_dir), ARTIFACTS[artifact])(*args)
+    return time.perf_counter() - wall, time.process_time() - cpu, result
+
+
+class ReportPipeline:
+    def __init__(self, snapshot, max_workers=3, output_dir='.', pdf_backend=PDFKIT):
+        check_backend(pdf_backend)
+        self.snapshot = snapshot
+        self.max_workers = max_workers
+        self.output_dir = output_dir
+        self.pdf_backend = pdf_backend
+
+    def run(self, artifacts=tuple(ARTIFACTS)):
+        wall = time.perf_counter()
+        if not artifacts:
+            return {'total': (time.perf_counter() - wall, 0.0)}
+        with concurrent.futures.ProcessPoolExecutor(self.max_workers) as executor:
+            futures = {artifact: executor.submit(render_artifact, artifact, self.snapshot, self.output_dir) for artifact in ('excel', 'image') if artifact in artifacts}
+            if 'pdf' in artifacts:
+                # PDF встраивает PNG из памяти, поэтому ждёт только график, Excel в это время продолжает строиться;
+                # если график взят из кэша, PDF читает graph.png из директории отчёта
+                image = futures['image'].result()[2] if 'image' in futures else None
+                futures['pdf'] = executor.submit(render_artifact, 'pdf', self.snapshot, self.output_dir, image, self.pdf_backend)
+            timings = {artifact: future.result()[:2] for artifact, future in futures.items()}
+        timings['total'] = (time.perf_counter() - wall, 0.0)
+        return timings
 
 
 class Report:
-    def __init__(self, vacancy_name, stats1, stats2, stats3, stats4, stats5, stats6):
-        self.wb = Workbook()
+    def __init__(self, vacancy_name, stats1, stats2, stats3, stats4, stats5, stats6, quantiles=None, output_dir='.'):
+        # openpyxl, matplotlib и PDF-бэкенды импортируются только в методах, которые их используют,
+        # чтобы вывод одной статистики в консоль не платил за их загрузку
+        self.wb = None
+        self.output_dir = output_dir
         self.vacancy_name = vacancy_name
         self.stats1 = stats1
         self.stats2 = stats2
@@ -135,15 +304,36 @@ class Report:
         self.stats4 = stats4
         self.stats5 = stats5
         self.stats6 = stats6
+        self.quantiles = quantiles
+        self.image = None
+
+    def get_year_table(self):
+        # медиана и 90-й перцентиль выводятся, только если статистика их посчитала
+        header = ['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name, 'Количество вакансий', 'Количество вакансий - ' + self.vacancy_name]
+        rows = [[year, self.stats1[year], self.stats3[year], self.stats2[year], self.stats4[year]] for year in self.stats1]
+        if self.quantiles is not None:
+            header += ['Медианная зарплата - ' + self.vacancy_name, '90-й перцентиль зарплаты - ' + self.vacancy_name]
+            for row in rows:
+                row.extend(self.quantiles.get(row[0], (0, 0)))
+        return header, rows
+
+    def generate_excel(self, streaming=True):
+        if streaming:
+            self.generate_streaming_excel()
+            return
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+        from openpyxl.styles import Font, Border, Side
 
-    def generate_excel(self):
+        self.wb = Workbook()
         ws1 = self.wb.active
         ws1.title = 'Статистика по годам'
-        ws1.append(['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name, 'Количество вакансий', 'Количество вакансий - ' + self.vacancy_name])
-        for year in self.stats1.keys():
-            ws1.append([year, self.stats1[year], self.stats3[year], self.stats2[year], self.stats4[year]])
+        header, rows = self.get_year_table()
+        ws1.append(header)
+        for row in rows:
+            ws1.append(row)
 
-        data = [['Год ', 'Средняя зарплата ', ' Средняя зарплата - ' + self.vacancy_name, ' Количество вакансий', ' Количество вакансий - ' + self.vacancy_name]]
+        data = [[' ' + cell for cell in header]]
         column_widths = []
         for row in data:
             for i, cell in enumerate(row):
@@ -179,8 +369,10 @@ class Report:
 
         font_bold = Font(bold=True)
         for col in 'ABCDE':
-            ws1[col + '1'].font = font_bold
             ws2[col + '1'].font = font_bold
+        year_columns = [get_column_letter(i) for i in range(1, len(header) + 1)]
+        for col in year_columns:
+            ws1[col + '1'].font = font_bold
 
         for index, _ in enumerate(self.stats5):
             ws2['E' + str(index + 2)].number_format = '0.00%'
@@ -192,62 +384,71 @@ class Report:
                 ws2[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
 
         for row, _ in enumerate(self.stats1):
-            for col in 'ABCDE':
+            for col in year_columns:
                 ws1[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
 
-        self.wb.save(filename='report.xlsx')
-
-    def generate_image(self):
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(nrows=2, ncols=2)
-
-        bar1 = ax1.bar(np.array(list(self.stats1.keys())) - 0.4, self.stats1.values(), width=0.4)
-        bar2 = ax1.bar(np.array(list(self.stats1.keys())), self.stats3.values(), width=0.4)
-        ax1.set_title('Уровень зарплат по годам', fontdict={'fontsize': 8})
-        ax1.grid(axis='y')
-        ax1.legend((bar1[0], bar2[0]), ('средняя з/п', 'з/п ' + self.vacancy_name.lower()), prop={'size': 8})
-        ax1.set_xticks(np.array(list(self.stats1.keys())) - 0.2, list(self.stats1.keys()), rotation=90)
-        ax1.xaxis.set_tick_params(labelsize=8)
-        ax1.yaxis.set_tick_params(labelsize=8)
-
-        ax2.set_title('Количество вакансий по годам', fontdict={'fontsize': 8})
-        bar1 = ax2.bar(np.array(list(self.stats2.keys())) - 0.4, self.stats2.values(), width=0.4)
-        bar2 = ax2.bar(np.array(list(self.stats2.keys())), self.stats4.values(), width=0.4)
-        ax2.legend((bar1[0], bar2[0]), ('Количество вакансий', 'Количество вакансий\n' + self.vacancy_name.lower()), prop={'size': 8})
-        ax2.set_xticks(np.array(list(self.stats2.keys())) - 0.2, list(self.stats2.keys()), rotation=90)
-        ax2.grid(axis='y')
-        ax2.xaxis.set_tick_params(labelsize=8)
-        ax2.yaxis.set_tick_params(labelsize=8)
-
-        ax3.set_title('Уровень зарплат по городам', fontdict={'fontsize': 8})
-        ax3.barh(list([str(a).replace(' ', '\n').replace('-', '-\n') for a in reversed(list(self.stats5.keys()))]), list(reversed(list(self.stats5.values()))), color='blue', height=0.5, align='center')
-        ax3.yaxis.set_tick_params(labelsize=6)
-        ax3.xaxis.set_tick_params(labelsize=8)
-        ax3.grid(axis='x')
-
-        ax4.set_title('Доля вакансий по городам', fontdict={'fontsize': 8})
-        other = 1 - sum([value for value in self.stats6.values()])
-        ax4.pie(list(self.stats6.values()) + [other], labels=list(self.stats6.keys()) + ['Другие'], textprops={'fontsize': 6})
-
-        plt.tight_layout()
-        plt.savefig('graph.png')
-
-    def generate_pdf(self):
-        env = Environment(loader=FileSystemLoader('../templates'))
-        template = env.get_template("pdf_template.html")
-        stats = []
-        for year in self.stats1.keys():
-            stats.append([year, self.stats1[year], self.stats2[year], self.stats3[year], self.stats4[year]])
-
-        for key in self.stats6:
-            self.stats6[key] = round(self.stats6[key] * 100, 2)
-
-        pdf_template = template.render({'name': self.vacancy_name, 'path': '{0}/{1}'.format(pathlib.Path(__file__).parent.resolve(), 'graph.png'), 'stats': stats, 'stats5': self.stats5, 'stats6': self.stats6})
+        self.wb.save(filename=os.path.join(self.output_dir, 'report.xlsx'))
+
+    def generate_streaming_excel(self):
+        from elearn.excel import StreamingExcelWriter
+
+        writer = StreamingExcelWriter()
+        header, rows = self.get_year_table()
+        writer.add_sheet('Статистика по годам', header, rows, widths=writer.get_widths([[' ' + cell for cell in header]]))
+        writer.add_sheet(
+            'Статистика по городам',
+            ['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий'],
+            ([city1, value1, '', city2, value2] for (city1, value1), (city2, value2) in zip(self.stats5.items(), self.stats6.items())),
+            bordered=(0, 1, 3, 4),
+            percent=(4,),
+        )
+        writer.save(os.path.join(self.output_dir, 'report.xlsx'))
+
+    def generate_image(self, city_image=None):
+        from elearn.charts import get_renderer
+
+        self.image = get_renderer().render(self, city_image)
+        with open(os.path.join(self.output_dir, 'graph.png'), 'wb') as file:
+            file.write(self.image)
+        return self.image
+
+    def render_city_image(self):
+        from elearn.charts import CITIES, get_renderer
+
+        return get_renderer().render_array(self, CITIES)
+
+    def generate_pdf(self, image=None, backend=PDFKIT):
+        check_backend(backend)
+        image = image or self.image
+        if image is None:
+            with open(os.path.join(self.output_dir, 'graph.png'), 'rb') as file:
+                image = file.read()
+        header, stats = self.get_year_table()
+
+        stats6 = {key: round(value * 100, 2) for key, value in self.stats6.items()}
+        file_name = os.path.join(self.output_dir, 'report.pdf')
+
+        if backend != PDFKIT:
+            document = PdfDocument()
+            document.heading('Аналитика по зарплатам и городам для профессии ' + self.vacancy_name)
+            document.image(image)
+            document.heading('Статистика по годам', 2)
+            document.table(header, stats)
+            document.heading('Статистика по городам', 2)
+            document.tables([(['Город', 'Уровень зарплат'], self.stats5.items()),
+                             (['Город', 'Доля вакансий'], [(city, '{0}%'.format(value)) for city, value in stats6.items()])])
+            document.save(file_name)
+            return
+
+        pdf_template = get_template_renderer().render("pdf_template.html", {'name': self.vacancy_name, 'image': to_data_uri(image), 'header': header, 'stats': stats, 'stats5': self.stats5, 'stats6': stats6})
 
         # config = pdfkit.configuration(wkhtmltopdf=r'/usr/bin/wkhtmltopdf')
         # pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
-        pdfkit.from_string(pdf_template, 'report.pdf', options={"enable-local-file-access": ""})
+        html_to_pdf(pdf_template, file_name)
 
 
 if __name__ == '__main__':
-    input_connect = InputConnect()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--force', action='store_true', help='не брать статистику и отчёты из кэша, построить всё заново')
+    input_connect = InputConnect(force=parser.parse_args().force)
     input_connect.generate_all()
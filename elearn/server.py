@@ -0,0 +1,381 @@
+import concurrent.futures
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from elearn.batch import ARTIFACTS, get_report_directory, render_profession
+from elearn.cube import YEAR, SalaryCube
+from elearn.encoding import DICTIONARY_DIRECTORY, MISSING, get_dictionary
+from elearn.matching import NameMatcher
+from elearn.ranking import top_n
+from elearn.sketches import MEDIAN, P90
+from elearn.pdf import PDFKIT, check_backend
+from elearn.quality import QualityReport
+from elearn.report import DataSet, Vacancy, make_report_stats
+
+
+FILE_NAME = '../data/vacancies_by_year.csv'
+OUTPUT_DIRECTORY = '../reports'
+HOST = '127.0.0.1'
+PORT = 8000
+LATENCY_WINDOW = 10000
+STATISTIC_FIELDS = ('salary_by_year', 'count_by_year', 'vacancy_salary_by_year', 'vacancy_count_by_year', 'salary_by_city', 'share_by_city')
+
+
+def group_in_order(keys, values):
+    """Группирует значения по ключам, сохраняя порядок первого появления ключа, как словари в DataSet
+
+    >>> group_in_order(np.array([2022, 2021, 2022]), np.array([10.0, 20.0, 30.0]))
+    ([2022, 2021], [40.0, 20.0], [2, 1])
+
+    Args:
+        keys (np.ndarray): ключи
+        values (np.ndarray): значения
+
+    Returns:
+        tuple[list, list[float], list[int]]: ключи, суммы и количества
+    """
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique))
+    counts = np.bincount(inverse, minlength=len(unique))
+    order = np.argsort(first, kind='stable')
+    return unique[order].tolist(), sums[order].tolist(), counts[order].tolist()
+
+
+class ColumnarDataset:
+    """Класс один раз загружает вакансии в столбцы numpy и отвечает на запросы статистики без повторного чтения файла
+
+    Строки читаются и проверяются тем же DataSet.read_vacancies, а зарплата берётся из Vacancy,
+    поэтому отброшенные строки (неизвестная валюта, некорректная дата) не попадают в столбцы, учитываются
+    в quality по тем же причинам, а ответы совпадают с DataSet.get_statistic на том же файле. Регионы и валюты
+    кодируются общими словарями (elearn.encoding): фильтр по региону и группировка по городам сравнивают целые числа,
+    а курс валюты берётся индексом массива
+
+    Attributes:
+        file_name (str): путь до CSV-файла
+        quality (QualityReport): проверенные и отброшенные при загрузке строки
+        matcher (NameMatcher): нормализованные названия вакансий для поиска профессии
+        salaries (np.ndarray): средняя зарплата в рублях
+        areas (np.ndarray): коды регионов
+        area_dictionary (Dictionary): словарь регионов
+        years (np.ndarray): годы публикации
+        months (np.ndarray): месяцы публикации от начала эры для куба зарплат
+    """
+    def __init__(self, file_name, dictionary_directory=DICTIONARY_DIRECTORY):
+        """Инициализирует объект ColumnarDataset и загружает файл
+
+        Args:
+            file_name (str): путь до CSV-файла
+            dictionary_directory (str): директория словарей регионов и валют
+        """
+        self.file_name = file_name
+        self.quality = QualityReport()
+        vacancies = list(DataSet(file_name, '', quality=self.quality).read_vacancies())
+        self.matcher = NameMatcher([vacancy.name for vacancy in vacancies])
+        salary_from = np.array([vacancy.salary_from for vacancy in vacancies], dtype=np.float64)
+        salary_to = np.array([vacancy.salary_to for vacancy in vacancies], dtype=np.float64)
+        currencies = get_dictionary('salary_currency', dictionary_directory)
+        currency_codes = currencies.encode_array([vacancy.salary_currency for vacancy in vacancies])
+        self.salaries = currencies.get_table(Vacancy.currency_to_rub)[currency_codes] * (salary_from + salary_to) / 2
+        self.area_dictionary = get_dictionary('area_name', dictionary_directory)
+        areas = self.area_dictionary.encode_array([vacancy.area_name for vacancy in vacancies])
+        self.areas = self.area_dictionary.save()[areas]
+        self.years = np.array([vacancy.year for vacancy in vacancies], dtype=np.int32)
+        self.months = self.years * 12 + np.array([vacancy.month for vacancy in vacancies], dtype=np.int32) - 1
+        self.get_name_mask = functools.lru_cache(maxsize=256)(self._get_name_mask)
+        self.get_cube = functools.lru_cache(maxsize=32)(self._get_cube)
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def _get_name_mask(self, vacancy_name):
+        return self.matcher.get_mask(vacancy_name)
+
+    def _get_cube(self, vacancy_name):
+        return SalaryCube.from_arrays(self.months, self.areas, self.salaries, self.area_dictionary.values, [vacancy_name], [self.get_name_mask(vacancy_name)])
+
+    def get_mask(self, area_name=None, year_from=None, year_to=None):
+        mask = np.ones(len(self), dtype=bool)
+        if area_name is not None:
+            mask &= self.areas == self.area_dictionary.codes.get(area_name, MISSING)
+        if year_from is not None:
+            mask &= self.years >= year_from
+        if year_to is not None:
+            mask &= self.years <= year_to
+        return mask
+
+    def get_quantiles(self, vacancy_name, area_name=None, year_from=None, year_to=None):
+        """Медиана и 90-й перцентиль зарплат профессии по годам, как DataSet.quantiles
+
+        Квантили считаются по тому же определению, что и elearn.sketches.exact_quantile, по отсортированному
+        массиву зарплат каждого года; годы без вакансий профессии получают (0, 0)
+
+        Args:
+            vacancy_name (str): название профессии
+            area_name (str or None): регион, None ― все регионы
+            year_from (int or None): первый год, включительно
+            year_to (int or None): последний год, включительно
+
+        Returns:
+            dict[int, tuple[int, int]]: медиана и 90-й перцентиль по годам в порядке статистики по годам
+        """
+        mask = self.get_mask(area_name, year_from, year_to)
+        years = self.years[mask]
+        names = self.get_name_mask(vacancy_name)[mask]
+        vacancy_years, vacancy_salaries = years[names], self.salaries[mask][names]
+        quantiles = {}
+        for year in group_in_order(years, np.zeros(len(years)))[0]:
+            salaries = np.sort(vacancy_salaries[vacancy_years == year])
+            quantiles[year] = tuple(int(salaries[min(len(salaries) - 1, int(q * len(salaries)))]) for q in (MEDIAN, P90)) if len(salaries) else (0, 0)
+        return quantiles
+
+    def get_statistic(self, vacancy_name='', area_name=None, year_from=None, year_to=None):
+        """Считает статистику в формате DataSet.get_statistic по отобранным вакансиям
+
+        Args:
+            vacancy_name (str): название профессии (подстрока названия вакансии)
+            area_name (str or None): регион, None ― все регионы
+            year_from (int or None): первый год, включительно
+            year_to (int or None): последний год, включительно
+
+        Returns:
+            tuple[dict, dict, dict, dict, dict, dict]: статистика по годам, по годам для профессии и по городам
+        """
+        mask = self.get_mask(area_name, year_from, year_to)
+        names = self.get_name_mask(vacancy_name)[mask]
+        years, salaries, areas = self.years[mask], self.salaries[mask], self.areas[mask]
+
+        year_keys, year_sums, year_counts = group_in_order(years, salaries)
+        salary_by_year = {year: int(total / count) for year, total, count in zip(year_keys, year_sums, year_counts)}
+        count_by_year = dict(zip(year_keys, year_counts))
+        vacancy_keys, vacancy_sums, vacancy_counts = group_in_order(years[names], salaries[names])
+        vacancy_salary = {year: int(total / count) for year, total, count in zip(vacancy_keys, vacancy_sums, vacancy_counts)}
+        vacancy_count = dict(zip(vacancy_keys, vacancy_counts))
+        vacancy_salary_by_year = {year: vacancy_salary.get(year, 0) for year in salary_by_year}
+        vacancy_count_by_year = {year: vacancy_count.get(year, 0) for year in salary_by_year}
+
+        city_codes, city_sums, city_counts = group_in_order(areas, salaries)
+        city_keys = self.area_dictionary.decode_array(city_codes)
+        shares = [(city, round(count / len(areas), 4)) for city, count in zip(city_keys, city_counts)]
+        frequent = {city for city, share in shares if share >= 0.01}
+        city_salaries = ((city, int(total / count)) for city, total, count in zip(city_keys, city_sums, city_counts))
+        salary_by_city = dict(top_n(city_salaries, allowed=frequent))
+        return salary_by_year, count_by_year, vacancy_salary_by_year, vacancy_count_by_year, salary_by_city, dict(top_n(shares, threshold=0.01))
+
+
+class LatencyMetrics:
+    """Класс потокобезопасно собирает время ответа на запросы по эндпоинтам
+
+    Attributes:
+        window (int): сколько последних замеров хранить на эндпоинт для перцентилей
+    """
+    def __init__(self, window=LATENCY_WINDOW):
+        """Инициализирует объект LatencyMetrics
+
+        Args:
+            window (int): сколько последних замеров хранить на эндпоинт
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counts = {}
+        self._errors = {}
+
+    def record(self, endpoint, seconds, error=False):
+        """Добавляет замер запроса
+
+        Args:
+            endpoint (str): эндпоинт
+            seconds (float): время ответа в секундах
+            error (bool): завершился ли запрос ошибкой
+        """
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + error
+
+    def snapshot(self):
+        """Сводка по эндпоинтам
+
+        Returns:
+            dict[str, dict]: количество запросов, ошибок и время ответа в миллисекундах (среднее, p50, p95, p99, максимум)
+        """
+        with self._lock:
+            latencies = {endpoint: np.array(values) * 1000 for endpoint, values in self._latencies.items()}
+            counts, errors = dict(self._counts), dict(self._errors)
+        summary = {}
+        for endpoint, values in latencies.items():
+            p50, p95, p99 = np.percentile(values, (50, 95, 99)).tolist()
+            summary[endpoint] = {
+                'requests': counts[endpoint], 'errors': errors[endpoint], 'mean_ms': float(values.mean()),
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': float(values.max()),
+            }
+        return summary
+
+
+class StatisticRequestHandler(BaseHTTPRequestHandler):
+    """Класс обрабатывает HTTP-запросы к StatisticServer
+
+    GET /statistic?vacancy=&area=&year_from=&year_to= ― статистика,
+    GET /rollup?vacancy=&area=&granularity=year|quarter|month&from=YYYY[-MM]&to=YYYY[-MM] ― динамика по периодам,
+    GET /metrics ― число строк, отброшенные при загрузке строки и время ответа,
+    POST /report с JSON {"vacancy": ..., "artifacts": [...], "pdf_backend": ...} ― построение отчёта
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.handle_request({'/statistic': self.get_statistic, '/rollup': self.get_rollup, '/metrics': self.get_metrics})
+
+    def do_POST(self):
+        self.handle_request({'/report': self.post_report})
+
+    def handle_request(self, routes):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        route = routes.get(url.path)
+        if route is None:
+            status, body = 404, {'error': 'Неизвестный адрес: {0}'.format(url.path)}
+        else:
+            try:
+                status, body = 200, route({key: values[-1] for key, values in parse_qs(url.query).items()})
+            except (KeyError, ValueError) as error:
+                status, body = 400, {'error': str(error)}
+            except Exception as error:
+                # непредвиденная ошибка не должна оставлять клиента без ответа и пропадать из /metrics
+                self.log_error('%s: %r', url.path, error)
+                status, body = 500, {'error': 'Внутренняя ошибка сервера: {0}'.format(error)}
+        # замер пишется до ответа, чтобы клиент, получивший ответ, сразу видел его в /metrics
+        self.server.metrics.record('{0} {1}'.format(self.command, url.path if route else 'unknown'), time.perf_counter() - start, status != 200)
+        self.send_json(status, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(body, dict):
+            raise ValueError('Тело запроса должно быть JSON-объектом')
+        return body
+
+    def get_statistic(self, query):
+        year_from, year_to = query.get('year_from'), query.get('year_to')
+        statistic = self.server.dataset.get_statistic(
+            query.get('vacancy', ''), query.get('area'),
+            int(year_from) if year_from else None, int(year_to) if year_to else None,
+        )
+        return dict(zip(STATISTIC_FIELDS, statistic))
+
+    def get_rollup(self, query):
+        vacancy = query.get('vacancy', '')
+        cube = self.server.dataset.get_cube(vacancy)
+        granularity, area = query.get('granularity', YEAR), query.get('area')
+        salary, count = cube.rollup(granularity, None, area, query.get('from'), query.get('to'))
+        vacancy_salary, vacancy_count = cube.rollup(granularity, vacancy, area, query.get('from'), query.get('to'))
+        return {
+            'salary': salary, 'count': count,
+            'vacancy_salary': {period: vacancy_salary.get(period, 0) for period in salary},
+            'vacancy_count': {period: vacancy_count.get(period, 0) for period in salary},
+        }
+
+    def get_metrics(self, query):
+        return {'rows': len(self.server.dataset), 'quality': self.server.dataset.quality.as_dict(), 'endpoints': self.server.metrics.snapshot()}
+
+    def post_report(self, query):
+        body = self.read_json()
+        return self.server.generate_report(body['vacancy'], body.get('artifacts', ARTIFACTS), body.get('pdf_backend', PDFKIT))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StatisticServer(ThreadingHTTPServer):
+    """Класс ― HTTP-сервис статистики: данные загружаются один раз при старте и живут в памяти
+
+    Запросы обслуживаются параллельно в потоках, а отчёты строятся в общем пуле процессов
+
+    Attributes:
+        dataset (ColumnarDataset): загруженные вакансии
+        output_dir (str): директория для отчётов
+        metrics (LatencyMetrics): время ответа по эндпоинтам
+        executor (ProcessPoolExecutor): пул процессов для построения отчётов
+        verbose (bool): писать ли журнал запросов в stderr
+    """
+    daemon_threads = True
+
+    def __init__(self, dataset, address=(HOST, PORT), output_dir=OUTPUT_DIRECTORY, max_workers=None, verbose=False):
+        """Инициализирует объект StatisticServer
+
+        Args:
+            dataset (ColumnarDataset): загруженные вакансии
+            address (tuple[str, int]): адрес и порт, порт 0 ― любой свободный
+            output_dir (str): директория для отчётов
+            max_workers (int or None): количество процессов для отчётов
+            verbose (bool): писать ли журнал запросов в stderr
+        """
+        super().__init__(address, StatisticRequestHandler)
+        self.dataset = dataset
+        self.output_dir = output_dir
+        self.metrics = LatencyMetrics()
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        self.verbose = verbose
+
+    def generate_report(self, vacancy_name, artifacts=ARTIFACTS, pdf_backend=PDFKIT):
+        """Строит отчёт по профессии из статистики в памяти
+
+        Args:
+            vacancy_name (str): название профессии
+            artifacts (Iterable[str]): какие отчёты строить: excel, image, pdf
+            pdf_backend (str): чем строить PDF: pdfkit или fpdf
+
+        Returns:
+            dict: директория и построенные файлы
+
+        Raises:
+            ValueError: если отчёты, способ построения PDF или название профессии недопустимы
+        """
+        artifacts = tuple(artifacts)
+        unknown = set(artifacts) - set(ARTIFACTS)
+        if unknown:
+            raise ValueError('Неизвестные отчёты: {0}'.format(', '.join(sorted(unknown))))
+        check_backend(pdf_backend)
+        if not isinstance(vacancy_name, str):
+            raise ValueError('Название профессии должно быть строкой')
+        # название приходит из запроса, поэтому директория проверяется до построения отчёта
+        directory = get_report_directory(self.output_dir, vacancy_name)
+        snapshot = make_report_stats(vacancy_name, *self.dataset.get_statistic(vacancy_name), self.dataset.get_quantiles(vacancy_name))
+        self.executor.submit(render_profession, snapshot, directory, None, artifacts, pdf_backend).result()
+        return {'directory': directory, 'files': sorted(os.listdir(directory))}
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
+if __name__ == '__main__':
+    file_name = sys.argv[1] if len(sys.argv) > 1 else FILE_NAME
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+    start = time.perf_counter()
+    server = StatisticServer(ColumnarDataset(file_name), (HOST, port), verbose=True)
+    print('Загружено {0} вакансий за {1:.2f} с, сервис слушает http://{2}:{3}'.format(len(server.dataset), time.perf_counter() - start, *server.server_address))
+    print(server.dataset.quality)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,215 @@
+import heapq
+import math
+import random
+
+from elearn.ranking import top_n
+
+
+MEDIAN, P90 = 0.5, 0.9
+
+
+def exact_quantile(values, q):
+    """Квантиль по определению, которое приближает KllSketch: значение, перед которым в отсортированном списке
+    стоит q-я доля всех значений
+
+    >>> exact_quantile([5, 1, 4, 2, 3], 0.5)
+    3
+    >>> exact_quantile([10, 20, 30, 40], 0.9)
+    40
+
+    Args:
+        values (list): значения
+        q (float): уровень квантиля от 0 до 1
+
+    Returns:
+        значение квантиля
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class KllSketch:
+    """Скетч квантилей KLL (Karnin, Lang, Liberty, 2016)
+
+    Хранит значения в нескольких компакторах: когда уровень переполняется, он сортируется и в следующий уровень
+    уходит каждое второе значение со случайным сдвигом, а вес значения удваивается. Память ― O(k · log(n / k)),
+    ошибка ранга квантиля с высокой вероятностью не больше примерно 1.7 / k от числа значений
+    (для k = 200 ― около одного процента)
+
+    >>> sketch = KllSketch(k=64)
+    >>> for value in range(10000):
+    ...     sketch.add(value)
+    >>> len(sketch), abs(sketch.quantile(0.5) - 5000) < 300, sketch.size() < 400
+    (10000, True, True)
+
+    Attributes:
+        k (int): размер верхнего компактора, задаёт точность
+        compactors (list[list]): значения по уровням, вес значения уровня h равен 2 ** h
+        count (int): сколько значений добавлено
+        stored (int): сколько значений хранится сейчас
+        max_size (int): суммарная вместимость компакторов, при достижении которой скетч сжимается
+    """
+    def __init__(self, k=200, seed=0):
+        """Инициализирует объект KllSketch
+
+        Args:
+            k (int): размер верхнего компактора
+            seed (int): зерно генератора сдвигов, чтобы результат был воспроизводимым
+        """
+        self.k = k
+        self.compactors = [[]]
+        self.count = 0
+        self.stored = 0
+        self.max_size = self.capacity(0)
+        self.random = random.Random(seed)
+
+    def __len__(self):
+        return self.count
+
+    def size(self):
+        """Сколько значений хранит скетч
+
+        Returns:
+            int: число значений во всех компакторах
+        """
+        return self.stored
+
+    def capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def add(self, value):
+        """Добавляет значение
+
+        Args:
+            value: значение, сравнимое с остальными
+        """
+        self.compactors[0].append(value)
+        self.count += 1
+        self.stored += 1
+        if self.stored >= self.max_size:
+            self.compress()
+
+    def compress(self):
+        for level, compactor in enumerate(self.compactors):
+            if len(compactor) >= self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                    self.max_size = sum(self.capacity(height) for height in range(len(self.compactors)))
+                compactor.sort()
+                offset = self.random.randint(0, 1)
+                self.compactors[level + 1].extend(compactor[offset::2])
+                self.stored -= len(compactor) - len(compactor[offset::2])
+                compactor.clear()
+                if self.stored < self.max_size:
+                    return
+
+    def quantile(self, q):
+        """Оценивает квантиль
+
+        Args:
+            q (float): уровень квантиля от 0 до 1
+
+        Returns:
+            значение квантиля или None, если значений не было
+        """
+        if not self.count:
+            return None
+        items = sorted((value, 1 << level) for level, compactor in enumerate(self.compactors) for value in compactor)
+        total = sum(weight for _, weight in items)
+        rank, threshold = 0, min(total - 1, int(q * total))
+        for value, weight in items:
+            rank += weight
+            if rank > threshold:
+                return value
+        return items[-1][0]
+
+
+class SpaceSaving:
+    """Поиск частых ключей алгоритмом Space-Saving (Metwally, Agrawal, El Abbadi, 2005) с суммой значений по ключу
+
+    Хранится не больше capacity счётчиков. Новый ключ при заполненной таблице занимает счётчик самого редкого ключа
+    и наследует его значение как ошибку. Поэтому count ключа завышен не больше чем на error <= n / capacity,
+    и любой ключ, который встретился больше n / capacity раз, гарантированно остаётся в таблице.
+    Сумма значений копится с момента, когда ключ занял счётчик, так что среднее считается точно
+    по count - error последним значениям ключа
+
+    >>> cities = SpaceSaving(capacity=2)
+    >>> for city, salary in [('Москва', 100), ('Казань', 50), ('Москва', 200), ('Пермь', 70), ('Москва', 300)]:
+    ...     cities.add(city, salary)
+    >>> cities.most_common(1), cities.get_mean('Москва')
+    ([('Москва', 3)], 200.0)
+
+    Attributes:
+        capacity (int): максимальное число счётчиков
+        count (int): сколько всего значений добавлено
+        counters (dict[str, list]): ключ → [count, error, сумма значений]
+    """
+    def __init__(self, capacity=1000):
+        """Инициализирует объект SpaceSaving
+
+        Args:
+            capacity (int): максимальное число счётчиков
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.counters = {}
+        self.heap = []
+
+    def add(self, key, value=0):
+        """Учитывает одно появление ключа
+
+        Args:
+            key (str): ключ
+            value (float): значение, которое прибавляется к сумме ключа
+        """
+        self.count += 1
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += 1
+            counter[2] += value
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [1, 0, value]
+            heapq.heappush(self.heap, (1, key))
+            return
+        # в куче лежат устаревшие счётчики: они только меньше настоящих, поэтому обновляются при извлечении
+        while True:
+            count, evicted = heapq.heappop(self.heap)
+            if self.counters[evicted][0] == count:
+                break
+            heapq.heappush(self.heap, (self.counters[evicted][0], evicted))
+        del self.counters[evicted]
+        self.counters[key] = [count + 1, count, value]
+        heapq.heappush(self.heap, (count + 1, key))
+
+    def get_count(self, key):
+        """Оценка числа появлений ключа сверху
+
+        Returns:
+            int: count ключа или 0, если ключа нет в таблице
+        """
+        return self.counters[key][0] if key in self.counters else 0
+
+    def get_error(self, key):
+        return self.counters[key][1] if key in self.counters else 0
+
+    def get_mean(self, key):
+        """Среднее значение ключа с момента, когда он занял счётчик
+
+        Returns:
+            float: среднее
+        """
+        count, error, total = self.counters[key]
+        return total / (count - error)
+
+    def most_common(self, n=None):
+        """Самые частые ключи
+
+        Args:
+            n (int or None): сколько ключей вернуть, None ― все
+
+        Returns:
+            list[tuple[str, int]]: ключи и оценки count по убыванию
+        """
+        return top_n(((key, counter[0]) for key, counter in self.counters.items()), n)
@@ -0,0 +1,90 @@
+import functools
+import os
+import stat
+
+
+TEMPLATES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+def check_private_directory(path):
+    """Создаёт директорию, доступную только текущему пользователю, или проверяет, что существующая такова
+
+    Из директории байткода Jinja загружает код шаблонов, поэтому чужая или открытая на запись директория
+    позволила бы подложить код, который выполнится при рендеринге отчёта
+
+    Args:
+        path (str): директория
+
+    Raises:
+        RuntimeError: если директория принадлежит другому пользователю или доступна другим
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError('Небезопасная директория для байткода шаблонов: {0}'.format(path))
+
+
+class TemplateRenderer:
+    """Класс рендерит HTML-шаблоны отчётов, загружая и компилируя каждый шаблон один раз
+
+    Директория шаблонов определяется от расположения модуля, а не от текущей директории, скомпилированный
+    байткод шаблонов сохраняется на диск, поэтому новый процесс (воркер пула, следующий запуск скрипта)
+    не разбирает шаблон заново, а сам шаблон после первой загрузки берётся из памяти без проверки файла
+
+    Attributes:
+        environment (Environment): окружение Jinja
+        templates (dict[str, Template]): уже загруженные шаблоны
+    """
+    def __init__(self, directory=TEMPLATES_DIRECTORY, cache_directory=None, cache=True):
+        """Инициализирует объект TemplateRenderer
+
+        Args:
+            directory (str): директория с шаблонами
+            cache_directory (str or None): директория для байткода шаблонов, None ― личная директория пользователя
+                во временной директории, которую Jinja создаёт с правами 0700 и проверяет
+            cache (bool): сохранять ли байткод на диск
+        """
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+        bytecode_cache = None
+        if cache:
+            if cache_directory is not None:
+                check_private_directory(cache_directory)
+            bytecode_cache = FileSystemBytecodeCache(cache_directory)
+        self.environment = Environment(loader=FileSystemLoader(directory), bytecode_cache=bytecode_cache, auto_reload=False)
+        self.templates = {}
+
+    def get_template(self, name):
+        """Возвращает шаблон, загружая его при первом обращении
+
+        Args:
+            name (str): имя файла шаблона
+
+        Returns:
+            Template: скомпилированный шаблон
+        """
+        if name not in self.templates:
+            self.templates[name] = self.environment.get_template(name)
+        return self.templates[name]
+
+    def render(self, name, context):
+        """Рендерит шаблон
+
+        Args:
+            name (str): имя файла шаблона
+            context (dict): переменные шаблона
+
+        Returns:
+            str: HTML
+        """
+        return self.get_template(name).render(context)
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_renderer():
+    """Возвращает общий для процесса TemplateRenderer
+
+    Returns:
+        TemplateRenderer: рендерер шаблонов
+    """
+    return TemplateRenderer()
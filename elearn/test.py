@@ -1,5 +1,47 @@
-from unittest import TestCase
+import asyncio
+import json
+import os
+import pickle
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
 from elearn.main import DataSet
+from elearn.dates import DATE_CACHE, _parse_day, parse_date, split_dates
+from elearn.profiling import Profiler
+from elearn.batch import BatchReport, get_report_directory
+from elearn.report import DataSet as ReportDataSet, FrozenDict, InputConnect, Report, ReportPipeline, make_report_stats
+from elearn.cache import ArtifactCache, report_key
+from elearn.sketches import KllSketch, SpaceSaving, exact_quantile
+from elearn.encoding import MISSING, Dictionary
+from elearn.dedup import DedupIndex, open_index
+from elearn.conversion import CheckpointedConversion
+from elearn.cube import MONTH, QUARTER, SalaryCube, parse_month
+from elearn.pipeline import AGGREGATE, HARVEST, VacancyPipeline
+from elearn.ranking import top_n
+from elearn.quality import EMPTY_FIELD, EMPTY_SALARY, MALFORMED_DATE, MISSING_RATE, RAGGED_ROW, UNKNOWN_CURRENCY, QualityReport
+from elearn.datasource import ColumnarCacheSource, CsvSource, ParquetSource, PartitionedCsvSource, Query, SqliteSource
+from elearn.parquet import ParquetWriter, is_available as is_parquet_available
+from elearn.server import ColumnarDataset, StatisticServer
+from elearn.charts import FULL, ChartRenderer
+from elearn.pdf import FPDF_BACKEND, PdfDocument, is_available
+from elearn.templating import TemplateRenderer
+from elearn.excel import StreamingExcelWriter
+from elearn.analytics import EXECUTORS, Analytics, ChunkTask, SharedAggregates, aggregate_frame, merge_aggregates, aggregates_to_rows, analyze_chunk_shared, analyze_shared, init_shared_worker, scan_groups
 
 
 class DataSetTests(TestCase):
@@ -52,3 +94,899 @@ class DataSetTests(TestCase):
         list_of_tuple_for_tests = [[-2, 'a'], [1, 'b']]
         DataSet.sort_list_of_tuples_by_value(list_of_tuple_for_tests)
         self.assertEqual(list_of_tuple_for_tests, [[1, 'b'], [-2, 'a']])
+
+
+class AnalyticsAggregatesTests(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'name': ['Аналитик', 'Программист', 'аналитик данных', 'Дизайнер'],
+            'salary_from': [100.0, None, 300.0, 50.0],
+            'salary_to': [200.0, 400.0, None, 150.0],
+            'published_at': ['2020-01-01T00:00:00+0300', '2020-02-01T00:00:00+0300', '2021-03-01T00:00:00+0300', '2021-04-01T00:00:00+0300'],
+        })
+
+    def test_sub_chunks_merge_to_whole(self):
+        whole = aggregate_frame(self.data, 'аналитик')
+        parts = [aggregate_frame(self.data.iloc[:1], 'аналитик'), aggregate_frame(self.data.iloc[1:], 'аналитик')]
+        self.assertTrue(np.array_equal(merge_aggregates(parts), whole))
+
+    def test_rows_from_aggregates(self):
+        rows = aggregates_to_rows(aggregate_frame(self.data, 'аналитик'))
+        self.assertEqual(rows, [(2020, 275, 150, 2, 1), (2021, 200, 300, 2, 1)])
+
+    def test_no_matching_vacancy(self):
+        rows = aggregates_to_rows(aggregate_frame(self.data, 'Тестировщик'))
+        self.assertEqual([row[2] for row in rows], [0, 0])
+
+    def test_shared_memory_matches_pickled_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.data.assign(area_name=['Москва', 'Казань', 'Москва', None]).to_csv(os.path.join(directory, 'chunk.csv'), index=False)
+            tasks = ChunkTask.from_directory(directory, 'аналитик')
+            by_year, by_area = analyze_shared(tasks, processes=2)
+        self.assertEqual(aggregates_to_rows(by_year), aggregates_to_rows(aggregate_frame(self.data, 'аналитик')))
+        self.assertEqual({area: int(values[2]) for area, values in by_area.items()}, {'Москва': 2, 'Казань': 1, None: 1})
+
+    def test_worker_closes_shared_memory_after_each_task(self):
+        from multiprocessing.shared_memory import SharedMemory
+
+        handles = []
+
+        def attach(*args, **kwargs):
+            handles.append(SharedMemory(*args, **kwargs))
+            return handles[-1]
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.data.iloc[:2].assign(area_name='Москва').to_csv(os.path.join(directory, 'vacancies_by_2020.csv'), index=False)
+            self.data.iloc[2:].assign(area_name='Казань').to_csv(os.path.join(directory, 'vacancies_by_2021.csv'), index=False)
+            tasks = ChunkTask.from_directory(directory, 'аналитик')
+            with SharedAggregates(1, *scan_groups(tasks)) as aggregates:
+                with patch('elearn.analytics.shared_memory.SharedMemory', side_effect=attach):
+                    init_shared_worker(*aggregates.initargs)
+                    for task in tasks:
+                        analyze_chunk_shared(task)
+                by_year = aggregates.by_year()
+        self.assertEqual(aggregates_to_rows(by_year), aggregates_to_rows(aggregate_frame(self.data, 'аналитик')))
+        self.assertEqual(len(handles), len(tasks))
+        self.assertTrue(all(handle.buf is None for handle in handles))
+
+    def test_executors_give_same_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.data.iloc[:2].to_csv(os.path.join(directory, 'vacancies_by_2020.csv'), index=False)
+            self.data.iloc[2:].to_csv(os.path.join(directory, 'vacancies_by_2021.csv'), index=False)
+            results = []
+            for executor in EXECUTORS:
+                analytics = Analytics(directory, 'аналитик', executor=executor, workers=2)
+                analytics.get_files_analytics()
+                results.append(sorted(analytics.analyzed_data))
+        self.assertEqual(results, [[(2020, 275, 150, 2, 1), (2021, 200, 300, 2, 1)]] * len(EXECUTORS))
+
+    def test_unknown_executor(self):
+        self.assertRaises(ValueError, Analytics, '.', 'аналитик', executor='gpu')
+
+
+class DatesTests(TestCase):
+    def test_vectorized_matches_row_parser(self):
+        dates = ['2022-12-15T05:12:41+0300', '2003-01-07T00:00:00+0400', '2020-09-20']
+        years, months, days = split_dates(pd.Series(dates))
+        self.assertEqual(list(zip(years.tolist(), months.tolist(), days.tolist())), [parse_date(date) for date in dates])
+
+    def test_vectorized_rejects_short_and_missing_values(self):
+        self.assertRaises(ValueError, split_dates, ['2022-12'])
+        self.assertRaises(ValueError, split_dates, pd.Series(['2022-12-15', None]))
+
+    def test_cache_is_keyed_by_day(self):
+        parse_date('2022-12-15T00:00:00+0300')
+        size = _parse_day.cache_info().currsize
+        self.assertEqual([parse_date('2022-12-15T{0:02}:00:00+0300'.format(hour)) for hour in range(24)], [(2022, 12, 15)] * 24)
+        self.assertEqual(_parse_day.cache_info().currsize, size)
+        self.assertEqual(_parse_day.cache_info().maxsize, DATE_CACHE)
+
+    def test_invalid_month(self):
+        self.assertRaises(ValueError, parse_date, '2022-13-01')
+        self.assertRaises(ValueError, split_dates, ['2022-00-01'])
+
+    def test_empty_column(self):
+        self.assertEqual([array.tolist() for array in split_dates([])], [[], [], []])
+
+
+class ProfilerTests(TestCase):
+    def test_wrap_counts_rows_and_calls(self):
+        profiler = Profiler(trace_memory=False)
+        parse = profiler.wrap('parse', rows=len)(lambda lines: [line.split(',') for line in lines])
+        parse(['a,b', 'c,d'])
+        parse(['e,f'])
+        self.assertEqual((profiler.stages['parse'].calls, profiler.stages['parse'].rows), (2, 3))
+
+    def test_nested_stage_peak_memory_propagates(self):
+        profiler = Profiler()
+        with profiler.stage('report'):
+            with profiler.stage('read'):
+                data = bytearray(2 ** 20)
+            del data
+        self.assertGreaterEqual(profiler.stages['read'].peak_memory, 2 ** 20)
+        self.assertGreaterEqual(profiler.stages['report'].peak_memory, profiler.stages['read'].peak_memory)
+
+
+class ReportStatsTests(TestCase):
+    def setUp(self):
+        self.snapshot = make_report_stats('Программист', {2022: 100}, {2022: 2}, {2022: 150}, {2022: 1}, {'Москва': 100}, {'Москва': 0.5})
+
+    def test_snapshot_is_read_only(self):
+        self.assertRaises(TypeError, self.snapshot.stats6.__setitem__, 'Москва', 50)
+        self.assertRaises(TypeError, self.snapshot.stats1.update, {2023: 1})
+
+    def test_snapshot_survives_pickling(self):
+        restored = pickle.loads(pickle.dumps(self.snapshot))
+        self.assertEqual(restored, self.snapshot)
+        self.assertIsInstance(restored.stats6, FrozenDict)
+
+
+class BatchStatisticTests(TestCase):
+    def setUp(self):
+        self.file = tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8-sig', delete=False)
+        self.file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                        'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                        'Аналитик,300,500,RUR,Казань,2021-05-01T00:00:00+0300\n'
+                        'Программист Python,200,400,RUR,Москва,2022-01-01T00:00:00+0300\n')
+        self.file.close()
+
+    def tearDown(self):
+        os.remove(self.file.name)
+
+    def test_batch_matches_single_profession(self):
+        batch = ReportDataSet(self.file.name, '').get_batch_statistic(['Программист', 'Аналитик'])
+        for vacancy_name in ('Программист', 'Аналитик'):
+            self.assertEqual(batch[vacancy_name], ReportDataSet(self.file.name, vacancy_name).get_statistic())
+
+    def test_missing_years_are_zero(self):
+        stats = ReportDataSet(self.file.name, 'Аналитик').get_statistic()
+        self.assertEqual((stats[2], stats[3]), ({2021: 400, 2022: 0}, {2021: 1, 2022: 0}))
+
+
+class SketchTests(TestCase):
+    def test_kll_rank_error_is_bounded(self):
+        values = np.random.default_rng(0).lognormal(11, 0.6, 50000)
+        sketch = KllSketch(k=200)
+        for value in values:
+            sketch.add(value)
+        ordered = np.sort(values)
+        for q in (0.1, 0.5, 0.9):
+            rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+            self.assertLess(abs(rank - q), 0.01)
+        self.assertLess(sketch.size(), 1000)
+
+    def test_kll_is_exact_while_small(self):
+        sketch = KllSketch()
+        for value in [5, 1, 4, 2, 3]:
+            sketch.add(value)
+        self.assertEqual(sketch.quantile(0.5), exact_quantile([5, 1, 4, 2, 3], 0.5))
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        cities = SpaceSaving(capacity=10)
+        for index in range(1000):
+            cities.add('Москва' if index % 3 == 0 else 'Город {0}'.format(index), 100)
+        self.assertEqual(cities.most_common(1)[0][0], 'Москва')
+        self.assertLessEqual(cities.get_count('Москва') - 334, cities.count / cities.capacity)
+        self.assertEqual(cities.get_mean('Москва'), 100)
+        self.assertLessEqual(len(cities.counters), 10)
+
+    def test_sketch_statistic_matches_exact_on_small_file(self):
+        file_name = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'api_vacancies.csv')
+        exact, approximate = ReportDataSet(file_name, 'Программист'), ReportDataSet(file_name, 'Программист', sketch=True)
+        self.assertEqual(approximate.get_statistic(), exact.get_statistic())
+        self.assertEqual(approximate.quantiles, exact.quantiles)
+
+    def test_report_has_quantile_columns(self):
+        report = Report(*make_report_stats('Программист', {2021: 100}, {2021: 2}, {2021: 150}, {2021: 1}, {}, {}, {2021: (140, 190)}))
+        header, rows = report.get_year_table()
+        self.assertEqual(header[-2:], ['Медианная зарплата - Программист', '90-й перцентиль зарплаты - Программист'])
+        self.assertEqual(rows, [[2021, 100, 150, 2, 1, 140, 190]])
+
+
+class DictionaryTests(TestCase):
+    def test_codes_are_persisted_and_stable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'area_name.json')
+            areas = Dictionary(path)
+            self.assertEqual(areas.encode_array(['Москва', 'Казань', np.nan, 'Москва']).tolist(), [0, 1, MISSING, 0])
+            areas.save()
+            reloaded = Dictionary(path)
+            self.assertEqual(reloaded.encode_array(['Пермь', 'Казань']).tolist(), [2, 1])
+            self.assertEqual(reloaded.decode_array([0, 2]), ['Москва', 'Пермь'])
+
+    def test_concurrent_saves_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'area_name.json')
+            first, second = Dictionary(path), Dictionary(path)
+            first_codes = first.encode_array(['Москва', 'Казань'])
+            second_codes = second.encode_array(['Пермь', 'Москва'])
+            self.assertEqual(first.save()[first_codes].tolist(), [0, 1])
+            second_codes = second.save()[second_codes]
+            self.assertEqual(second.decode_array(second_codes), ['Пермь', 'Москва'])
+            self.assertEqual(Dictionary(path).values, ['Москва', 'Казань', 'Пермь'])
+            self.assertEqual(first.decode_array(first_codes), ['Москва', 'Казань'])
+
+    def test_table_is_indexed_by_code(self):
+        currencies = Dictionary()
+        codes = currencies.encode_array(['EUR', 'RUR', 'EUR'])
+        rates = currencies.get_table({'RUR': 1, 'EUR': 59.90})
+        self.assertEqual(rates[codes].tolist(), [59.90, 1.0, 59.90])
+        self.assertEqual(np.bincount(codes).tolist(), [2, 1])
+
+
+class DedupIndexTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'seen.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_duplicates_are_dropped_across_batches_and_runs(self):
+        row = ('Программист', 100, 200, 'RUR', 'Москва', '2022-12-15T05:12:41+0300')
+        other = ('Аналитик', None, None, None, 'Казань', '2022-12-15T06:00:00+0300')
+        with DedupIndex(self.path) as index:
+            self.assertEqual(index.filter([('1', row), ('1', row), (None, other)]), [row, other])
+            self.assertEqual(index.filter([('2', row), ('1', other[:4] + ('Омск', other[5]))]), [row])
+            self.assertEqual((index.added, index.duplicates), (3, 2))
+            index.commit()
+        with DedupIndex(self.path) as index:
+            self.assertEqual(index.filter(iter([('2', row), ('3', other), (None, row)])), [])
+            self.assertEqual(len(index), 4)
+
+    def test_uncommitted_keys_are_rolled_back(self):
+        row = ('Программист', 100, 200, 'RUR', 'Москва', '2022-12-15T05:12:41+0300')
+        with DedupIndex(self.path) as index:
+            self.assertEqual(index.filter([('1', row)]), [row])
+        with DedupIndex(self.path) as index:
+            self.assertEqual(len(index), 0)
+            self.assertEqual(index.filter([('1', row)]), [row])
+
+    def test_index_is_seeded_from_existing_output_file(self):
+        output_file = os.path.join(self.directory.name, 'vacancies.csv')
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,90000.0,,RUR,Кемерово,2022-12-15T05:12:41+0300\n')
+        new = ('Аналитик', None, None, None, 'Казань', '2022-12-15T06:00:00+0300')
+        with open_index(self.path, output_file) as index:
+            self.assertEqual(len(index), 1)
+            old = ('Программист', 90000, None, 'RUR', 'Кемерово', '2022-12-15T05:12:41+0300')
+            self.assertEqual(index.filter([('1', old), ('2', new)]), [new])
+
+    def test_index_is_reset_without_output_file(self):
+        with DedupIndex(self.path) as index:
+            index.filter([('1', ())])
+            index.commit()
+        with open_index(self.path, os.path.join(self.directory.name, 'missing.csv')) as index:
+            self.assertEqual(len(index), 0)
+
+
+def double_salary(chunk):
+    chunk['salary'] = chunk['salary'] * 2
+    return chunk
+
+
+class PickleCountingConvert:
+    pickles = 0
+
+    def __call__(self, chunk):
+        return double_salary(chunk)
+
+    def __getstate__(self):
+        PickleCountingConvert.pickles += 1
+        return {}
+
+
+class CheckpointedConversionTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.directory.name, 'vacancies.csv')
+        self.output_file = os.path.join(self.directory.name, 'converted.csv')
+        pd.DataFrame({'name': ['Вакансия {0}'.format(index) for index in range(25)], 'salary': range(25)}).to_csv(self.input_file, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        converted = []
+
+        def convert(chunk):
+            if len(converted) == 2:
+                raise KeyboardInterrupt
+            converted.append(chunk['salary'].iloc[0])
+            return double_salary(chunk)
+
+        with self.assertRaises(KeyboardInterrupt):
+            CheckpointedConversion(self.input_file, self.output_file, convert, chunk_rows=4).run()
+        self.assertFalse(os.path.exists(self.output_file))
+        converted.append(None)
+        self.assertEqual(CheckpointedConversion(self.input_file, self.output_file, convert, chunk_rows=4).run(), 7)
+        self.assertEqual(converted, [0, 4, None, 8, 12, 16, 20, 24])
+        self.assertEqual(pd.read_csv(self.output_file)['salary'].tolist(), [index * 2 for index in range(25)])
+        self.assertFalse(os.path.exists(self.output_file + '.parts'))
+
+    def test_parallel_segments_keep_order(self):
+        CheckpointedConversion(self.input_file, self.output_file, double_salary, chunk_rows=3, workers=2).run()
+        self.assertEqual(pd.read_csv(self.output_file)['name'].tolist(), ['Вакансия {0}'.format(index) for index in range(25)])
+
+    def test_convert_is_sent_to_each_worker_once(self):
+        convert = PickleCountingConvert()
+        CheckpointedConversion(self.input_file, self.output_file, convert, chunk_rows=3, workers=2).run()
+        self.assertLessEqual(PickleCountingConvert.pickles, 2)
+        self.assertEqual(pd.read_csv(self.output_file)['salary'].tolist(), [index * 2 for index in range(25)])
+
+    def test_empty_input_keeps_header(self):
+        pd.DataFrame({'name': [], 'salary': []}).to_csv(self.input_file, index=False)
+        self.assertEqual(CheckpointedConversion(self.input_file, self.output_file, double_salary, chunk_rows=3, workers=2).run(), 1)
+        self.assertEqual(list(pd.read_csv(self.output_file).columns), ['name', 'salary'])
+
+    @skipUnless(is_parquet_available(), 'pyarrow не установлен')
+    def test_parquet_row_groups_hold_one_year(self):
+        import pyarrow.parquet as pq
+
+        dates = ['{0}-0{1}-01T00:00:00+0300'.format(2020 + index % 3, index % 9 + 1) for index in range(25)]
+        pd.DataFrame({'name': 'Вакансия', 'salary': range(25), 'area_name': 'Москва', 'published_at': dates}).to_csv(self.input_file, index=False)
+        parquet_file = os.path.join(self.directory.name, 'converted.parquet')
+        CheckpointedConversion(self.input_file, self.output_file, double_salary, chunk_rows=10, parquet_file=parquet_file).run()
+        file = pq.ParquetFile(parquet_file)
+        column = file.schema_arrow.get_field_index('year')
+        statistics = [file.metadata.row_group(index).column(column).statistics for index in range(file.num_row_groups)]
+        self.assertTrue(all(group.min == group.max for group in statistics))
+        frame = ParquetSource(parquet_file).read(Query(['salary', 'year'], year_from=2021, year_to=2021))
+        self.assertEqual(sorted(frame['salary'].tolist()), [index * 2.0 for index in range(25) if index % 3 == 1])
+
+
+def count_rows(chunk):
+    quality = QualityReport()
+    quality.rows = len(chunk)
+    quality.reject(EMPTY_SALARY)
+    return chunk, quality
+
+
+class QualityReportTests(TestCase):
+    def setUp(self):
+        self.file = tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8-sig', delete=False)
+        self.file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                        'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                        'Программист,,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                        'Программист,100,200,RUR,,2021-01-01T00:00:00+0300\n'
+                        'Программист,100,200,XYZ,Москва,2021-01-01T00:00:00+0300\n'
+                        'Программист,100,200,RUR,Москва,15.01.2021\n'
+                        'Программист,100,200,RUR,Москва\n'
+                        'Программист,300,500,RUR,Казань,2022-01-01T00:00:00+0300\n')
+        self.file.close()
+
+    def tearDown(self):
+        os.remove(self.file.name)
+
+    def test_rejects_are_classified_in_the_same_pass(self):
+        dataset = ReportDataSet(self.file.name, 'Программист', quality=QualityReport(sample_size=1))
+        stats = dataset.get_statistic()
+        self.assertEqual(stats[1], {2021: 1, 2022: 1})
+        self.assertEqual(dataset.quality.rows, 7)
+        self.assertEqual(dataset.quality.rejects, {RAGGED_ROW: 1, EMPTY_SALARY: 1, EMPTY_FIELD: 1, UNKNOWN_CURRENCY: 1, MALFORMED_DATE: 1})
+        self.assertEqual(dataset.quality.samples[UNKNOWN_CURRENCY][0]['salary_currency'], 'XYZ')
+        self.assertEqual(str(dataset.quality).split(',')[0], 'Проверено строк: 7')
+
+    def test_filtered_rows_are_not_counted(self):
+        dataset = ReportDataSet(self.file.name, 'Программист', area_name='Казань')
+        self.assertEqual(dataset.get_statistic()[1], {2022: 1})
+        self.assertEqual((dataset.quality.rows, dataset.quality.rejects), (3, {RAGGED_ROW: 1, EMPTY_FIELD: 1}))
+
+    def test_samples_are_bounded(self):
+        quality = QualityReport(sample_size=2)
+        for index in range(5):
+            quality.reject(EMPTY_SALARY, index)
+        other = QualityReport(sample_size=2)
+        other.reject(EMPTY_SALARY, 5)
+        quality.merge(other)
+        self.assertEqual((quality.rejects[EMPTY_SALARY], quality.samples[EMPTY_SALARY]), (6, [0, 1]))
+
+    def test_conversion_counters_survive_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_file, output_file = os.path.join(directory, 'input.csv'), os.path.join(directory, 'output.csv')
+            pd.DataFrame({'salary': range(10)}).to_csv(input_file, index=False)
+            conversion = CheckpointedConversion(input_file, output_file, count_rows, chunk_rows=4, quality=QualityReport())
+            conversion.load_checkpoint()
+            for index, chunk in conversion.get_chunks(0):
+                frame, quality = count_rows(chunk)
+                conversion.converted.merge(quality)
+                conversion.write_segment(index, frame)
+                conversion.save_checkpoint(4)
+                break
+            quality = QualityReport()
+            CheckpointedConversion(input_file, output_file, count_rows, chunk_rows=4, quality=quality).run()
+            self.assertEqual((quality.rows, quality.rejects), (10, {EMPTY_SALARY: 3}))
+
+
+class SalaryCubeTests(TestCase):
+    def setUp(self):
+        self.file = tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8-sig', delete=False)
+        self.file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                        'Программист,100,200,RUR,Москва,2021-01-15T00:00:00+0300\n'
+                        'Аналитик,300,500,EUR,Казань,2021-05-01T00:00:00+0300\n'
+                        'Программист Python,200,400,RUR,Москва,2021-11-20T00:00:00+0300\n'
+                        'Программист,1000,3000,RUR,Казань,2022-02-01T00:00:00+0300\n'
+                        'Дизайнер,,400,RUR,Москва,2022-01-01T00:00:00+0300\n'
+                        'Программист,100,200,XYZ,Москва,2022-01-01T00:00:00+0300\n'
+                        'Программист,100,200,RUR,Москва,2022-13-01T00:00:00+0300\n')
+        self.file.close()
+        self.dictionaries = tempfile.TemporaryDirectory()
+        self.cube = SalaryCube.from_source(CsvSource(self.file.name), ['Программист'], self.dictionaries.name)
+
+    def tearDown(self):
+        os.remove(self.file.name)
+        self.dictionaries.cleanup()
+
+    def test_yearly_rollup_matches_dataset(self):
+        expected = ReportDataSet(self.file.name, 'Программист').get_statistic()
+        self.assertEqual(self.cube.rollup(), (expected[0], expected[1]))
+        self.assertEqual(self.cube.rollup(profession='Программист'), (expected[2], expected[3]))
+
+    def test_finer_granularities_add_up(self):
+        salary, count = self.cube.rollup(QUARTER, 'Программист')
+        self.assertEqual((salary, count), ({'2021-Q1': 150, '2021-Q4': 300, '2022-Q1': 2000}, {'2021-Q1': 1, '2021-Q4': 1, '2022-Q1': 1}))
+        self.assertEqual(sum(self.cube.rollup(MONTH)[1].values()), sum(self.cube.rollup()[1].values()))
+
+    def test_date_range_and_area(self):
+        self.assertEqual(self.cube.rollup(MONTH, area_name='Москва', date_from='2021-02', date_to='2021'), ({'2021-11': 300}, {'2021-11': 1}))
+        self.assertEqual(self.cube.by_area('Программист', date_from='2022'), ({'Казань': 2000}, {'Казань': 1}))
+        self.assertEqual(self.cube.rollup(area_name='Пермь'), ({}, {}))
+        self.assertEqual(parse_month('2021-11') - self.cube.first_month, 10)
+        self.assertRaises(ValueError, self.cube.rollup, 'week')
+
+
+def make_item(vacancy_id, name, salary, area_name, published_at):
+    return {'id': vacancy_id, 'name': name, 'area': {'name': area_name}, 'published_at': published_at,
+            'salary': None if salary is None else dict(zip(('from', 'to', 'currency'), salary))}
+
+
+class VacancyPipelineTests(TestCase):
+    def setUp(self):
+        self.pages = {
+            'page-0': [make_item('1', 'Программист', (100, 200, 'RUR'), 'Москва', '2022-12-15T05:12:41+0300'),
+                       make_item('2', 'Аналитик', (None, 10, 'USD'), 'Казань', '2022-12-15T06:00:00+0300')],
+            'page-1': [make_item('1', 'Программист', (100, 200, 'RUR'), 'Москва', '2022-12-15T05:12:41+0300'),
+                       make_item('3', 'Старший программист', (10, 20, 'USD'), 'Москва', '2022-11-01T06:00:00+0300'),
+                       make_item('4', 'Программист', None, 'Казань', '2021-12-01T06:00:00+0300'),
+                       make_item('5', 'Дизайнер', (300, 300, 'EUR'), 'Москва', '2022-12-15T06:00:00+0300')],
+        }
+        self.months = []
+
+    async def fetch_page(self, url):
+        await asyncio.sleep(0)
+        return self.pages[url]
+
+    async def fetch_rates(self, month):
+        self.months.append(month)
+        return {'USD': 60.0}
+
+    def test_batches_flow_to_statistic(self):
+        pipeline = VacancyPipeline('программист', self.fetch_page, self.fetch_rates, rates={'2022-11': {'USD': 50.0}}, queue_size=1, harvesters=2)
+        statistic = asyncio.run(pipeline.run(['page-0', 'page-1'])).get_statistic()
+        self.assertEqual(statistic[:4], ({2021: 0, 2022: 500}, {2021: 1, 2022: 4}, {2021: 0, 2022: 450}, {2021: 1, 2022: 2}))
+        self.assertEqual(statistic[5], {'Москва': 0.6, 'Казань': 0.4})
+        self.assertEqual(self.months, ['2022-12'])
+        self.assertEqual(pipeline.index.duplicates, 1)
+        self.assertEqual(pipeline.quality.rejects, {EMPTY_SALARY: 1, MISSING_RATE: 1})
+        self.assertEqual((pipeline.metrics[HARVEST].rows_in, pipeline.metrics[AGGREGATE].rows_out), (6, 5))
+
+    def test_failed_rate_request_is_retried(self):
+        attempts = []
+
+        async def fetch_rates(month):
+            attempts.append(month)
+            if len(attempts) == 1:
+                raise ConnectionError(month)
+            return {'USD': 60.0}
+
+        pages = {'page-0': [make_item('1', 'Аналитик', (10, 10, 'USD'), 'Казань', '2022-12-15T06:00:00+0300'),
+                            make_item('2', 'Аналитик', (10, 10, 'USD'), 'Казань', '15.12.2022')],
+                 'page-1': [make_item('3', 'Аналитик', (20, 20, 'USD'), 'Москва', '2022-12-16T06:00:00+0300')]}
+
+        async def fetch_page(url):
+            return pages[url]
+
+        pipeline = VacancyPipeline('Аналитик', fetch_page, fetch_rates, harvesters=1)
+        statistic = asyncio.run(pipeline.run(['page-0', 'page-1'])).get_statistic()
+        self.assertEqual((attempts, pipeline.rates.failed, pipeline.rates.pending), (['2022-12', '2022-12'], 1, {}))
+        self.assertEqual(pipeline.quality.rejects, {MISSING_RATE: 1, MALFORMED_DATE: 1})
+        self.assertEqual(statistic[:2], ({2022: 1200}, {2022: 2}))
+
+    def test_file_index_keeps_keys_of_finished_runs_only(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'seen.sqlite')
+            with DedupIndex(path) as index:
+                asyncio.run(VacancyPipeline('программист', self.fetch_page, self.fetch_rates, index=index).run(['page-0']))
+                self.assertEqual(index.added, 2)
+            with DedupIndex(path) as index:
+                self.assertEqual(len(index), 4)
+                with self.assertRaises(KeyError):
+                    asyncio.run(VacancyPipeline('программист', self.fetch_page, self.fetch_rates, index=index).run(['page-1', 'missing']))
+            with DedupIndex(path) as index:
+                self.assertEqual(len(index), 4)
+
+    def test_failed_stage_stops_pipeline(self):
+        async def fetch_page(url):
+            raise ConnectionError(url)
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(VacancyPipeline('Программист', fetch_page, self.fetch_rates).run(['page-0']))
+
+
+class TopNTests(TestCase):
+    def test_matches_full_sort_with_ties(self):
+        pairs = [('Город {0}'.format(index), index % 7 / 10) for index in range(200)]
+        allowed = {key for key, value in pairs if value >= 0.2}
+        self.assertEqual(top_n(pairs, 15, allowed=allowed), sorted([pair for pair in pairs if pair[0] in allowed], key=lambda pair: pair[1], reverse=True)[:15])
+        self.assertEqual(top_n(pairs, None, threshold=0.5), sorted([pair for pair in pairs if pair[1] >= 0.5], key=lambda pair: pair[1], reverse=True))
+
+    def test_old_sort_helper_is_kept(self):
+        pairs = [('Москва', 1), ('Казань', 3), ('Пермь', 2)]
+        DataSet.sort_list_of_tuples_by_value(pairs)
+        self.assertEqual(pairs, top_n([('Москва', 1), ('Казань', 3), ('Пермь', 2)], None))
+
+
+class StreamingExcelWriterTests(TestCase):
+    def test_workbook_keeps_named_styles(self):
+        from openpyxl import load_workbook
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'report.xlsx')
+            writer = StreamingExcelWriter()
+            writer.add_sheet(
+                'Статистика по городам',
+                ['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий'],
+                [['Москва', 120000, '', 'Москва', 0.4512], ['Казань', 70000, '', 'Казань', 0.0712]],
+                bordered=(0, 1, 3, 4),
+                percent=(4,),
+            )
+            writer.save(file_name)
+            ws = load_workbook(file_name)['Статистика по городам']
+
+        header = ws[1]
+        self.assertEqual([cell.value for cell in header], ['Город', 'Уровень зарплат', None, 'Город', 'Доля вакансий'])
+        self.assertTrue(all(cell.font.b for index, cell in enumerate(header) if index != 2))
+        self.assertEqual(ws['E2'].value, 0.4512)
+        self.assertEqual(ws['E3'].number_format, '0.00%')
+        self.assertEqual(ws['B3'].number_format, 'General')
+        for cell in ('A1', 'E1', 'A2', 'B3', 'D2', 'E3'):
+            self.assertEqual([getattr(ws[cell].border, side).style for side in ('left', 'right', 'top', 'bottom')], ['thin'] * 4)
+        self.assertIsNone(ws['C2'].border.left.style)
+        self.assertFalse(ws['C1'].font.b)
+
+
+class BatchReportTests(TestCase):
+    def test_empty_profession_list_is_rejected(self):
+        with self.assertRaises(ValueError):
+            BatchReport('vacancies.csv', [], 'reports')
+
+    def test_directories_stay_inside_output_dir(self):
+        batch = BatchReport('vacancies.csv', ['Программист/C++', ' Аналитик\n'], 'reports')
+        self.assertEqual([os.path.relpath(directory, 'reports') for directory in batch.directories.values()], ['Программист_C++', 'Аналитик_'])
+        for vacancy_name in ('..', '.', ' .. '):
+            self.assertRaises(ValueError, BatchReport, 'vacancies.csv', [vacancy_name], 'reports')
+
+
+class DataSourceTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'vacancies.csv')
+        with open(self.file_name, 'w', encoding='utf-8-sig') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                       'Аналитик,300,500,RUR,Казань,2021-05-01T00:00:00+0300\n'
+                       'Программист Python,200,400,RUR,Москва,2022-01-01T00:00:00+0300\n'
+                       'Программист,,400,RUR,Москва,2022-02-01T00:00:00+0300\n'
+                       'Программист 1С,150,250,RUR,Казань,2023-01-01T00:00:00+0300\n')
+        data = pd.read_csv(self.file_name)
+        self.chunks = os.path.join(self.directory.name, 'chunks')
+        os.mkdir(self.chunks)
+        years = split_dates(data['published_at'])[0]
+        for year in np.unique(years):
+            data[years == year].to_csv(os.path.join(self.chunks, 'vacancies_by_{0}.csv'.format(year)), index=False)
+        self.database = os.path.join(self.directory.name, 'vacancies.db')
+        with sqlite3.connect(self.database) as connection:
+            data.to_sql('vacancies', connection, index=False)
+        self.parquet = os.path.join(self.directory.name, 'vacancies.parquet')
+        if is_parquet_available():
+            with ParquetWriter(self.parquet) as writer:
+                writer.write(data)
+        self.query = Query(['name', 'salary_from'], year_from=2021, year_to=2022, area_name='Москва', vacancy_name='Программист')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_sources(self):
+        return [CsvSource(self.file_name), PartitionedCsvSource(self.chunks), SqliteSource(self.database),
+                ColumnarCacheSource(CsvSource(self.file_name), os.path.join(self.directory.name, 'columnar'))] \
+            + ([ParquetSource(self.parquet)] if is_parquet_available() else [])
+
+    def test_sources_return_same_frame(self):
+        for source in self.get_sources():
+            frame = source.read(self.query)
+            self.assertEqual(list(frame.columns), ['name', 'salary_from'])
+            self.assertEqual(frame['name'].tolist(), ['Программист', 'Программист Python', 'Программист'])
+            self.assertEqual(frame['salary_from'].dropna().astype(int).tolist(), [100, 200])
+
+    def test_sources_return_same_rows(self):
+        for source in self.get_sources():
+            rows = [(row['name'], int(float(row['salary_from']))) for row in source.rows(self.query)]
+            self.assertEqual(rows, [('Программист', 100), ('Программист Python', 200)])
+
+    def test_profession_matching_is_normalized(self):
+        query = Query(['name'], vacancy_name=' ПРОГРАММИСТ   python')
+        for source in self.get_sources() + [ColumnarCacheSource(CsvSource(self.file_name), os.path.join(self.directory.name, 'columnar'))]:
+            self.assertEqual(source.read(query)['name'].tolist(), ['Программист Python'])
+            self.assertEqual([row['name'] for row in source.rows(query)], ['Программист Python'])
+        self.assertEqual(ReportDataSet(self.file_name, 'программист').get_statistic()[3], {2021: 1, 2022: 1, 2023: 1})
+        self.assertEqual(ColumnarDataset(self.file_name, self.directory.name).get_statistic('программист')[3], {2021: 1, 2022: 1, 2023: 1})
+
+    def test_malformed_dates_are_rejected_by_year_filter(self):
+        with open(self.file_name, 'a', encoding='utf-8') as file:
+            file.write('Программист,100,200,RUR,Москва,01.01.2022\n')
+        query = Query(['name'], year_to=2021)
+        for source in (CsvSource(self.file_name), ColumnarCacheSource(CsvSource(self.file_name), os.path.join(self.directory.name, 'columnar'))):
+            self.assertEqual(source.read(query)['name'].tolist(), ['Программист', 'Аналитик'])
+        quality = QualityReport()
+        self.assertEqual(len(list(CsvSource(self.file_name).rows(query, quality))), 2)
+        self.assertEqual(quality.rejects, {MALFORMED_DATE: 1})
+
+    def test_partitions_are_pruned_by_year(self):
+        partitions = PartitionedCsvSource(self.chunks).get_partitions(Query(year_from=2022))
+        self.assertEqual([os.path.basename(path) for path in partitions], ['vacancies_by_2022.csv', 'vacancies_by_2023.csv'])
+
+    def test_report_dataset_reads_any_source(self):
+        expected = ReportDataSet(self.file_name, 'Программист', 'Москва').get_statistic()
+        for path in (self.chunks, self.database):
+            self.assertEqual(ReportDataSet(path, 'Программист', 'Москва').get_statistic(), expected)
+
+
+class ChartRendererTests(TestCase):
+    def make_report(self, vacancy_name, salary):
+        return Report(*make_report_stats(vacancy_name, {2021: 100, 2022: 200}, {2021: 1, 2022: 2}, {2021: salary, 2022: salary},
+                                         {2021: 1, 2022: 1}, {'Москва': 150}, {'Москва': 0.5}))
+
+    def test_figure_is_reused_and_updated(self):
+        renderer = ChartRenderer()
+        renderer.render(self.make_report('Программист', 50))
+        template = renderer.templates[FULL]
+        figure, bars = template.figure, template.bars
+        png = renderer.render(self.make_report('Аналитик', 70))
+        self.assertIs(template.figure, figure)
+        self.assertIs(template.bars, bars)
+        self.assertEqual([rectangle.get_height() for rectangle in bars[1]], [70, 70])
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        renderer.close()
+        self.assertEqual(renderer.templates, {})
+
+
+@skipUnless(is_available(FPDF_BACKEND), 'fpdf2 не установлен')
+class PdfBackendTests(TestCase):
+    def test_fpdf_report_is_written_in_process(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = Report(*make_report_stats('Программист', {2021: 100}, {2021: 1}, {2021: 50}, {2021: 1}, {'Москва': 150}, {'Москва': 0.5}),
+                            output_dir=output_dir)
+            report.generate_image()
+            report.generate_pdf(backend=FPDF_BACKEND)
+            with open(os.path.join(output_dir, 'report.pdf'), 'rb') as file:
+                self.assertTrue(file.read().startswith(b'%PDF'))
+
+    def test_fonts_are_parsed_once_per_process(self):
+        documents = [PdfDocument() for _ in range(3)]
+        for document, text in zip(documents, ('Москва', 'Казань', 'Казань')):
+            document.pdf.set_creation_date(datetime(2022, 1, 1, tzinfo=timezone.utc))
+            document.heading(text)
+        first_fonts, second_fonts = documents[0].pdf.fonts, documents[1].pdf.fonts
+        for key in first_fonts:
+            self.assertIs(first_fonts[key].cw, second_fonts[key].cw)
+            self.assertIsNot(first_fonts[key].ttfont, second_fonts[key].ttfont)
+        # глифы первого документа не попадают в подмножество шрифта следующих
+        self.assertNotEqual(documents[0].output(), documents[1].output())
+        self.assertEqual(documents[1].output(), documents[2].output())
+
+    def test_unknown_backend(self):
+        report = Report(*make_report_stats('Программист', {}, {}, {}, {}, {}, {}))
+        self.assertRaises(ValueError, report.generate_pdf, b'', 'reportlab')
+
+
+class ReportPipelineTests(TestCase):
+    @staticmethod
+    def read_pdf_image(pdf):
+        # fpdf2 встраивает RGB-пиксели графика сжатыми Flate-потоком, по строке с PNG-предиктором перед каждой
+        match = re.search(rb'<<([^<>]*(?:<<[^<>]*>>[^<>]*)*/Subtype /Image[^<>]*)>>\nstream\n', pdf)
+        fields = {name: int(re.search(rb'/' + name + rb' (\d+)', match.group(1)).group(1)) for name in (b'Width', b'Height', b'Length')}
+        data = zlib.decompress(pdf[match.end():match.end() + fields[b'Length']])
+        stride = 1 + fields[b'Width'] * 3
+        return (fields[b'Width'], fields[b'Height']), b''.join(data[row * stride + 1:(row + 1) * stride] for row in range(fields[b'Height']))
+
+    def test_pdf_embeds_chart_of_the_same_run(self):
+        from PIL import Image
+
+        snapshot = make_report_stats('Программист', {2021: 150, 2022: 400}, {2021: 1, 2022: 1}, {2021: 150, 2022: 0}, {2021: 1, 2022: 0},
+                                     {'Москва': 150, 'Казань': 400}, {'Москва': 0.5, 'Казань': 0.5})
+        with tempfile.TemporaryDirectory() as output_dir:
+            timings = ReportPipeline(snapshot, output_dir=output_dir, pdf_backend=FPDF_BACKEND).run()
+            self.assertEqual(sorted(os.listdir(output_dir)), ['graph.png', 'report.pdf', 'report.xlsx'])
+            with Image.open(os.path.join(output_dir, 'graph.png')) as image:
+                size, pixels = image.size, image.convert('RGB').tobytes()
+            with open(os.path.join(output_dir, 'report.pdf'), 'rb') as file:
+                pdf = file.read()
+        self.assertEqual(list(timings), ['excel', 'image', 'pdf', 'total'])
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(self.read_pdf_image(pdf), (size, pixels))
+
+
+class TemplateRendererTests(TestCase):
+    def test_template_is_loaded_once_from_any_directory(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                renderer = TemplateRenderer(cache_directory=directory)
+                html = renderer.render('template_3_4_2.html', {'name': 'Аналитик', 'rows': []})
+                template = renderer.get_template('template_3_4_2.html')
+                self.assertIs(renderer.get_template('template_3_4_2.html'), template)
+                self.assertTrue(os.listdir(directory))
+            finally:
+                os.chdir(cwd)
+        self.assertIn('Аналитика по зарплатам и городам для профессии Аналитик', html)
+
+    def test_shared_cache_directory_is_refused(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chmod(directory, 0o777)
+            self.assertRaises(RuntimeError, TemplateRenderer, cache_directory=directory)
+
+
+class ArtifactCacheTests(TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        with open('vacancies.csv', 'w', encoding='utf-8-sig') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                       'Аналитик,300,500,RUR,Казань,2022-05-01T00:00:00+0300\n')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def generate(self, cache):
+        input_connect = InputConnect('vacancies.csv', 'Программист', Profiler(trace_memory=False), FPDF_BACKEND, cache)
+        input_connect.generate_vacancies(*input_connect.generate_statistics(), parallel=False)
+        return input_connect.profiler.stages
+
+    @skipUnless(is_available(FPDF_BACKEND), 'fpdf2 не установлен')
+    def test_unchanged_inputs_are_served_from_cache(self):
+        cache = ArtifactCache('cache')
+        self.assertEqual(list(self.generate(cache)), ['statistics', 'excel', 'image', 'pdf'])
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+        os.remove('report.pdf')
+        self.assertEqual(self.generate(cache), {})
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+        self.assertTrue(os.path.isfile('report.pdf'))
+        with open('vacancies.csv', 'a', encoding='utf-8') as file:
+            file.write('Программист,300,400,RUR,Москва,2022-01-01T00:00:00+0300\n')
+        self.assertEqual(len(self.generate(cache)), 4)
+        self.assertEqual(len(self.generate(ArtifactCache('cache', force=True))), 4)
+
+    def test_report_key_follows_chunk_directory(self):
+        os.mkdir('chunks')
+        shutil.copy('vacancies.csv', os.path.join('chunks', 'vacancies_by_2021.csv'))
+        key = report_key('chunks', 'Программист')
+        self.assertEqual(report_key('chunks', 'Программист'), key)
+        with open(os.path.join('chunks', 'vacancies_by_2021.csv'), 'a', encoding='utf-8') as file:
+            file.write('Программист,300,400,RUR,Москва,2021-02-01T00:00:00+0300\n')
+        self.assertNotEqual(report_key('chunks', 'Программист'), key)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ArtifactCache('cache', max_bytes=250)
+        for time, key in enumerate(('a', 'b'), 1):
+            cache.save(key, b'x' * 100)
+            os.utime(os.path.join('cache', key), (time, time))
+        self.assertEqual(cache.load('a'), b'x' * 100)
+        cache.save('c', b'x' * 100)
+        self.assertEqual(sorted(os.listdir('cache')), ['a', 'c'])
+        self.assertIsNone(cache.load('b'))
+
+
+class StatisticServerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.file_name = os.path.join(cls.directory.name, 'vacancies.csv')
+        with open(cls.file_name, 'w', encoding='utf-8-sig') as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                       'Аналитик,300,500,EUR,Казань,2021-05-01T00:00:00+0300\n'
+                       'Программист Python,200,400,RUR,Москва,2022-01-01T00:00:00+0300\n'
+                       'Дизайнер,,400,RUR,Москва,2022-01-01T00:00:00+0300\n'
+                       'Тестировщик,100,200,XYZ,Москва,2022-01-01T00:00:00+0300\n'
+                       'Программист,100,200,RUR,Москва,01.01.2022\n')
+        cls.server = StatisticServer(ColumnarDataset(cls.file_name, cls.directory.name), ('127.0.0.1', 0), os.path.join(cls.directory.name, 'reports'), max_workers=1)
+        cls.url = 'http://127.0.0.1:{0}'.format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.directory.cleanup()
+
+    def request(self, path, body=None):
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        with urlopen(Request(self.url + path, data=data), timeout=30) as response:
+            return json.loads(response.read())
+
+    def test_statistic_matches_dataset(self):
+        statistic = self.request('/statistic?' + urlencode({'vacancy': 'Программист'}))
+        expected = ReportDataSet(self.file_name, 'Программист').get_statistic()
+        self.assertEqual(list(statistic.values()), [{str(key): value for key, value in stats.items()} for stats in expected])
+
+    def test_quantiles_match_dataset(self):
+        dataset = ReportDataSet(self.file_name, 'Программист')
+        dataset.get_statistic()
+        self.assertEqual(self.server.dataset.get_quantiles('Программист'), dataset.quantiles['Программист'])
+
+    def test_statistic_filters_by_area_and_years(self):
+        statistic = self.request('/statistic?' + urlencode({'area': 'Москва', 'year_from': 2022}))
+        self.assertEqual(statistic['count_by_year'], {'2022': 1})
+        self.assertEqual(statistic['share_by_city'], {'Москва': 1.0})
+
+    def test_rollup_by_quarter(self):
+        rollup = self.request('/rollup?' + urlencode({'vacancy': 'Программист', 'granularity': 'quarter', 'from': '2021-01'}))
+        self.assertEqual(rollup['count'], {'2021-Q1': 1, '2021-Q2': 1, '2022-Q1': 1})
+        self.assertEqual(rollup['vacancy_count'], {'2021-Q1': 1, '2021-Q2': 0, '2022-Q1': 1})
+
+    def test_rejected_rows_are_reported(self):
+        metrics = self.request('/metrics')
+        self.assertEqual(metrics['rows'], 3)
+        self.assertEqual(metrics['quality']['rejects'], {EMPTY_SALARY: 1, UNKNOWN_CURRENCY: 1, MALFORMED_DATE: 1})
+
+    def test_unexpected_errors_return_500(self):
+        with patch.object(self.server.dataset, 'get_statistic', side_effect=RuntimeError('сбой')):
+            with self.assertRaises(HTTPError) as context:
+                self.request('/statistic')
+        self.assertEqual(context.exception.code, 500)
+        self.assertGreaterEqual(self.request('/metrics')['endpoints']['GET /statistic']['errors'], 1)
+
+    def test_bad_requests(self):
+        with self.assertRaises(HTTPError) as context:
+            self.request('/statistic?year_from=two')
+        self.assertEqual(context.exception.code, 400)
+        with self.assertRaises(HTTPError) as context:
+            self.request('/unknown')
+        self.assertEqual(context.exception.code, 404)
+        self.assertGreaterEqual(self.request('/metrics')['endpoints']['GET /statistic']['errors'], 1)
+
+    def test_report_directory_stays_inside_output_dir(self):
+        for vacancy_name in ('..', ' . ', 1):
+            self.assertRaises(ValueError, self.server.generate_report, vacancy_name, ['excel'], FPDF_BACKEND)
+        self.assertEqual(os.path.basename(get_report_directory(self.server.output_dir, 'Программист/../..')), 'Программист_.._..')
+
+    @skipUnless(is_available(FPDF_BACKEND), 'fpdf2 не установлен')
+    def test_report_is_generated(self):
+        result = self.request('/report', {'vacancy': 'Программист', 'pdf_backend': FPDF_BACKEND})
+        self.assertEqual(result['files'], ['graph.png', 'report.pdf', 'report.xlsx'])
+        metrics = self.request('/metrics')
+        self.assertEqual(metrics['rows'], 3)
+        self.assertEqual(metrics['endpoints']['POST /report']['requests'], 1)
+
+
+class CliTests(TestCase):
+    def test_statistics_do_not_import_report_dependencies(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Программист,100,200,RUR,Москва,2021-01-01T00:00:00+0300\n'
+                           'Программист,300,500,RUR,Казань,2021-05-01T00:00:00+0300\n')
+            code = ('import sys; from elearn.cli import main; main(sys.argv[1:]); '
+                    'print(sorted(name for name in ("matplotlib", "numpy", "openpyxl", "jinja2", "pdfkit") if name in sys.modules))')
+            result = subprocess.run([sys.executable, '-c', code, file_name, 'Программист', '--area', 'Казань', '--force', '--cache-dir', os.path.join(directory, 'cache')],
+                                    cwd=directory, env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                    capture_output=True, text=True, check=True)
+        lines = result.stdout.splitlines()
+        self.assertEqual(lines[0], 'Динамика уровня зарплат по годам: {2021: 400}')
+        self.assertEqual(lines[-1], '[]')
@@ -1,18 +1,8 @@
-import cProfile
 from elearn.main import DataSet
-import datetime
-from dateutil.parser import parse
+from elearn.profiling import Profiler
 
 
-def profile(func):
-    """Декоратор для профилирования какой-либо функции"""
-    def wrapper(*args, **kwargs):
-        profiler = cProfile.Profile()
-        result = profiler.runcall(func, *args, **kwargs)
-        print('Статистика по методу «{0}»\n'.format(args[1].__name__))
-        profiler.print_stats()
-        return result
-    return wrapper
+profiler = Profiler(sort='tottime', limit=10)
 
 
 # def first_date_parser(original_date):
@@ -53,15 +43,17 @@ class DateRepository:
         self.original_dates = []
         self.finished_dates = []
 
-    @profile
     def parse_date(self, date_parser):
-        self.finished_dates = [date_parser(original_date) for original_date in self.original_dates]
+        with profiler.stage(date_parser.__name__, rows=len(self.original_dates)):
+            self.finished_dates = [date_parser(original_date) for original_date in self.original_dates]
 
 
 if __name__ == '__main__':
     dataset = DataSet('./data/vacancies_big.csv', '')
     date_repository = DateRepository()
-    date_repository.original_dates = [vacancy['published_at'] for vacancy in dataset.csv_reader()]
+    with profiler.stage('read') as run:
+        date_repository.original_dates = [vacancy['published_at'] for vacancy in dataset.csv_reader()]
+        run.rows = len(date_repository.original_dates)
 
     # date_repository.parse_date(first_date_parser)
     # print(date_repository.finished_dates[:10])
@@ -80,3 +72,5 @@ if __name__ == '__main__':
 
     # date_repository.parse_date(sixth_date_parser)
     # print(date_repository.finished_dates[:10])
+
+    profiler.print_table()